@@ -1,5 +1,5 @@
 from .curveShape import CurveShape
 from .curveInstance import CurveInstance
 from .curveEvent import CurveEvent
+from .curveScheduler import CurveScheduler
 from .splineCurve import *
-from .waveform import *
\ No newline at end of file
@@ -0,0 +1,15 @@
+"""
+Benchmarks for catching performance regressions
+
+Run them with:
+    python -m waveTools.benchmarks --output report.json
+and compare against an earlier run with:
+    python -m waveTools.benchmarks --compare old.json
+
+They can also be run with pytest-benchmark:
+    pytest benchmarks/bench_curves.py
+
+The largest size (1e8 samples) needs around 8GB of memory for
+the biggest benchmarks; use --sizes to leave it out.
+"""
+from .runner import *
@@ -0,0 +1,68 @@
+"""
+Run the benchmarks from the command line and write a json report
+
+Usage:
+    python -m waveTools.benchmarks [--sizes 1000 1000000]
+        [--only correlate toSpline] [--output report.json]
+        [--compare old.json]
+
+Exits with 1 if --compare finds a regression.
+"""
+import typing
+import sys
+import json
+import argparse
+from .runner import (
+    SIZES,DEFAULT_REPEAT,DEFAULT_TIME_LIMIT,DEFAULT_THRESHOLD,BENCHMARKS,
+    runSuite,makeReport,compareReports)
+from . import suite # pylint: disable=unused-import # noqa: F401
+
+
+def main(args:typing.Optional[typing.List[str]]=None)->int:
+    """
+    Run the benchmarks
+
+    Returns the exit code
+    """
+    parser=argparse.ArgumentParser(prog='python -m waveTools.benchmarks',
+        description='Time and measure the memory use of waveTools')
+    parser.add_argument('--sizes',type=lambda size:int(float(size)),
+        nargs='+',default=list(SIZES),
+        help='numbers of samples to run at (eg, 1e3 1e7)')
+    parser.add_argument('--only',nargs='+',choices=sorted(BENCHMARKS),
+        help='which benchmarks to run (default is all)')
+    parser.add_argument('--repeat',type=int,default=DEFAULT_REPEAT,
+        help='how many times to time each one')
+    parser.add_argument('--time-limit',type=float,default=DEFAULT_TIME_LIMIT, # noqa: E501 # pylint: disable=line-too-long
+        help='stop repeating one once it has taken this many seconds')
+    parser.add_argument('--output',
+        help='write the json report to this file (- for stdout)')
+    parser.add_argument('--compare',
+        help='a json report from an earlier run to compare against')
+    parser.add_argument('--threshold',type=float,default=DEFAULT_THRESHOLD,
+        help='how much slower counts as a regression (0.2=20%%)')
+    options=parser.parse_args(args)
+    log=sys.stderr if options.output=='-' else sys.stdout
+    results=runSuite(options.only,options.sizes,options.repeat,
+        options.time_limit,progress=lambda result:print(result,file=log))
+    report=makeReport(results)
+    regressed=False
+    if options.compare:
+        with open(options.compare,'r',encoding='utf-8') as f:
+            old=json.load(f)
+        comparisons=compareReports(old,report,options.threshold)
+        report['comparison']=comparisons
+        for comparison in comparisons:
+            flag='REGRESSION ' if comparison['regression'] else ''
+            print(f"{flag}{comparison['key']}: time x{comparison['timeRatio']:.3f}, peak {comparison['oldPeakBytes']/1e6:.3f}MB -> {comparison['peakBytes']/1e6:.3f}MB",file=log) # noqa: E501 # pylint: disable=line-too-long
+            regressed=regressed or comparison['regression']
+    if options.output=='-':
+        json.dump(report,sys.stdout,indent=2)
+    elif options.output:
+        with open(options.output,'w',encoding='utf-8') as f:
+            json.dump(report,f,indent=2)
+    return 1 if regressed else 0
+
+
+if __name__=='__main__':
+    sys.exit(main())
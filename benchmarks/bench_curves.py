@@ -0,0 +1,27 @@
+"""
+Run the benchmarks with pytest-benchmark
+
+Usage:
+    pytest benchmarks/bench_curves.py --benchmark-json=report.json
+
+(This is not named test_*.py so that it is not picked up by
+ordinary test runs.)
+"""
+import pytest
+from .runner import SIZES,BENCHMARKS,measurePeak
+from . import suite # pylint: disable=unused-import # noqa: F401
+pytest.importorskip('pytest_benchmark')
+
+
+@pytest.mark.parametrize('size',SIZES)
+@pytest.mark.parametrize('name',sorted(BENCHMARKS))
+def test_benchmark(benchmark,name:str,size:int):
+    """
+    Time one benchmark at one size, recording its peak memory as well
+    """
+    bench=BENCHMARKS[name]
+    if bench.maxSize is not None and size>bench.maxSize:
+        pytest.skip(f'{name} is only run up to {bench.maxSize} samples')
+    function=bench.setup(size)
+    benchmark.extra_info['peakBytes']=measurePeak(function)
+    benchmark(function)
@@ -0,0 +1,299 @@
+"""
+Time and measure the memory of benchmarks, and compare runs
+"""
+import typing
+import gc
+import time
+import datetime
+import platform
+import tracemalloc
+import numpy as np
+
+
+# 1e3 to 1e8 samples
+SIZES=(1000,10000,100000,1000000,10000000,100000000)
+
+# how many times to time each benchmark (after an untimed run
+# that measures memory and warms up)
+DEFAULT_REPEAT=5
+
+# stop repeating a benchmark once it has taken this many seconds
+DEFAULT_TIME_LIMIT=10.0
+
+# a benchmark this much slower than before counts as a regression
+DEFAULT_THRESHOLD=0.2
+
+# memory changes smaller than this are never counted as a regression
+MEMORY_SLACK=64*1024
+
+# times shorter than this are too close to the timer's resolution
+# (or even 0.0) to compare, so are counted as this long
+TIME_SLACK=1e-6
+
+# sets up a benchmark for a size and returns the thing to time
+BenchmarkSetup=typing.Callable[[int],typing.Callable[[],typing.Any]]
+
+
+class Benchmark:
+    """
+    A named benchmark that can be run at different sizes
+
+    The setup function is called (untimed) with the number of
+    samples, and returns a function which does the work to time.
+    """
+    def __init__(self,
+        name:str,
+        setup:BenchmarkSetup,
+        maxSize:typing.Optional[int]=None):
+        """
+        :maxSize: the largest size that makes sense to run at
+        """
+        self.name:str=name
+        self.setup:BenchmarkSetup=setup
+        self.maxSize:typing.Optional[int]=maxSize
+
+    def __repr__(self):
+        return f'Benchmark({self.name})'
+
+
+# every benchmark, by name
+BENCHMARKS:typing.Dict[str,Benchmark]={}
+
+
+def benchmark(
+    name:typing.Optional[str]=None,
+    maxSize:typing.Optional[int]=None
+    )->typing.Callable[[BenchmarkSetup],BenchmarkSetup]:
+    """
+    Decorator to add a setup function to BENCHMARKS
+
+    Usage:
+        @benchmark('samples')
+        def samplesSetup(size):
+            curve=...
+            return lambda: curve.samples(0,size)
+    """
+    def register(setup:BenchmarkSetup)->BenchmarkSetup:
+        benchmarkName=setup.__name__ if name is None else name
+        BENCHMARKS[benchmarkName]=Benchmark(benchmarkName,setup,maxSize)
+        return setup
+    return register
+
+
+class BenchmarkResult:
+    """
+    The times and peak memory of one benchmark at one size
+    """
+    def __init__(self,
+        name:str,
+        size:int,
+        times:typing.Optional[typing.List[float]]=None,
+        peakBytes:int=0,
+        error:typing.Optional[str]=None):
+        """ """
+        self.name:str=name
+        self.size:int=size
+        self.times:typing.List[float]=[] if times is None else times
+        self.peakBytes:int=peakBytes # above what was allocated by setup
+        self.error:typing.Optional[str]=error
+
+    @property
+    def key(self)->str:
+        """
+        Identifies the benchmark and size, for comparing runs
+        """
+        return f'{self.name}[{self.size}]'
+
+    @property
+    def best(self)->float:
+        """
+        The fastest time, which is the least affected by noise
+        """
+        return min(self.times) if self.times else float('nan')
+
+    @property
+    def median(self)->float:
+        """
+        The median time
+        """
+        return float(np.median(self.times)) if self.times else float('nan')
+
+    @property
+    def samplesPerSecond(self)->float:
+        """
+        Throughput at the best time
+        """
+        if not self.times or self.best<=0:
+            return float('nan')
+        return self.size/self.best
+
+    def asDict(self)->typing.Dict[str,typing.Any]:
+        """
+        Get this as a json-compatible dict
+        """
+        return {
+            'name':self.name,
+            'size':self.size,
+            'times':self.times,
+            'best':self.best,
+            'median':self.median,
+            'peakBytes':self.peakBytes,
+            'error':self.error}
+
+    @classmethod
+    def fromDict(cls,values:typing.Dict[str,typing.Any])->"BenchmarkResult":
+        """
+        Create from the output of asDict()
+        """
+        return cls(values['name'],values['size'],values.get('times'),
+            values.get('peakBytes',0),values.get('error'))
+
+    def __repr__(self):
+        if self.error is not None:
+            return f'{self.key}: {self.error}'
+        return f'{self.key}: best={self.best:.6g}s median={self.median:.6g}s peak={self.peakBytes/1e6:.3f}MB' # noqa: E501 # pylint: disable=line-too-long
+
+
+def measurePeak(function:typing.Callable[[],typing.Any])->int:
+    """
+    The most memory allocated at once while calling a function
+
+    (Numpy reports its allocations to tracemalloc, so this includes
+    array data.  Tracing slows things down, so this is kept
+    separate from timing.)
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        baseline,_=tracemalloc.get_traced_memory()
+        function()
+        _,peak=tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return max(peak-baseline,0)
+
+
+def runBenchmark(
+    bench:Benchmark,
+    size:int,
+    repeat:int=DEFAULT_REPEAT,
+    timeLimit:float=DEFAULT_TIME_LIMIT
+    )->BenchmarkResult:
+    """
+    Run a benchmark at one size
+
+    The first run measures peak memory (and warms up any caches
+    the benchmark does not clear).  Then it is timed up to repeat
+    times, stopping early once timeLimit seconds have been used.
+
+    Running out of memory, or any other error, is recorded in the
+    result rather than raised, so that one failure does not stop
+    the rest of the suite
+    """
+    result=BenchmarkResult(bench.name,size)
+    try:
+        function=bench.setup(size)
+        result.peakBytes=measurePeak(function)
+        total=0.0
+        for _ in range(repeat):
+            gc.collect()
+            began=time.perf_counter()
+            function()
+            elapsed=time.perf_counter()-began
+            result.times.append(elapsed)
+            total+=elapsed
+            if total>=timeLimit:
+                break
+    except MemoryError:
+        result.error='out of memory'
+    except Exception as error: # pylint: disable=broad-except
+        result.error=f'{type(error).__name__}: {error}'
+    return result
+
+
+def runSuite(
+    names:typing.Optional[typing.Iterable[str]]=None,
+    sizes:typing.Iterable[int]=SIZES,
+    repeat:int=DEFAULT_REPEAT,
+    timeLimit:float=DEFAULT_TIME_LIMIT,
+    progress:typing.Optional[typing.Callable[[BenchmarkResult],None]]=None
+    )->typing.List[BenchmarkResult]:
+    """
+    Run benchmarks at every size (up to each one's maxSize)
+
+    :names: which benchmarks to run (default is all of them)
+    :progress: called with each result as it is finished
+    """
+    from . import suite # pylint: disable=unused-import # noqa: F401
+    if names is None:
+        names=list(BENCHMARKS)
+    results=[]
+    for name in names:
+        bench=BENCHMARKS[name]
+        for size in sizes:
+            if bench.maxSize is not None and size>bench.maxSize:
+                continue
+            result=runBenchmark(bench,size,repeat,timeLimit)
+            results.append(result)
+            if progress is not None:
+                progress(result)
+    return results
+
+
+def environment()->typing.Dict[str,typing.Any]:
+    """
+    Describe what the benchmarks were run on
+    """
+    import scipy
+    return {
+        'time':datetime.datetime.now().isoformat(),
+        'python':platform.python_version(),
+        'numpy':np.__version__,
+        'scipy':scipy.__version__,
+        'platform':platform.platform(),
+        'processor':platform.processor(),
+        'machine':platform.machine()}
+
+
+def makeReport(
+    results:typing.Iterable[BenchmarkResult]
+    )->typing.Dict[str,typing.Any]:
+    """
+    Create a json-compatible report of benchmark results
+    """
+    return {
+        'environment':environment(),
+        'results':[result.asDict() for result in results]}
+
+
+def compareReports(
+    old:typing.Dict[str,typing.Any],
+    new:typing.Dict[str,typing.Any],
+    threshold:float=DEFAULT_THRESHOLD
+    )->typing.List[typing.Dict[str,typing.Any]]:
+    """
+    Compare two reports from makeReport()
+
+    Returns, for every benchmark and size in both, the ratio of new to
+    old best time, both peak memories, and whether either got more
+    than threshold (eg, 0.2=20%) worse.
+    """
+    oldResults={result.key:result for result in (
+        BenchmarkResult.fromDict(values) for values in old['results'])}
+    comparisons=[]
+    for values in new['results']:
+        result=BenchmarkResult.fromDict(values)
+        previous=oldResults.get(result.key)
+        if previous is None or not result.times or not previous.times:
+            continue
+        timeRatio=max(result.best,TIME_SLACK)/max(previous.best,TIME_SLACK)
+        memoryLimit=previous.peakBytes*(1+threshold)+MEMORY_SLACK
+        regression=timeRatio>1+threshold or result.peakBytes>memoryLimit
+        comparisons.append({
+            'key':result.key,
+            'timeRatio':timeRatio,
+            'peakBytes':result.peakBytes,
+            'oldPeakBytes':previous.peakBytes,
+            'regression':regression})
+    return comparisons
@@ -0,0 +1,161 @@
+"""
+Benchmarks of the hot paths of every kind of curve
+
+Each setup function builds its data (untimed) for a given number
+of samples and returns the function to time.
+"""
+import typing
+import datetime
+import numpy as np
+from .runner import benchmark
+from ..curves.gaussianCurve import GaussianCurve
+from ..curves.splineCurve import SplineCurve
+from ..curves.discretePointCurve import DiscretePointCurve
+from ..curves.quadraticCurve import asQuadraticCurve
+from ..curves.sampleCache import sampleCache
+from ..sineCurve import SineCurve
+
+
+# how many values to append at once in discreteAppend
+APPEND_CHUNK=4096
+
+# how many single points to look up in discreteValueAt
+LOOKUPS=10000
+
+# how far either way to correlate
+MAX_LAG=1000
+
+# the largest sizes worth running the slowest benchmarks at
+# (beyond these they take many GB of memory, and hours)
+MAX_FIT_SIZE=1000000
+MAX_LOOKUP_SIZE=10000000
+
+
+def noisySine(size:int,seed:int=0)->np.ndarray:
+    """
+    A few cycles of a sine wave with noise, as test data
+    """
+    rng=np.random.default_rng(seed)
+    values=np.sin(np.linspace(0,20*np.pi,size))
+    values+=rng.normal(0,0.1,size)
+    return values
+
+
+def uncached(
+    function:typing.Callable[[],typing.Any]
+    )->typing.Callable[[],typing.Any]:
+    """
+    Make sure a function is measured doing the work every time,
+    rather than getting its samples out of the sampleCache
+    """
+    def run():
+        sampleCache.clear()
+        return function()
+    return run
+
+
+@benchmark('gaussianSamples')
+def gaussianSamples(size:int)->typing.Callable[[],typing.Any]:
+    """
+    CurveBase.samples() of a calculated curve
+    """
+    curve=GaussianCurve(0.0,1.0)
+    step=2.0/size
+    return uncached(lambda:curve.samples(-1.0,1.0-step/2,step))
+
+
+@benchmark('discreteSamples')
+def discreteSamples(size:int)->typing.Callable[[],typing.Any]:
+    """
+    CurveBase.samples() interpolating between discrete samples
+    """
+    curve=DiscretePointCurve(noisySine(size//2+1))
+    return uncached(lambda:curve.samples(0,size//2,0.5))
+
+
+@benchmark('discreteAppend')
+def discreteAppend(size:int)->typing.Callable[[],typing.Any]:
+    """
+    Build a DiscretePointCurve by appending a chunk at a time
+    """
+    values=noisySine(size)
+    def run():
+        curve=DiscretePointCurve(np.empty(0))
+        for start in range(0,size,APPEND_CHUNK):
+            curve.append(values[start:start+APPEND_CHUNK])
+        return curve
+    return run
+
+
+@benchmark('discreteValueAt',maxSize=MAX_LOOKUP_SIZE)
+def discreteValueAt(size:int)->typing.Callable[[],typing.Any]:
+    """
+    Single point lookups in a DiscretePointCurve of the given size
+    """
+    curve=DiscretePointCurve(noisySine(size))
+    rng=np.random.default_rng(1)
+    positions=(rng.random(LOOKUPS)*(size-1)).tolist()
+    return lambda:[curve.valueAt(position) for position in positions]
+
+
+@benchmark('discreteValuesAt')
+def discreteValuesAt(size:int)->typing.Callable[[],typing.Any]:
+    """
+    Vectorized lookups of as many points as there are samples
+    """
+    curve=DiscretePointCurve(noisySine(size))
+    rng=np.random.default_rng(1)
+    positions=rng.random(size)*(size-1)
+    return lambda:curve.valuesAt(positions)
+
+
+@benchmark('correlate',maxSize=MAX_FIT_SIZE)
+def correlate(size:int)->typing.Callable[[],typing.Any]:
+    """
+    Cross-correlate two curves over a limited range of lags
+    """
+    a=DiscretePointCurve(noisySine(size,1))
+    b=DiscretePointCurve(noisySine(size,2))
+    return lambda:a.correlate(b,maxLag=MAX_LAG)
+
+
+@benchmark('toSpline',maxSize=MAX_FIT_SIZE)
+def toSpline(size:int)->typing.Callable[[],typing.Any]:
+    """
+    Fit a spline to a large curve
+    """
+    values=noisySine(size)
+    # a new curve each time, so the spline cache does not help
+    return lambda:DiscretePointCurve(values).toSpline(percentError=5)
+
+
+@benchmark('asQuadraticCurve')
+def quadraticFit(size:int)->typing.Callable[[],typing.Any]:
+    """
+    Fit a polynomial to a large curve
+    """
+    curve=DiscretePointCurve(noisySine(size))
+    return lambda:asQuadraticCurve(curve,order=2)
+
+
+@benchmark('getPoints',maxSize=MAX_LOOKUP_SIZE)
+def getPoints(size:int)->typing.Callable[[],typing.Any]:
+    """
+    Get points of a CurveInstance, as arrays
+    """
+    instance=SineCurve().startCurveInstance(datetime.datetime(2000,1,1))
+    interval=datetime.timedelta(microseconds=1)
+    end=datetime.timedelta(microseconds=size)
+    return lambda:instance.getPoints(interval,endTime=end,asArrays=True)
+
+
+@benchmark('splineArithmetic')
+def splineArithmetic(size:int)->typing.Callable[[],typing.Any]:
+    """
+    Evaluate an expression made of SplineCurves
+    """
+    a=SplineCurve(noisySine(100,1))
+    b=SplineCurve(noisySine(100,2))
+    expression=a+b*0.5-a*b
+    positions=np.linspace(0,99,size)
+    return lambda:expression.valuesAt(positions)
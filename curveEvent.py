@@ -12,6 +12,8 @@ import typing
 import datetime
 from .curveShape import CurveShape
 from .curveInstance import CurveInstance
+if typing.TYPE_CHECKING:
+    from .curveScheduler import CurveScheduler,ValueCallback
 
 
 class CurveEvent:
@@ -28,10 +30,20 @@ class CurveEvent:
 
     def __init__(self,
         curve:CurveShape,
-        onCurveStarted:typing.Optional[typing.Callable]=None):
-        """ """
+        onCurveStarted:typing.Optional[typing.Callable]=None,
+        scheduler:typing.Optional["CurveScheduler"]=None,
+        sampleInterval:typing.Union[float,datetime.timedelta]=0.01,
+        onValue:typing.Optional["ValueCallback"]=None):
+        """
+        :scheduler: if set, each new CurveInstance is played back on it,
+            calling onValue(instance,relativeTime,value) every
+            sampleInterval until the curve ends
+        """
         self.curve=curve
         self.onCurveStarted=onCurveStarted
+        self.scheduler=scheduler
+        self.sampleInterval=sampleInterval
+        self.onValue=onValue
 
     def onEventOccoured(self,
         startTime:typing.Optional[datetime.datetime]
@@ -39,10 +51,14 @@ class CurveEvent:
         """
         Call this when a curve event starts.
 
+        if there is a scheduler, the new instance is added to it
+
         if onCurveStarted is set, call it and return the result
         otherwise, return a new CurveInstance
         """
         curveInstance=self.curve.startInstance(startTime)
+        if self.scheduler is not None:
+            self.scheduler.add(curveInstance,self.sampleInterval,self.onValue)
         if self.onCurveStarted is not None:
             return self.onCurveStarted(curveInstance)
         return curveInstance
@@ -3,8 +3,49 @@ A Curve shape with a definite start time
 """
 import typing
 import datetime
+import time
+import numpy as np
 from .curveValueT import CurveValueT
-from .curveShape import CurveShape
+from .curveShape import CurveShape,BLOCK_SIZE
+from .decimate import minMaxDecimate,lttb,rasterize
+
+
+# a point in time can be a datetime, float seconds on the
+# time.monotonic() clock, or int nanoseconds on time.monotonic_ns()
+TimestampCompatible=typing.Union[datetime.datetime,float,int]
+
+# how many samples per pixel to take before decimating a plot
+PLOT_OVERSAMPLE=16
+
+
+def datetimeToClockNs(timestamp:datetime.datetime)->int:
+    """
+    Convert a datetime to time.monotonic_ns() nanoseconds
+    """
+    now=datetime.datetime.now(timestamp.tzinfo)
+    return time.monotonic_ns()+(timestamp-now)//datetime.timedelta(
+        microseconds=1)*1000
+
+
+def datetimeToDatetime64(timestamp:datetime.datetime)->np.datetime64:
+    """
+    Convert a datetime to a datetime64[ns]
+
+    datetime64 has no time zones, so a tz-aware datetime is converted
+    to UTC first.  (numpy would otherwise warn and drop the offset.)
+    """
+    if timestamp.tzinfo is not None:
+        timestamp=timestamp.astimezone(
+            datetime.timezone.utc).replace(tzinfo=None)
+    return np.datetime64(timestamp,'ns')
+
+
+def clockNsToDatetime(clockNs:int)->datetime.datetime:
+    """
+    Convert time.monotonic_ns() nanoseconds to a datetime
+    """
+    return datetime.datetime.now()+datetime.timedelta(
+        microseconds=(clockNs-time.monotonic_ns())//1000)
 
 
 class CurveInstance(typing.Generic[CurveValueT]):
@@ -15,15 +56,81 @@ class CurveInstance(typing.Generic[CurveValueT]):
         curveShapeX.startCurveInstance(t)
     Or you could also do
         CurveInstance(curveShapeX,t)
+
+    As well as datetimes, times can be given as float seconds
+    on the time.monotonic() clock, or int nanoseconds on the
+    time.monotonic_ns() clock, which is much faster than
+    datetime arithmetic.
     """
     def __init__(self,
         curveShape:CurveShape,
-        startTime:typing.Optional[datetime.datetime]=None):
+        startTime:typing.Optional[TimestampCompatible]=None):
         """ """
         self.curveShape=curveShape
+        self._duration:float=float('nan')
+        self._timedelta:typing.Optional[datetime.timedelta]=None
+        self._endTime:typing.Optional[datetime.datetime]=None
+        self.endNs:float=float('inf')
         if startTime is None:
-            startTime=datetime.datetime.now()
-        self.startTime=startTime
+            self.startNs=time.monotonic_ns()
+        elif isinstance(startTime,datetime.datetime):
+            self.startTime=startTime
+        elif isinstance(startTime,(int,np.integer)):
+            self.startNs=int(startTime)
+        else:
+            self.startNs=int(round(startTime*1e9))
+
+    @property
+    def startTime(self)->datetime.datetime:
+        """
+        When the instance starts
+        """
+        return self._startTime
+    @startTime.setter
+    def startTime(self,startTime:datetime.datetime):
+        self._startTime=startTime
+        self._startNs=datetimeToClockNs(startTime)
+        self._updateTiming()
+
+    @property
+    def startNs(self)->int:
+        """
+        When the instance starts, in time.monotonic_ns() nanoseconds
+        """
+        return self._startNs
+    @startNs.setter
+    def startNs(self,startNs:int):
+        self._startNs=startNs
+        self._startTime=clockNsToDatetime(startNs)
+        self._updateTiming()
+
+    @property
+    def startSeconds(self)->float:
+        """
+        When the instance starts, in time.monotonic() seconds
+        """
+        return self._startNs*1e-9
+
+    def _updateTiming(self)->None:
+        """
+        Work out the end time once, rather than on every access
+        """
+        self._duration=self.curveShape.duration
+        if self.curveShape.hasEndpoint:
+            self._timedelta=self.curveShape.timedelta
+            self._endTime=self._startTime+self._timedelta
+            self.endNs=self._startNs+round(self._duration*1e9)
+        else:
+            self._timedelta=None
+            self._endTime=None
+            self.endNs=float('inf')
+
+    def _checkTiming(self)->None:
+        """
+        Update the end time if the shape's duration has changed
+        """
+        if self._duration!=self.curveShape.duration:
+            self._updateTiming()
 
     @property
     def duration(self)->float:
@@ -41,7 +148,10 @@ class CurveInstance(typing.Generic[CurveValueT]):
 
         raises exception if there is no end to this waveform
         """
-        return self.curveShape.timedelta
+        self._checkTiming()
+        if self._timedelta is None:
+            return self.curveShape.timedelta # raises the exception
+        return self._timedelta
 
     @property
     def isInfinite(self)->bool:
@@ -64,15 +174,73 @@ class CurveInstance(typing.Generic[CurveValueT]):
 
         raises exception if there is no end to this waveform
         """
-        return self.startTime+self.timedelta
+        self._checkTiming()
+        if self._endTime is None:
+            return self.startTime+self.timedelta # raises the exception
+        return self._endTime
+
+    def relativeSeconds(self,
+        timestamp:typing.Union[TimestampCompatible,np.ndarray]
+        )->typing.Union[float,np.ndarray]:
+        """
+        Convert timestamp(s) to seconds since the start of the instance
 
-    def getValueAt(self,timestamp:datetime.datetime)->CurveValueT:
+        :timestamp: a datetime, float time.monotonic() seconds,
+            int time.monotonic_ns() nanoseconds, or an array of any of
+            those (integer arrays are nanoseconds, float arrays are
+            seconds, and datetime64 arrays are also accepted)
+        """
+        if isinstance(timestamp,float):
+            return timestamp-self._startNs*1e-9
+        if isinstance(timestamp,(int,np.integer)):
+            return (int(timestamp)-self._startNs)*1e-9
+        if isinstance(timestamp,datetime.datetime):
+            return (timestamp-self.startTime).total_seconds()
+        timestamps=np.asarray(timestamp)
+        if timestamps.dtype.kind in 'iu':
+            ns=timestamps-self._startNs
+        elif timestamps.dtype.kind=='M':
+            ns=(timestamps-datetimeToDatetime64(self.startTime)).astype(
+                'timedelta64[ns]').astype(np.int64)
+        elif timestamps.dtype==object: # datetime.datetime objects
+            return np.fromiter(
+                (self.relativeSeconds(t) for t in timestamps.flat),
+                dtype=float,count=timestamps.size).reshape(timestamps.shape)
+        else:
+            return timestamps-self._startNs*1e-9
+        return ns*1e-9
+
+    def getValueAt(self,
+        timestamp:typing.Union[TimestampCompatible,np.ndarray]
+        )->typing.Union[CurveValueT,np.ndarray]:
         """
         get the value of the curve at a particular point in time
+
+        :timestamp: a datetime, float time.monotonic() seconds,
+            int time.monotonic_ns() nanoseconds, or an array of those
+            (see relativeSeconds())
         """
-        t=(timestamp-self.startTime).seconds()
+        t=self.relativeSeconds(timestamp)
+        if isinstance(t,np.ndarray):
+            return self.curveShape.getValuesAt(t)
         return self.curveShape.getValueAt(t)
 
+    def getValuesAt(self,timestamps:np.ndarray)->np.ndarray:
+        """
+        get the values of the curve at an array of points in time
+
+        (see relativeSeconds() for what timestamps can be)
+        """
+        return self.curveShape.getValuesAt(
+            np.asarray(self.relativeSeconds(np.asarray(timestamps))))
+
+    def getValueNow(self)->CurveValueT:
+        """
+        get the value of the curve right now
+        """
+        return self.curveShape.getValueAt(
+            (time.monotonic_ns()-self._startNs)*1e-9)
+
     def getWindow(self,
         startTime:typing.Union[None,datetime.datetime,datetime.timedelta]=None,
         endTime:typing.Union[None,datetime.datetime,datetime.timedelta]=None,
@@ -97,40 +265,144 @@ class CurveInstance(typing.Generic[CurveValueT]):
         elif isinstance(maxTime,datetime.timedelta):
             maxTime=self.startTime+maxTime
 
-    def getPoints(self,
-        sampleInterval:datetime.timedelta,
+    def _resolveTimes(self,
         startTime:typing.Union[None,datetime.datetime,datetime.timedelta]=None,
         endTime:typing.Union[None,datetime.datetime,datetime.timedelta]=None,
         maxTime:typing.Union[None,datetime.datetime,datetime.timedelta]=None
-        )->typing.Tuple[typing.List[float],typing.List[float]]:
+        )->typing.Tuple[datetime.datetime,datetime.datetime]:
         """
-        Etract a discrete series of points
+        Turn optional/relative times into an absolute (startTime,endTime)
+
+        If the curve is infinite and there is no endTime or maxTime
+        then the curve will be clamped to 1second
         """
         if startTime is None:
             startTime=self.startTime
         elif isinstance(startTime,datetime.timedelta):
             startTime=self.startTime+startTime
+        if isinstance(maxTime,datetime.timedelta):
+            maxTime=self.startTime+maxTime
         if endTime is None:
-            endTime=self.endTime
+            if self.hasEndpoint:
+                endTime=self.endTime
+            elif maxTime is not None:
+                endTime=maxTime
+            else:
+                endTime=startTime+datetime.timedelta(seconds=1)
         elif isinstance(endTime,datetime.timedelta):
             endTime=self.startTime+endTime
-        if maxTime is None:
-            maxTime=self.endTime
-        elif isinstance(maxTime,datetime.timedelta):
-            maxTime=self.startTime+maxTime
-        x=[]
-        y=[]
-        t=startTime
-        while t<endTime:
-            x.append(t)
-            y.append(self.getValueAt(t))
-            t+=sampleInterval
-        return (x,y)
+        if maxTime is not None:
+            endTime=min(endTime,maxTime)
+        return startTime,endTime
+
+    def iterPoints(self,
+        sampleInterval:datetime.timedelta,
+        startTime:typing.Union[None,datetime.datetime,datetime.timedelta]=None,
+        endTime:typing.Union[None,datetime.datetime,datetime.timedelta]=None,
+        maxTime:typing.Union[None,datetime.datetime,datetime.timedelta]=None,
+        relative:bool=False,
+        chunkSize:int=BLOCK_SIZE
+        )->typing.Generator[typing.Tuple[np.ndarray,np.ndarray],None,None]:
+        """
+        Lazily extract a discrete series of points, chunkSize at a time
+
+        Yields (x,y) array pairs.  x is a datetime64[ns] array,
+        or if relative=True, float seconds since self.startTime.
+        """
+        startTime,endTime=self._resolveTimes(startTime,endTime,maxTime)
+        # do the timing math in integer microseconds so it never drifts
+        microsecond=datetime.timedelta(microseconds=1)
+        intervalUs=sampleInterval//microsecond
+        if intervalUs<=0:
+            raise ValueError('sampleInterval must be at least 1 microsecond')
+        offsetUs=(startTime-self.startTime)//microsecond
+        count=-(-((endTime-startTime)//microsecond)//intervalUs)
+        origin=datetimeToDatetime64(self.startTime)
+        for chunkStart in range(0,max(count,0),chunkSize):
+            chunkStop=min(chunkStart+chunkSize,count)
+            us=np.arange(chunkStart,chunkStop,dtype=np.int64)
+            us*=intervalUs
+            us+=offsetUs
+            seconds=us/1e6
+            y=self.curveShape.getValuesAt(seconds)
+            if relative:
+                x=seconds
+            else:
+                x=origin+(us*1000).astype('timedelta64[ns]')
+            yield x,y
+
+    def getPoints(self,
+        sampleInterval:datetime.timedelta,
+        startTime:typing.Union[None,datetime.datetime,datetime.timedelta]=None,
+        endTime:typing.Union[None,datetime.datetime,datetime.timedelta]=None,
+        maxTime:typing.Union[None,datetime.datetime,datetime.timedelta]=None,
+        asArrays:bool=False,
+        relative:bool=False
+        )->typing.Tuple[
+            typing.Union[typing.List[datetime.datetime],np.ndarray],
+            typing.Union[typing.List[float],np.ndarray]]:
+        """
+        Etract a discrete series of points
+
+        :asArrays: return (x,y) numpy arrays rather than lists.
+            x is a datetime64[ns] array, or if relative=True,
+            float seconds since self.startTime.
+            This is much faster for large numbers of points.
+        """
+        chunks=list(self.iterPoints( # everything in a single chunk
+            sampleInterval,startTime,endTime,maxTime,
+            relative=relative,chunkSize=np.iinfo(np.int64).max))
+        if chunks:
+            x,y=chunks[0]
+        else:
+            x=np.array([],dtype=float if relative else 'datetime64[ns]')
+            y=np.array([],dtype=float)
+        if asArrays:
+            return (x,y)
+        if not relative:
+            # datetime64[us] converts to python datetimes
+            x=x.astype('datetime64[us]')
+        return (x.tolist(),y.tolist())
+
+    def getPlotPoints(self,
+        startTime:typing.Union[None,datetime.datetime,datetime.timedelta]=None,
+        endTime:typing.Union[None,datetime.datetime,datetime.timedelta]=None,
+        maxTime:typing.Union[None,datetime.datetime,datetime.timedelta]=None,
+        width:int=640,
+        method:str='minmax',
+        relative:bool=False
+        )->typing.Tuple[np.ndarray,np.ndarray]:
+        """
+        Get just enough (x,y) points to plot this curve width pixels wide
+
+        The curve is sampled at PLOT_OVERSAMPLE points per pixel
+        then decimated, so that peaks between pixels are not lost.
+
+        :method: 'minmax' keeps the min and max of each pixel column,
+            'lttb' keeps the most significant point of each column,
+            or 'none' keeps every sample
+        """
+        startTime,endTime=self._resolveTimes(startTime,endTime,maxTime)
+        sampleInterval=max(
+            (endTime-startTime)/(width*PLOT_OVERSAMPLE),
+            datetime.timedelta(microseconds=1))
+        x,y=self.getPoints(sampleInterval,startTime,endTime,
+            asArrays=True,relative=relative)
+        if method=='minmax':
+            return minMaxDecimate(x,y,width)
+        if method=='lttb':
+            return lttb(x,y,width)
+        if method=='none':
+            return x,y
+        raise ValueError(f'Unknown decimation method "{method}"')
 
     def getPlot(self,
         startTime:typing.Union[None,datetime.datetime,datetime.timedelta]=None,
         endTime:typing.Union[None,datetime.datetime,datetime.timedelta]=None,
-        maxTime:typing.Union[None,datetime.datetime,datetime.timedelta]=None):
+        maxTime:typing.Union[None,datetime.datetime,datetime.timedelta]=None,
+        width:int=640,
+        height:int=480,
+        method:str='minmax'):
         """
         get a matplotlib plot of this curve
 
@@ -138,21 +410,15 @@ class CurveInstance(typing.Generic[CurveValueT]):
             If the curve is infinite and there is no maxTime specified
             then the curve will be clamped to 1second,
             which may not be what you want.
+        :width,height: size of the figure in pixels.  The number of
+            points plotted is based on the width.
+        :method: how to decimate the points (see getPlotPoints())
         """
         import matplotlib.pyplot as plt
-        if startTime is None:
-            startTime=self.startTime
-        elif isinstance(startTime,datetime.timedelta):
-            startTime=self.startTime+startTime
-        if endTime is None:
-            endTime=self.endTime
-        elif isinstance(endTime,datetime.timedelta):
-            endTime=self.startTime+endTime
-        # TODO: calculate sampleInterval based on desired output size
-        sampleInterval=(endTime-startTime)/100
-        xs,ys=self.getPoints(sampleInterval,startTime,endTime,maxTime)
+        xs,ys=self.getPlotPoints(startTime,endTime,maxTime,width,method)
         # Create figure without displaying it
-        fig,ax=plt.subplots()
+        dpi=100
+        fig,ax=plt.subplots(figsize=(width/dpi,height/dpi),dpi=dpi)
         ax.plot(xs,ys)
         ax.set_xlabel("X")
         ax.set_ylabel("Y")
@@ -162,7 +428,10 @@ class CurveInstance(typing.Generic[CurveValueT]):
     def getPlotImage(self,
         startTime:typing.Union[None,datetime.datetime,datetime.timedelta]=None,
         endTime:typing.Union[None,datetime.datetime,datetime.timedelta]=None,
-        maxTime:typing.Union[None,datetime.datetime,datetime.timedelta]=None):
+        maxTime:typing.Union[None,datetime.datetime,datetime.timedelta]=None,
+        width:int=640,
+        height:int=480,
+        axes:bool=False):
         """
         get a pil image of this curve
 
@@ -170,16 +439,21 @@ class CurveInstance(typing.Generic[CurveValueT]):
             If the curve is infinite and there is no maxTime specified
             then the curve will be clamped to 1second,
             which may not be what you want.
+        :axes: draw a full matplotlib plot with axes and labels.
+            Otherwise the bare curve is drawn directly into the image,
+            which is much faster (eg, for thumbnails).
         """
         from PIL import Image
-        import io
-        fig,plt=self.getPlot(startTime,endTime,maxTime)
-        buf=io.BytesIO()
-        fig.savefig(buf,format='png',bbox_inches='tight')
+        if not axes:
+            _,ys=self.getPlotPoints(startTime,endTime,maxTime,width,
+                method='none',relative=True)
+            return rasterize(ys,width,height)
+        fig,plt=self.getPlot(startTime,endTime,maxTime,width,height)
+        # take the pixels straight from the canvas, with no png round trip
+        fig.canvas.draw()
+        img=Image.frombuffer('RGBA',fig.canvas.get_width_height(),
+            fig.canvas.buffer_rgba(),'raw','RGBA',0,1).copy()
         plt.close(fig)  # close figure to avoid memory leaks
-        buf.seek(0)
-        # Convert buffer to PIL image
-        img=Image.open(buf)
         return img
 
     def viewPlot(self,
@@ -194,5 +468,5 @@ class CurveInstance(typing.Generic[CurveValueT]):
             then the curve will be clamped to 1second,
             which may not be what you want.
         """
-        im=self.getPlotImage(startTime,endTime,maxTime)
+        im=self.getPlotImage(startTime,endTime,maxTime,axes=True)
         im.show()
@@ -0,0 +1,310 @@
+"""
+Play back many CurveInstances in real time with asyncio
+
+Rather than each curve having its own thread polling getValueAt(),
+one scheduler keeps all the live instances in a timer heap, sleeps
+until the next tick is due, evaluates every instance that is due
+in one batch per curve shape, then hands the values out to
+callbacks or asyncio queues.
+"""
+import typing
+import asyncio
+import datetime
+import heapq
+import inspect
+import itertools
+import time
+import numpy as np
+from .curveInstance import CurveInstance
+
+
+ValueCallback=typing.Callable[[CurveInstance,float,typing.Any],typing.Any]
+
+
+class ScheduledCurve:
+    """
+    A CurveInstance that is being played back by a CurveScheduler
+    """
+    def __init__(self,
+        instance:CurveInstance,
+        interval:float,
+        startClock:float,
+        callback:typing.Optional[ValueCallback]=None,
+        queue:typing.Optional[asyncio.Queue]=None):
+        """
+        :interval: seconds between ticks
+        :startClock: scheduler clock time of instance.startTime
+        :callback: called with (instance,relativeTime,value) every tick
+            (if it returns an awaitable, that is run as a task)
+        :queue: (relativeTime,value) is put on it every tick
+        """
+        self.instance:CurveInstance=instance
+        self.interval:float=interval
+        self.startClock:float=startClock
+        self.endClock:float=startClock+(instance.endNs-instance.startNs)*1e-9
+        self.callback=callback
+        self.queue=queue
+        self.tick:int=0 # the next tick to deliver
+        self.active:bool=True
+
+    @property
+    def nextTime(self)->float:
+        """
+        Relative time (seconds since the instance started) of the next tick
+        """
+        return self.tick*self.interval
+
+    @property
+    def nextClock(self)->float:
+        """
+        Scheduler clock time when the next tick is due
+        """
+        return self.startClock+self.nextTime
+
+
+class SchedulerMetrics:
+    """
+    How well a CurveScheduler is keeping up
+    """
+    def __init__(self):
+        self.ticks:int=0 # values delivered
+        self.wakeups:int=0
+        self.missedTicks:int=0 # ticks skipped because we were too late
+        self.retired:int=0 # instances that have reached their end
+        self.lastJitter:float=0.0 # seconds late of the last batch
+        self.maxJitter:float=0.0
+        self.totalJitter:float=0.0
+        self.backlog:int=0 # how many instances were due at the last wakeup
+        self.maxBacklog:int=0
+
+    @property
+    def meanJitter(self)->float:
+        """
+        Average seconds late per wakeup
+        """
+        if self.wakeups==0:
+            return 0.0
+        return self.totalJitter/self.wakeups
+
+    def __repr__(self):
+        return f'SchedulerMetrics(ticks={self.ticks},missedTicks={self.missedTicks},meanJitter={self.meanJitter},maxJitter={self.maxJitter},maxBacklog={self.maxBacklog})' # noqa: E501 # pylint: disable=line-too-long
+
+
+class CurveScheduler:
+    """
+    Play back many CurveInstances in real time with asyncio
+
+    Usage:
+        scheduler=CurveScheduler()
+        scheduler.add(instance,datetime.timedelta(milliseconds=10),callback)
+        await scheduler.run()
+    """
+    def __init__(self,
+        clock:typing.Callable[[],float]=time.monotonic,
+        catchUp:bool=False):
+        """
+        :clock: returns the current time in seconds
+        :catchUp: if we fall behind, deliver every missed tick (True)
+            or skip ahead to the current one (False)
+        """
+        self.clock=clock
+        self.catchUp=catchUp
+        self.metrics=SchedulerMetrics()
+        self._heap:typing.List[typing.Tuple[float,int,ScheduledCurve]]=[]
+        self._sequence=itertools.count()
+        self._wakeup:typing.Optional[asyncio.Event]=None
+        self._running:bool=False
+
+    def __len__(self)->int:
+        return len(self._heap)
+
+    def add(self,
+        instance:CurveInstance,
+        interval:typing.Union[float,datetime.timedelta],
+        callback:typing.Optional[ValueCallback]=None,
+        queue:typing.Optional[asyncio.Queue]=None
+        )->ScheduledCurve:
+        """
+        Start playing back a curve instance
+
+        :interval: time between ticks (seconds or a timedelta)
+        """
+        if isinstance(interval,datetime.timedelta):
+            interval=interval.total_seconds()
+        if interval<=0:
+            raise ValueError('interval must be positive')
+        if self.clock is time.monotonic:
+            startClock=instance.startSeconds
+        else:
+            # map the instance's start onto our clock
+            startClock=self.clock()+(
+                instance.startNs-time.monotonic_ns())*1e-9
+        entry=ScheduledCurve(instance,interval,startClock,callback,queue)
+        self._push(entry)
+        return entry
+
+    def remove(self,entry:ScheduledCurve)->None:
+        """
+        Stop playing back a curve instance
+
+        (It is dropped from the heap the next time it comes up)
+        """
+        entry.active=False
+
+    def _push(self,entry:ScheduledCurve)->None:
+        """
+        Put an entry on the heap, waking up run() if it is now first
+        """
+        heapq.heappush(self._heap,
+            (entry.nextClock,next(self._sequence),entry))
+        if self._wakeup is not None and self._heap[0][2] is entry:
+            self._wakeup.set()
+
+    def stop(self)->None:
+        """
+        Make run() return
+        """
+        self._running=False
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def run(self,stopWhenEmpty:bool=False)->None:
+        """
+        Run until stop() is called
+
+        :stopWhenEmpty: also return when every instance has ended
+        """
+        self._wakeup=asyncio.Event()
+        self._running=True
+        try:
+            while self._running:
+                if not self._heap:
+                    if stopWhenEmpty:
+                        return
+                    await self._wakeup.wait()
+                    self._wakeup.clear()
+                    continue
+                delay=self._heap[0][0]-self.clock()
+                if delay>0:
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(),delay)
+                    except asyncio.TimeoutError:
+                        pass
+                    self._wakeup.clear()
+                    continue
+                self.runDue()
+        finally:
+            self._wakeup=None
+            self._running=False
+
+    def runDue(self,now:typing.Optional[float]=None)->int:
+        """
+        Deliver every tick that is due now
+
+        This is what run() calls, but it can also be called directly
+        to drive the scheduler from some other loop.
+
+        Returns how many values were delivered
+        """
+        if now is None:
+            now=self.clock()
+        due:typing.List[ScheduledCurve]=[]
+        heap=self._heap
+        while heap and heap[0][0]<=now:
+            dueClock,_,entry=heapq.heappop(heap)
+            if not entry.active:
+                continue
+            if not due:
+                jitter=now-dueClock
+                metrics=self.metrics
+                metrics.wakeups+=1
+                metrics.lastJitter=jitter
+                metrics.totalJitter+=jitter
+                metrics.maxJitter=max(metrics.maxJitter,jitter)
+            due.append(entry)
+        if not due:
+            return 0
+        self.metrics.backlog=len(due)
+        self.metrics.maxBacklog=max(self.metrics.maxBacklog,len(due))
+        self._evaluate(due,now)
+        for entry in due:
+            self._advance(entry)
+        return len(due)
+
+    def _evaluate(self,due:typing.List[ScheduledCurve],now:float)->None:
+        """
+        Evaluate all due entries, in one batch per curve shape,
+        and deliver the values
+        """
+        byShape:typing.Dict[int,typing.List[ScheduledCurve]]={}
+        for entry in due:
+            if not self.catchUp:
+                self._skipMissed(entry,now)
+            byShape.setdefault(
+                id(entry.instance.curveShape),[]).append(entry)
+        for entries in byShape.values():
+            ticks=[]
+            for entry in entries:
+                lastTick=entry.tick
+                if self.catchUp:
+                    lastTick=max(int((now-entry.startClock)/entry.interval),
+                        entry.tick)
+                    lastTick=min(lastTick,self._finalTick(entry))
+                ticks.append(range(entry.tick,lastTick+1))
+            times=np.fromiter(
+                (tick*entry.interval
+                    for entry,entryTicks in zip(entries,ticks)
+                    for tick in entryTicks),
+                dtype=float)
+            values=entries[0].instance.curveShape.getValuesAt(times).tolist()
+            i=0
+            for entry,entryTicks in zip(entries,ticks):
+                for tick in entryTicks:
+                    self._deliver(entry,tick*entry.interval,values[i])
+                    i+=1
+                entry.tick=entryTicks.stop-1
+
+    def _skipMissed(self,entry:ScheduledCurve,now:float)->None:
+        """
+        If we are late, jump ahead to the latest tick that is due
+        """
+        latest=int((now-entry.startClock)/entry.interval)
+        latest=min(latest,self._finalTick(entry))
+        if latest>entry.tick:
+            self.metrics.missedTicks+=latest-entry.tick
+            entry.tick=latest
+
+    def _finalTick(self,entry:ScheduledCurve)->int:
+        """
+        The last tick at or before the end of the instance
+        """
+        if entry.endClock==float('inf'):
+            return np.iinfo(np.int64).max
+        return int((entry.endClock-entry.startClock)/entry.interval+1e-9)
+
+    def _deliver(self,
+        entry:ScheduledCurve,
+        relativeTime:float,
+        value:typing.Any
+        )->None:
+        """
+        Hand a value to the entry's callback and/or queue
+        """
+        self.metrics.ticks+=1
+        if entry.queue is not None:
+            entry.queue.put_nowait((relativeTime,value))
+        if entry.callback is not None:
+            result=entry.callback(entry.instance,relativeTime,value)
+            if inspect.isawaitable(result):
+                asyncio.ensure_future(result)
+
+    def _advance(self,entry:ScheduledCurve)->None:
+        """
+        Move an entry on to its next tick, or retire it
+        """
+        entry.tick+=1
+        if entry.tick>self._finalTick(entry):
+            entry.active=False
+            self.metrics.retired+=1
+            return
+        self._push(entry)
@@ -4,12 +4,83 @@ Base class for any type of abstract curve
 import typing
 from abc import abstractmethod
 import datetime
+import itertools
+import numpy as np
 from .curveValueT import CurveValueT
 from .endTreatment import END_TREATMENT
 if typing.TYPE_CHECKING:
     from curveInstance import CurveInstance
 
 
+BLOCK_SIZE=65536 # how many points to calculate at a time when streaming
+
+# the spacing of the points that projections are fitted to,
+# as a fraction of the duration
+PROJECTION_SPACING=0.01
+
+# end treatments that move positions back inside the curve
+REMAPPINGS=(END_TREATMENT.CLAMP,END_TREATMENT.LOOP,END_TREATMENT.REFLECT)
+
+# end treatments that extrapolate past the end of the curve
+PROJECTIONS=(END_TREATMENT.LINEAR_PROJECTION,END_TREATMENT.CUBIC_PROJECTION)
+
+
+def positionCount(start:float,stop:float,step:float)->int:
+    """
+    How many points there are in start<=x<stop for a given step
+    """
+    count=(stop-start)/step
+    if not np.isfinite(count):
+        raise ValueError('Cannot calculate an infinite number of points')
+    # allow for a little float rounding so stop is not included
+    return max(int(np.ceil(count-1e-9)),0)
+
+
+def remapPositions(
+    positions:typing.Union[float,np.ndarray],
+    treatment:END_TREATMENT,
+    duration:float
+    )->typing.Union[float,np.ndarray]:
+    """
+    Move positions outside of 0..duration back inside, by
+    clamping, looping or reflecting
+
+    (An infinite or zero duration cannot loop or reflect
+    past the end, so it is clamped instead)
+    """
+    if treatment!=END_TREATMENT.CLAMP and 0<duration<np.inf:
+        positions=np.asarray(positions,dtype=float)
+        period=duration if treatment==END_TREATMENT.LOOP else 2*duration
+        # positions mod period, done in place since np.mod is slow
+        remapped=np.array(positions,dtype=float)
+        remapped/=period
+        np.floor(remapped,out=remapped)
+        remapped*=-period
+        remapped+=positions
+        if treatment==END_TREATMENT.LOOP:
+            # keep the end itself, rather than looping it to 0
+            remapped[positions==duration]=duration
+        else:
+            remapped-=duration
+            np.abs(remapped,out=remapped)
+            np.subtract(duration,remapped,out=remapped)
+        return remapped[()]
+    if treatment==END_TREATMENT.REFLECT and duration==np.inf:
+        return np.abs(positions)
+    return np.clip(positions,0,duration)
+
+
+def positionRange(start:float,stop:float,step:float)->np.ndarray:
+    """
+    Like np.arange() but calculates each point as start+i*step
+    so that float steps do not accumulate rounding errors
+    """
+    positions=np.arange(positionCount(start,stop,step),dtype=float)
+    positions*=step
+    positions+=start
+    return positions
+
+
 class CurveShape(typing.Generic[CurveValueT]):
     """
     Base class for any type of abstract waveform curve
@@ -20,6 +91,9 @@ class CurveShape(typing.Generic[CurveValueT]):
     or if you don't care about all values,you can waveform.range(10.5,0.5,11.5)
     """
 
+    _projections:typing.Optional[
+        typing.Dict[typing.Tuple[END_TREATMENT,bool],np.ndarray]]=None
+
     def __init__(self,
         atStart:END_TREATMENT=END_TREATMENT.CLAMP,
         atEnd:END_TREATMENT=END_TREATMENT.CLAMP):
@@ -30,12 +104,17 @@ class CurveShape(typing.Generic[CurveValueT]):
     @typing.overload
     def __getitem__(self,idx:float)->CurveValueT: ...
     @typing.overload
-    def __getitem__(self,idx:typing.Iterable[float])->typing.List[CurveValueT]: ...
+    def __getitem__(self,idx:typing.Union[slice,typing.Iterable[float]])->np.ndarray: ...
     def __getitem__(self,
-        idx:typing.Union[float,typing.Iterable[float]]
-        )->typing.Union[CurveValueT,typing.List[CurveValueT]]:
+        idx:typing.Union[float,slice,typing.Iterable[float]]
+        )->typing.Union[CurveValueT,np.ndarray]:
+        if isinstance(idx,slice):
+            start=0.0 if idx.start is None else idx.start
+            stop=self.duration if idx.stop is None else idx.stop
+            step=1.0 if idx.step is None else idx.step
+            return self.getMany(positionRange(start,stop,step))
         if isinstance(idx,typing.Iterable):
-            return [x for x in self.iterate(idx)]
+            return self.getMany(np.asarray(idx,dtype=float))
         return self.get(idx)
 
     def __iter__(self)->typing.Generator[CurveValueT,None,None]:
@@ -45,27 +124,170 @@ class CurveShape(typing.Generic[CurveValueT]):
         )->typing.Generator[CurveValueT,None,None]:
         """
         Iterate over a series of x points and return their corresponding y points
+
+        The values are calculated BLOCK_SIZE points at a time
+        """
+        for chunk in self.iterChunks(start,stop,step):
+            yield from chunk.tolist()
+
+    def iterChunks(self,
+        start:float=0.0,
+        stop:typing.Optional[float]=None,
+        step:float=1.0,
+        chunkSize:int=BLOCK_SIZE
+        )->typing.Generator[np.ndarray,None,None]:
+        """
+        Lazily get values as a series of arrays, chunkSize at a time
+
+        If there is no stop, this goes to the end of the curve,
+        or for an infinite curve, keeps going forever.
         """
-        return self.iterate(range(start,step,stop)) # type: ignore
+        if stop is None and self.hasEndpoint:
+            stop=self.duration
+        count=None
+        if stop is not None:
+            count=positionCount(start,stop,step)
+        chunkStart=0
+        while count is None or chunkStart<count:
+            chunkStop=chunkStart+chunkSize
+            if count is not None:
+                chunkStop=min(chunkStop,count)
+            positions=np.arange(chunkStart,chunkStop,dtype=float)
+            positions*=step
+            positions+=start
+            yield self.getMany(positions)
+            chunkStart=chunkStop
 
     def iterate(self,itr:typing.Iterable[float]
         )->typing.Generator[CurveValueT,None,None]:
         """
         Iterate over a series of x points and return their corresponding y points
+
+        The values are calculated BLOCK_SIZE points at a time
         """
-        for idx in itr:
-            yield self[idx]
+        itr=iter(itr)
+        while True:
+            positions=np.fromiter(
+                itertools.islice(itr,BLOCK_SIZE),dtype=float)
+            if positions.size==0:
+                return
+            yield from self.getMany(positions).tolist()
 
     def get(self,idx:float)->CurveValueT:
         """
         Get a single value
+
+        Outside of the curve, atStart or atEnd says what to do
         """
-        _=idx
-        if self.atEnd==END_TREATMENT.NONE:
+        duration=self.duration
+        if 0<=idx<=duration:
+            return self.getValueAt(idx)
+        if idx<0:
+            treatment,edge=self.atStart,0.0
+        else:
+            treatment,edge=self.atEnd,duration
+        if treatment==END_TREATMENT.NONE:
             return None # type: ignore
-        if self.atEnd==END_TREATMENT.INDEX_ERROR:
+        if treatment==END_TREATMENT.INDEX_ERROR:
             raise IndexError()
-        return 0 # type: ignore
+        if treatment in PROJECTIONS:
+            return np.polyval( # type: ignore
+                self.projection(treatment,idx>0),idx-edge)
+        return self.getValueAt(remapPositions(idx,treatment,duration))
+
+    def getMany(self,idxs:np.ndarray)->np.ndarray:
+        """
+        Get an array of values all at once
+
+        This is the bulk version of get().  Values that would
+        be None are returned as nan.
+
+        Positions outside of the curve are first remapped
+        according to atStart and atEnd, then everything is
+        evaluated in a single getValuesAt() call.
+        """
+        idxs=np.asarray(idxs,dtype=float)
+        duration=self.duration
+        if idxs.size==0 or (idxs.min()>=0 and idxs.max()<=duration):
+            return self.getValuesAt(idxs)
+        if self.atStart==self.atEnd and self.atStart in REMAPPINGS:
+            # the same on both ends, so remap the whole array at once
+            # (positions inside the curve are not changed by this)
+            return self.getValuesAt(
+                remapPositions(idxs,self.atStart,duration))
+        below=idxs<0
+        above=idxs>duration
+        sides=[]
+        if below.any():
+            sides.append((below,self.atStart,0.0,False))
+        if above.any():
+            sides.append((above,self.atEnd,duration,True))
+        for _,treatment,_,_ in sides:
+            if treatment==END_TREATMENT.INDEX_ERROR:
+                raise IndexError()
+        positions=idxs.copy()
+        for mask,treatment,edge,_ in sides:
+            if treatment in REMAPPINGS:
+                positions[mask]=remapPositions(
+                    idxs[mask],treatment,duration)
+            else:
+                positions[mask]=edge # anywhere valid, it is replaced
+        values=np.asarray(self.getValuesAt(positions),dtype=float)
+        for mask,treatment,edge,atEnd in sides:
+            if treatment==END_TREATMENT.NONE:
+                values[mask]=np.nan
+            elif treatment in PROJECTIONS:
+                values[mask]=np.polyval(
+                    self.projection(treatment,atEnd),idxs[mask]-edge)
+        return values
+
+    def projection(self,
+        treatment:END_TREATMENT,
+        atEnd:bool=True
+        )->np.ndarray:
+        """
+        Get the polynomial (highest power first, of the distance
+        past the edge) used to project past one end of the curve
+
+        These are only calculated once per curve, so call
+        resetProjections() if the curve changes shape.
+        """
+        if self._projections is None:
+            self._projections={}
+        key=(treatment,atEnd)
+        coefficients=self._projections.get(key)
+        if coefficients is None:
+            coefficients=self._calculateProjection(treatment,atEnd)
+            self._projections[key]=coefficients
+        return coefficients
+
+    def resetProjections(self)->None:
+        """
+        Throw away projection polynomials, because the curve has changed
+        """
+        self._projections=None
+
+    def _calculateProjection(self,
+        treatment:END_TREATMENT,
+        atEnd:bool
+        )->np.ndarray:
+        """
+        Fit a line (or cubic) to points just inside one end
+        """
+        duration=self.duration
+        spacing=PROJECTION_SPACING
+        if np.isfinite(duration):
+            spacing*=duration
+        degree=3 if treatment==END_TREATMENT.CUBIC_PROJECTION else 1
+        # distances from the edge, going inwards
+        offsets=np.arange(degree+1,dtype=float)*spacing
+        if atEnd:
+            offsets=-offsets
+            edge=duration
+        else:
+            edge=0.0
+        values=np.asarray(self.getValuesAt(edge+offsets),dtype=float)
+        return np.polyfit(offsets,values,degree)
 
     @abstractmethod
     def getValueAt(self,relativeTime:float)->CurveValueT:
@@ -74,6 +296,20 @@ class CurveShape(typing.Generic[CurveValueT]):
         """
         raise NotImplementedError()
 
+    def getValuesAt(self,relativeTimes:np.ndarray)->np.ndarray:
+        """
+        get the values of the curve at an array of points in time
+
+        This fallback calls getValueAt() once per point, so
+        subclasses should override it with something that
+        works on the whole array.
+        """
+        relativeTimes=np.asarray(relativeTimes,dtype=float)
+        values=np.fromiter(
+            (self.getValueAt(t) for t in relativeTimes.flat),
+            dtype=float,count=relativeTimes.size)
+        return values.reshape(relativeTimes.shape)
+
     @property
     def duration(self)->float:
         """
@@ -115,6 +351,6 @@ class CurveShape(typing.Generic[CurveValueT]):
         """
         Create a new instance of this particular curve
         """
-        from curveInstance import CurveInstance
+        from .curveInstance import CurveInstance
         return CurveInstance[CurveValueT](self,startTime)
     startInstance=startCurveInstance
\ No newline at end of file
@@ -3,5 +3,17 @@ Perform mathematical operations on curves
 """
 from .percent import *
 from .curveBase import *
+from .curveStats import *
+from .correlation import *
 from .gaussianCurve import *
 from .splineCurve import *
+from .constantCurve import *
+from .curveExpression import *
+from .curveCompiler import *
+from .parallel import *
+from .curveBank import *
+from .summaryPyramid import *
+from .polynomialFitter import *
+from .piecewisePolynomialCurve import *
+from .lookupTableCurve import *
+from .sampleCache import *
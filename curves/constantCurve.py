@@ -0,0 +1,58 @@
+"""
+A curve that is the same value everywhere
+"""
+import numpy as np
+from .curveBase import CurveBase,CurveValueT,CurveTimeValue
+
+
+class ConstantCurve(CurveBase[CurveValueT]):
+    """
+    A curve that is the same value everywhere
+
+    Mostly this is how plain numbers take part in curve math
+    """
+
+    releasesGil=True
+    def __init__(self,value:CurveValueT):
+        self.value=value
+
+    @property
+    def value(self)->CurveValueT:
+        """
+        The value of the curve
+        """
+        return self._value
+    @value.setter
+    def value(self,value:CurveValueT):
+        self._value=value
+        self._modified()
+
+    @property
+    def start(self)->CurveTimeValue:
+        """
+        Start time of the curve
+        """
+        return float("-Inf")
+
+    @property
+    def end(self)->CurveTimeValue:
+        """
+        End time of the curve
+        """
+        return float("Inf")
+
+    def valueAt(self,position:CurveTimeValue)->CurveValueT:
+        """
+        Get value at a given point
+        """
+        return self.value
+
+    def valuesAt(self,positions:np.ndarray)->np.ndarray:
+        """
+        Get values at an array of points all at once
+        """
+        return np.full(np.shape(positions),self.value,
+            dtype=np.result_type(float,self.value))
+
+    def __repr__(self):
+        return repr(self.value)
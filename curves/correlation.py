@@ -0,0 +1,158 @@
+"""
+Cross-correlation of sampled curves
+"""
+import typing
+import numpy as np
+import scipy.fft
+import scipy.signal
+
+
+# fft correlation is roughly this many times more expensive per
+# element*log2(elements) than a direct multiply-add
+FFT_COST_FACTOR=10.0
+
+WindowType=typing.Union[None,str,typing.Tuple[typing.Any,...],np.ndarray]
+
+
+def chooseCorrelationMethod(
+    aLength:int,
+    bLength:int,
+    lagCount:typing.Optional[int]=None
+    )->str:
+    """
+    Decide whether 'direct' or 'fft' correlation will be faster
+
+    :lagCount: how many lags are wanted (default=all of them)
+    """
+    fullLength=aLength+bLength-1
+    if lagCount is None:
+        lagCount=fullLength
+    directCost=float(lagCount)*min(aLength,bLength)
+    fftLength=scipy.fft.next_fast_len(fullLength)
+    fftCost=FFT_COST_FACTOR*fftLength*np.log2(max(fftLength,2))
+    return 'direct' if directCost<=fftCost else 'fft'
+
+
+class CorrelationResult:
+    """
+    The result of cross-correlating a with b
+
+    values[i] is sum(a[n+lags[i]]*b[n]) after the means have been
+    removed (and windowing applied, if any).
+    """
+    def __init__(self,
+        lags:np.ndarray,
+        values:np.ndarray,
+        energy:float,
+        method:str):
+        """
+        :energy: sqrt(sum(a**2)*sum(b**2)) used to normalize values
+        """
+        self.lags:np.ndarray=lags
+        self.values:np.ndarray=values
+        self.energy:float=energy
+        self.method:str=method
+
+    @property
+    def normalized(self)->np.ndarray:
+        """
+        Correlation values normalized to the range -1..1
+        """
+        if self.energy==0:
+            return np.zeros_like(self.values)
+        return self.values/self.energy
+
+    @property
+    def peakIndex(self)->int:
+        """
+        Index of the strongest (positive) correlation
+        """
+        return int(np.argmax(self.values))
+
+    @property
+    def peakLag(self)->int:
+        """
+        The lag, in samples, where a best lines up with b
+        """
+        return int(self.lags[self.peakIndex])
+
+    @property
+    def peak(self)->float:
+        """
+        The normalized correlation at peakLag
+        """
+        return float(self.normalized[self.peakIndex])
+
+    @property
+    def rSquared(self)->float:
+        """
+        r-squared at the best alignment
+        """
+        return self.peak**2
+
+    def __repr__(self):
+        return f'CorrelationResult(peakLag={self.peakLag},peak={self.peak},method={self.method!r})' # noqa: E501 # pylint: disable=line-too-long
+
+
+def _prepare(values:np.ndarray,window:WindowType)->np.ndarray:
+    """
+    Remove the mean and apply any window
+    """
+    values=np.asarray(values,dtype=float)
+    values=values-np.mean(values) if len(values) else values
+    if window is None:
+        return values
+    if not isinstance(window,np.ndarray):
+        window=scipy.signal.get_window(window,len(values))
+    return values*window
+
+
+def _directCorrelate(a:np.ndarray,b:np.ndarray,lags:np.ndarray)->np.ndarray:
+    """
+    Direct correlation at only the given lags
+    """
+    values=np.empty(len(lags),dtype=float)
+    for i,lag in enumerate(lags):
+        if lag>=0:
+            x=a[lag:lag+len(b)]
+            y=b[:len(x)]
+        else:
+            y=b[-lag:]
+            x=a[:len(y)]
+            y=y[:len(x)]
+        values[i]=np.dot(x,y)
+    return values
+
+
+def crossCorrelate(
+    a:np.ndarray,
+    b:np.ndarray,
+    maxLag:typing.Optional[int]=None,
+    method:str='auto',
+    window:WindowType=None
+    )->CorrelationResult:
+    """
+    Cross-correlate two arrays
+
+    :maxLag: only calculate lags in -maxLag..maxLag
+    :method: 'direct', 'fft', or 'auto' to pick whichever is faster
+    :window: a window to apply to both, either an array or anything
+        scipy.signal.get_window() understands, eg 'hann'
+    """
+    a=_prepare(a,window)
+    b=_prepare(b,window)
+    lags=scipy.signal.correlation_lags(len(a),len(b),mode='full')
+    if maxLag is not None:
+        lags=lags[np.abs(lags)<=maxLag]
+    if method=='auto':
+        method=chooseCorrelationMethod(len(a),len(b),len(lags))
+    if method=='fft' or maxLag is None:
+        values=scipy.signal.correlate(a,b,mode='full',method=method)
+        if maxLag is not None:
+            values=values[lags+(len(b)-1)]
+    elif method=='direct':
+        values=_directCorrelate(a,b,lags)
+    else:
+        raise ValueError(f'Unknown correlation method "{method}"')
+    energy=float(np.sqrt(np.dot(a,a)*np.dot(b,b)))
+    return CorrelationResult(lags,values,energy,method)
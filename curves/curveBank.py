@@ -0,0 +1,402 @@
+"""
+Many curves of the same type, evaluated all at once
+"""
+import typing
+from abc import abstractmethod
+import numpy as np
+from .curveBase import CurveBase,CurveTimeValue
+from .gaussianCurve import GaussianCurve,SQRT_2PI
+from .quadraticCurve import QuadraticCurve
+
+
+# keep (curves x positions) blocks to about this many elements
+MAX_BLOCK_ELEMENTS=1<<22
+
+
+def _readOnlyCopy(values:np.ndarray,ndmin:int=0)->np.ndarray:
+    """
+    Copy parameters into a float array that cannot be changed in place
+    """
+    values=np.array(values,dtype=float,ndmin=ndmin)
+    values.flags.writeable=False
+    return values
+
+
+class CurveBank:
+    """
+    Many curves of the same type, evaluated all at once
+
+    Rather than each curve being a separate python object, the
+    parameters of all of them are kept in contiguous arrays,
+    so that they can all be evaluated over a shared set of
+    positions in one broadcasted operation, giving
+    a (curves x positions) matrix.
+
+    The parameter arrays are read-only, so that anything that
+    caches values notices changes.  Assign new arrays instead.
+    """
+
+    _version:int=0
+
+    @staticmethod
+    def fromCurves(curves:typing.Iterable[CurveBase])->"CurveBank":
+        """
+        Create the right kind of CurveBank for a list of curves
+        """
+        curves=list(curves)
+        if not curves:
+            raise ValueError('Cannot tell what kind of bank to create for no curves') # noqa: E501 # pylint: disable=line-too-long
+        curveType=type(curves[0])
+        bankType=CURVE_BANK_TYPES.get(curveType)
+        if bankType is None:
+            raise TypeError(f'There is no CurveBank for {curveType}')
+        for curve in curves:
+            if not isinstance(curve,curveType):
+                raise TypeError(f'All curves in a bank must be {curveType}') # noqa: E501 # pylint: disable=line-too-long
+        return bankType.fromCurves(curves)
+
+    @property
+    def version(self)->int:
+        """
+        Changes whenever the parameters are assigned
+        """
+        return self._version
+
+    def _modified(self)->None:
+        """
+        Call this whenever the parameters change
+        """
+        self._version=self.version+1
+
+    @abstractmethod
+    def __len__(self)->int:
+        """
+        How many curves are in the bank
+        """
+
+    @abstractmethod
+    def __getitem__(self,idx:int)->CurveBase:
+        """
+        Get one of the curves as a separate curve object
+        """
+
+    def __iter__(self)->typing.Iterator[CurveBase]:
+        return (self[i] for i in range(len(self)))
+
+    @property
+    @abstractmethod
+    def start(self)->CurveTimeValue:
+        """
+        The earliest default sample position of any curve
+        """
+
+    @property
+    @abstractmethod
+    def end(self)->CurveTimeValue:
+        """
+        The latest default sample position of any curve
+        """
+
+    @abstractmethod
+    def valuesAt(self,
+        positions:np.ndarray,
+        out:typing.Optional[np.ndarray]=None
+        )->np.ndarray:
+        """
+        Get the values of every curve at every position
+
+        Returns a (curves x positions) array
+
+        :out: optional (curves x positions) array to put the results in
+        """
+
+    def samples(self,
+        start:CurveTimeValue,
+        stop:CurveTimeValue,
+        step:CurveTimeValue=1
+        )->np.ndarray:
+        """
+        Get a block of samples from every curve
+
+        Returns a (curves x samples) array
+        """
+        return self.valuesAt(np.arange(start,stop,step,dtype=float))
+
+    def sum(self,
+        weights:typing.Optional[np.ndarray]=None
+        )->"CurveBankSum":
+        """
+        A curve that is the (optionally weighted) sum of all the curves
+        """
+        return CurveBankSum(self,weights)
+
+    def mixture(self,
+        weights:typing.Optional[np.ndarray]=None
+        )->"CurveBankSum":
+        """
+        A curve that is a mixture of all the curves
+
+        This is a weighted sum where the weights add up to 1
+        (default is all curves weighted equally)
+        """
+        if weights is None:
+            weights=np.ones(len(self))
+        weights=np.asarray(weights,dtype=float)
+        return CurveBankSum(self,weights/np.sum(weights))
+
+
+class GaussianCurveBank(CurveBank):
+    """
+    Many GaussianCurves, evaluated all at once
+    """
+    def __init__(self,means:np.ndarray,stdevs:np.ndarray):
+        self.means=means
+        self.stdevs=stdevs
+        if self._means.shape!=self._stdevs.shape:
+            raise ValueError('There must be the same number of means and stdevs') # noqa: E501 # pylint: disable=line-too-long
+
+    @classmethod
+    def fromCurves(cls,
+        curves:typing.Iterable[CurveBase]
+        )->"GaussianCurveBank":
+        """
+        Create a bank from a list of GaussianCurves
+        """
+        curves=typing.cast(typing.List[GaussianCurve],list(curves))
+        return cls(
+            np.fromiter((curve.mean for curve in curves),dtype=float),
+            np.fromiter((curve.stdev for curve in curves),dtype=float))
+
+    @property
+    def means(self)->np.ndarray:
+        """
+        The mean of each curve
+
+        (Read-only, assign a new array to change them)
+        """
+        return self._means
+    @means.setter
+    def means(self,means:np.ndarray):
+        self._means=_readOnlyCopy(means)
+        self._modified()
+
+    @property
+    def stdevs(self)->np.ndarray:
+        """
+        The standard deviation of each curve
+
+        (Read-only, assign a new array to change them)
+        """
+        return self._stdevs
+    @stdevs.setter
+    def stdevs(self,stdevs:np.ndarray):
+        self._stdevs=_readOnlyCopy(stdevs)
+        self._modified()
+
+    def __len__(self)->int:
+        return len(self._means)
+
+    def __getitem__(self,idx:int)->GaussianCurve:
+        return GaussianCurve(float(self._means[idx]),float(self._stdevs[idx]))
+
+    @property
+    def start(self)->CurveTimeValue:
+        """
+        The earliest default sample position of any curve
+        """
+        return 0
+
+    @property
+    def end(self)->CurveTimeValue:
+        """
+        The latest default sample position of any curve
+        """
+        return 2*float(np.max(self._stdevs))
+
+    def valuesAt(self,
+        positions:np.ndarray,
+        out:typing.Optional[np.ndarray]=None
+        )->np.ndarray:
+        """
+        Get the values of every curve at every position
+
+        Returns a (curves x positions) array
+
+        :out: optional (curves x positions) array to put the results in
+        """
+        positions=np.asarray(positions,dtype=float).reshape(-1)
+        if out is None:
+            out=np.empty((len(self),len(positions)),dtype=float)
+        np.subtract(positions[np.newaxis,:],self._means[:,np.newaxis],
+            out=out)
+        np.square(out,out=out)
+        out*=(-0.5/self._stdevs**2)[:,np.newaxis]
+        np.exp(out,out=out)
+        out*=(1/(self._stdevs*SQRT_2PI))[:,np.newaxis]
+        return out
+
+
+class QuadraticCurveBank(CurveBank):
+    """
+    Many QuadraticCurves, evaluated all at once
+
+    Curves of lower order are padded with leading zero coefficients
+    """
+    def __init__(self,coefficients:np.ndarray):
+        """
+        :coefficients: a (curves x order) array, highest power first
+        """
+        self.coefficients=coefficients
+
+    @classmethod
+    def fromCurves(cls,
+        curves:typing.Iterable[CurveBase]
+        )->"QuadraticCurveBank":
+        """
+        Create a bank from a list of QuadraticCurves
+        """
+        curves=typing.cast(typing.List[QuadraticCurve],list(curves))
+        if any(curve.isComplex for curve in curves):
+            raise ValueError('A QuadraticCurveBank cannot hold complex coefficients') # noqa: E501 # pylint: disable=line-too-long
+        order=max(curve.order for curve in curves)
+        coefficients=np.zeros((len(curves),order),dtype=float)
+        for row,curve in zip(coefficients,curves):
+            row[order-curve.order:]=curve.coeffients
+        return cls(coefficients)
+
+    @property
+    def coefficients(self)->np.ndarray:
+        """
+        The (curves x order) coefficients, highest power first
+
+        (Read-only, assign a new array to change them)
+        """
+        return self._coefficients
+    @coefficients.setter
+    def coefficients(self,coefficients:np.ndarray):
+        self._coefficients=_readOnlyCopy(coefficients,2)
+        self._modified()
+
+    def __len__(self)->int:
+        return len(self._coefficients)
+
+    def __getitem__(self,idx:int)->QuadraticCurve:
+        return QuadraticCurve(self._coefficients[idx].copy())
+
+    @property
+    def start(self)->CurveTimeValue:
+        """
+        The earliest default sample position of any curve
+        """
+        return float("-Inf")
+
+    @property
+    def end(self)->CurveTimeValue:
+        """
+        The latest default sample position of any curve
+        """
+        return float("Inf")
+
+    def valuesAt(self,
+        positions:np.ndarray,
+        out:typing.Optional[np.ndarray]=None
+        )->np.ndarray:
+        """
+        Get the values of every curve at every position
+
+        Returns a (curves x positions) array
+
+        :out: optional (curves x positions) array to put the results in
+        """
+        positions=np.asarray(positions,dtype=float).reshape(-1)
+        if out is None:
+            out=np.empty((len(self),len(positions)),dtype=float)
+        # Horner's method, for all curves at once
+        out[:]=self._coefficients[:,:1]
+        for column in self._coefficients.T[1:]:
+            out*=positions[np.newaxis,:]
+            out+=column[:,np.newaxis]
+        return out
+
+
+CURVE_BANK_TYPES:typing.Dict[type,typing.Type[CurveBank]]={
+    GaussianCurve:GaussianCurveBank,
+    QuadraticCurve:QuadraticCurveBank}
+
+
+class CurveBankSum(CurveBase[float]):
+    """
+    A curve that is the weighted sum of all the curves in a CurveBank
+    """
+
+    releasesGil=True
+
+    def __init__(self,
+        bank:CurveBank,
+        weights:typing.Optional[np.ndarray]=None):
+        """
+        :weights: weight of each curve (default=all 1)
+        """
+        self.bank:CurveBank=bank
+        if weights is None:
+            weights=np.ones(len(bank))
+        self.weights=weights
+
+    @property
+    def weights(self)->np.ndarray:
+        """
+        Weight of each curve
+
+        (Read-only, assign a new array to change them)
+        """
+        return self._weights
+    @weights.setter
+    def weights(self,weights:np.ndarray):
+        self._weights=_readOnlyCopy(weights)
+        self._modified()
+
+    @property
+    def version(self)->int:
+        """
+        Changes whenever the weights or the bank are modified
+        """
+        return self._version+self.bank.version
+
+    @property
+    def start(self)->CurveTimeValue:
+        """
+        Start time of the curve
+        """
+        return self.bank.start
+
+    @property
+    def end(self)->CurveTimeValue:
+        """
+        End time of the curve
+        """
+        return self.bank.end
+
+    def valueAt(self,position:CurveTimeValue)->float:
+        """
+        Get value at a given point
+        """
+        return float(self.valuesAt(np.array([position]))[0])
+
+    def valuesAt(self,positions:np.ndarray)->np.ndarray:
+        """
+        Get values at an array of points all at once
+
+        The bank is evaluated a block of positions at a time,
+        so that the (curves x positions) matrix stays small
+        """
+        positions=np.asarray(positions,dtype=float)
+        flatPositions=positions.reshape(-1)
+        values=np.empty(len(flatPositions),dtype=float)
+        blockSize=max(MAX_BLOCK_ELEMENTS//max(len(self.bank),1),1)
+        matrix=np.empty((len(self.bank),min(blockSize,len(flatPositions))))
+        for blockStart in range(0,len(flatPositions),blockSize):
+            block=flatPositions[blockStart:blockStart+blockSize]
+            blockMatrix=self.bank.valuesAt(block,matrix[:,:len(block)])
+            np.dot(self.weights,blockMatrix,
+                out=values[blockStart:blockStart+len(block)])
+        return values.reshape(positions.shape)
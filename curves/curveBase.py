@@ -2,12 +2,18 @@
 Common base class for all curves
 """
 import typing
+import os
+import itertools
 from abc import abstractmethod
 import numpy as np
 from .percent import PercentCompatible,asPercent
 from .errors import NonDiscreteCurveException
+from .curveStats import CurveStats
+from .sampleCache import sampleCache
 if typing.TYPE_CHECKING:
-    from splineCurve import SplineCurve
+    from .splineCurve import SplineCurve
+    from .correlation import CorrelationResult,WindowType
+    from .lookupTableCurve import LookupTableCurve
 
 
 class NumberLike(typing.Protocol):
@@ -18,6 +24,7 @@ class NumberLike(typing.Protocol):
 CurveCompatible=typing.Union[
     float,int,
     np.ndarray,
+    str,os.PathLike,
     "CurveBase",
     typing.Iterable["CurveCompatible"]]
 
@@ -28,11 +35,14 @@ def asCurve(curve:CurveCompatible):
     If it is already a curve, return it.
     Otherwise, create a DiscretePointCurve
     to wrap it.
+
+    If it is the filename of a .npy file, open it (read-only)
+    as a MemmapDiscretePointCurve.
     """
     if isinstance(curve,CurveBase):
         return curve
-    from .discretePointCurve import DiscretePointCurve
-    return DiscretePointCurve(curve)
+    from .discretePointCurve import asDiscretePointCurve
+    return asDiscretePointCurve(curve)
 
 CurveTimeValue=float
 
@@ -41,6 +51,49 @@ class CurveBase(typing.Generic[CurveValueT]):
     """
     Common base class for all curves
     """
+
+    CHUNK_SIZE=65536 # default number of samples for iterChunks()
+
+    # whether valuesAt() spends its time in code that releases the
+    # GIL (eg, numpy), so that it can be run in parallel with threads
+    releasesGil:bool=False
+
+    _version:int=0
+    _statsCache:typing.Optional[typing.Tuple[int,CurveStats]]=None
+    _splineCache:typing.Optional[typing.Tuple[typing.Any,"SplineCurve"]]=None
+
+    @property
+    def version(self)->int:
+        """
+        A number that changes whenever the curve is modified,
+        so that anything cached about the curve can be thrown away
+        """
+        return self._version
+
+    def _modified(self)->None:
+        """
+        Derived classes call this whenever the curve changes
+        """
+        self._version=self.version+1
+
+    @property
+    def stats(self)->CurveStats:
+        """
+        Statistics about the values of the curve
+
+        These are all calculated in a single pass, a chunk
+        at a time, and kept until the curve is modified
+        """
+        version=self.version
+        cached=self._statsCache
+        if cached is not None and cached[0]==version:
+            return cached[1]
+        stats=CurveStats()
+        for chunk in self.iterChunks():
+            stats.add(chunk)
+        self._statsCache=(version,stats)
+        return stats
+
     @property
     def length(self)->CurveTimeValue:
         """
@@ -88,38 +141,74 @@ class CurveBase(typing.Generic[CurveValueT]):
         """
         Standard deviation
         """
-        return np.std(self.samples())
+        return self.stats.stdev
 
     @property
     def mean(self)->float:
         """
         Arithmatic mean
         """
-        return np.mean(self.samples())
+        return self.stats.mean
 
     @property
     def cov(self)->CurveValueT:
         """
         Coeffiencent of Variation
         """
-        return self.mean/self.stdev
+        stats=self.stats
+        return stats.mean/stats.stdev
 
-    def correlate(self,other:CurveCompatible)->float:
-        """
-        Compare with another curve and return an r-squared value
+    def correlate(self,
+        other:CurveCompatible,
+        start:typing.Optional[CurveTimeValue]=None,
+        stop:typing.Optional[CurveTimeValue]=None,
+        step:CurveTimeValue=1,
+        maxLag:typing.Optional[int]=None,
+        method:str='auto',
+        window:"WindowType"=None
+        )->"CorrelationResult":
         """
-        return np.correlate(self.samples(),asCurve(other).samples())
+        Cross-correlate with another curve
+
+        Uses direct or fft correlation, whichever will be faster.
 
-    def compare(self,other:CurveCompatible)->float:
+        :start,stop,step: the range of samples to correlate
+        :maxLag: only look at lags (in samples) in -maxLag..maxLag
+        :method: 'direct', 'fft', or 'auto'
+        :window: a window to apply to both, eg 'hann'
+        """
+        from .correlation import crossCorrelate
+        return crossCorrelate(
+            self.samples(start,stop,step),
+            asCurve(other).samples(start,stop,step),
+            maxLag=maxLag,method=method,window=window)
+
+    def compare(self,
+        other:CurveCompatible,
+        start:typing.Optional[CurveTimeValue]=None,
+        stop:typing.Optional[CurveTimeValue]=None,
+        step:CurveTimeValue=1,
+        maxLag:typing.Optional[int]=None
+        )->float:
         """
         Compare with another curve and return an r-squared value
+
+        This is at whatever lag lines the two curves up best.
         """
-        self.correlate(other)
-    def rSquared(self,other:CurveCompatible)->float:
+        return self.correlate(other,start,stop,step,maxLag).rSquared
+
+    def rSquared(self,
+        other:CurveCompatible,
+        start:typing.Optional[CurveTimeValue]=None,
+        stop:typing.Optional[CurveTimeValue]=None,
+        step:CurveTimeValue=1
+        )->float:
         """
         Compare with another curve and return an r-squared value
+
+        This is without shifting either curve.
         """
-        self.correlate(other)
+        return self.correlate(other,start,stop,step,maxLag=0).rSquared
 
     @abstractmethod
     def valueAt(self,position:CurveTimeValue)->CurveValueT:
@@ -132,13 +221,39 @@ class CurveBase(typing.Generic[CurveValueT]):
         """
         return self.valueAt(position)
 
-    def samples(self,
+    def valuesAt(self,positions:np.ndarray)->np.ndarray:
+        """
+        Get values at an array of points all at once
+
+        The result has the same shape as positions.
+
+        This fallback calls valueAt() once per point, so
+        subclasses should override it with something that
+        works on the whole array.
+        """
+        positions=np.asarray(positions,dtype=float)
+        values=np.fromiter(
+            (self.valueAt(position) for position in positions.flat),
+            dtype=float,count=positions.size)
+        return values.reshape(positions.shape)
+
+    def samplePositions(self,
         start:typing.Optional[CurveTimeValue]=None,
         stop:typing.Optional[CurveTimeValue]=None,
         step:CurveTimeValue=1
         )->np.ndarray:
         """
-        Get a block of samples
+        Get the positions that samples() will be taken at
+        """
+        start,stop=self._sampleRange(start,stop)
+        return np.arange(start,stop,step,dtype=float)
+
+    def _sampleRange(self,
+        start:typing.Optional[CurveTimeValue]=None,
+        stop:typing.Optional[CurveTimeValue]=None
+        )->typing.Tuple[CurveTimeValue,CurveTimeValue]:
+        """
+        Fill in the default start and stop for samples()
         """
         if start is None:
             if self.start==float('-Inf'):
@@ -148,8 +263,80 @@ class CurveBase(typing.Generic[CurveValueT]):
             if self.end==float('Inf'):
                 raise NonDiscreteCurveException('Cannot calculate all points of an infinite curve. (Need to specify an end for this to work)') # noqa: E501 # pylint: disable=line-too-long
             stop=self.end+self.timeShift
-        return np.array(
-            self.at(position) for position in range(start,stop,step))
+        return start,stop
+
+    def samples(self,
+        start:typing.Optional[CurveTimeValue]=None,
+        stop:typing.Optional[CurveTimeValue]=None,
+        step:CurveTimeValue=1,
+        workers:typing.Optional[int]=None,
+        copy:bool=False
+        )->np.ndarray:
+        """
+        Get a block of samples
+
+        Blocks are kept in the shared sampleCache until the curve is
+        modified, so asking for the same block again costs nothing.
+        Since the result may be shared, it is read-only.
+
+        :workers: split a large range up across this many
+            threads (if releasesGil) or else processes
+        :copy: get a new array, which is fine to change
+        """
+        start,stop=self._sampleRange(start,stop)
+        samples=None
+        if sampleCache.enabled:
+            samples=sampleCache.get(self,start,stop,step)
+        if samples is None:
+            if workers is not None and workers>1:
+                from .parallel import parallelSamples
+                samples=parallelSamples(self,start,stop,step,workers)
+            else:
+                samples=self.valuesAt(
+                    self.samplePositions(start,stop,step))
+            if sampleCache.enabled:
+                samples=sampleCache.put(self,start,stop,step,samples)
+        if copy and not samples.flags.writeable:
+            samples=samples.copy()
+        return samples
+
+    def iterChunks(self,
+        start:typing.Optional[CurveTimeValue]=None,
+        stop:typing.Optional[CurveTimeValue]=None,
+        step:CurveTimeValue=1,
+        chunkSize:typing.Optional[int]=None
+        )->typing.Generator[np.ndarray,None,None]:
+        """
+        Lazily get samples as a series of arrays, chunkSize at a time
+
+        This gives the same values as samples(), but never needs
+        more than one chunk in memory at a time.
+
+        If there is no stop and the curve is infinite,
+        this keeps going forever.
+        """
+        if chunkSize is None:
+            chunkSize=self.CHUNK_SIZE
+        if start is None:
+            if self.start==float('-Inf'):
+                raise NonDiscreteCurveException('Cannot calculate all points of an infinite curve. (Need to specify a start for this to work)') # noqa: E501 # pylint: disable=line-too-long
+            start=self.start+self.timeShift
+        if stop is None and self.end!=float('Inf'):
+            stop=self.end+self.timeShift
+        count=None
+        if stop is not None:
+            count=max(int(np.ceil((stop-start)/step)),0)
+        chunkStart=0
+        while count is None or chunkStart<count:
+            chunkStop=chunkStart+chunkSize
+            if count is not None:
+                chunkStop=min(chunkStop,count)
+            # calculate each as start+i*step so there is no drift
+            positions=np.arange(chunkStart,chunkStop,dtype=float)
+            positions*=step
+            positions+=start
+            yield self.valuesAt(positions)
+            chunkStart=chunkStop
 
     def __gititem__(self,idx:CurveTimeValue)->CurveValueT:
         """
@@ -160,7 +347,8 @@ class CurveBase(typing.Generic[CurveValueT]):
     def __iter__(self)->typing.Iterable[CurveValueT]:
         if not self.isDiscrete:
             raise NonDiscreteCurveException("It is a bad idea to iterate over an infinite curve") # noqa: E501 # pylint: disable=line-too-long
-        return iter(self.at(position) for position in range(self.end))
+        return itertools.chain.from_iterable(
+            chunk.tolist() for chunk in self.iterChunks())
 
     def __len__(self)->CurveTimeValue:
         if not self.isDiscrete:
@@ -172,44 +360,166 @@ class CurveBase(typing.Generic[CurveValueT]):
         """
         The minimum value
         """
-        return np.min(self.samples())
+        return self.stats.min
 
     @property
     def max(self)->CurveValueT:
         """
         The maximum value
         """
-        return np.max(self.samples())
+        return self.stats.max
 
     @property
     def valueRange(self)->typing.Tuple[CurveValueT,CurveValueT]:
         """
         The range of values (min,max)
         """
-        return self.min,self.max
+        return self.stats.valueRange
 
     @property
     def rangeAmount(self)->CurveValueT:
         """
         The spread amount of the value range
         """
-        return self.max-self.min
+        return self.stats.rangeAmount
+
+    # make numpy defer to our operators rather than treating
+    # a curve as a single element in something like np.array+curve
+    __array_ufunc__=None
+
+    def _apply(self,
+        other:typing.Optional[CurveCompatible],
+        func:typing.Callable[...,np.ndarray],
+        reflected:bool=False
+        )->"CurveBase":
+        """
+        Combine this with another curve or number using a numpy ufunc
+
+        This does not calculate anything, it returns a lazy curve
+        that is only evaluated when values are asked for.
+
+        :other: None for single-operand functions such as np.negative
+        :reflected: put other on the left (eg, for __radd__)
+        """
+        from .curveExpression import curveExpression
+        if other is None:
+            return curveExpression(func,self)
+        if reflected:
+            return curveExpression(func,other,self)
+        return curveExpression(func,self,other)
+
+    def __add__(self,other):
+        return self._apply(other,np.add)
+
+    def __radd__(self,other):
+        return self._apply(other,np.add,True)
+
+    def __sub__(self,other):
+        return self._apply(other,np.subtract)
+
+    def __rsub__(self,other):
+        return self._apply(other,np.subtract,True)
+
+    def __mul__(self,other):
+        return self._apply(other,np.multiply)
+
+    def __rmul__(self,other):
+        return self._apply(other,np.multiply,True)
+
+    def __truediv__(self,other):
+        return self._apply(other,np.divide)
+
+    def __rtruediv__(self,other):
+        return self._apply(other,np.divide,True)
+
+    def __pow__(self,other):
+        return self._apply(other,np.power)
+
+    def __neg__(self):
+        return self._apply(None,np.negative)
+
+    def compileLUT(self,
+        start:typing.Optional[CurveTimeValue]=None,
+        stop:typing.Optional[CurveTimeValue]=None,
+        resolution:typing.Optional[int]=None,
+        maxError:typing.Optional[float]=None,
+        interpolation:str='linear'
+        )->"LookupTableCurve":
+        """
+        Precalculate a table of values, so that the curve can be
+        evaluated over and over with just a gather and a lerp
+
+        Outside of start..stop the table falls back to this curve.
+
+        :resolution: how many entries in the table (default is
+            as few as will keep within maxError)
+        :maxError: the largest error allowed (default is a millionth
+            of the value range)
+        :interpolation: 'linear' or 'cubic'
+        """
+        from .lookupTableCurve import (
+            LookupTableCurve,MIN_TABLE_SIZE,MAX_TABLE_SIZE)
+        start,stop=self._sampleRange(start,stop)
+        if resolution is not None:
+            return LookupTableCurve(self,start,stop,resolution,interpolation)
+        # the error goes down with the square of the spacing for
+        # linear, or the cube for Catmull-Rom
+        power=2 if interpolation=='linear' else 3
+        size=MIN_TABLE_SIZE
+        previousSize,previousError=size,float('inf')
+        while True:
+            table=LookupTableCurve(self,start,stop,size,interpolation)
+            error=table.maxError()
+            if maxError is None:
+                maxError=1e-6*float(np.ptp(table.table))
+            # never ask for better than rounding error allows
+            # (eg, when a flat curve makes the default maxError 0)
+            maxError=max(maxError,
+                16*np.spacing(1.0)*float(np.max(np.abs(table.table))))
+            if error<=maxError or size>=MAX_TABLE_SIZE:
+                return table
+            # growing the table should have made the error this small
+            expected=previousError*(previousSize/size)**power
+            if error>np.sqrt(previousError*expected):
+                # but it got less than half of that improvement (eg, the
+                # curve has a discontinuity), so it is as good as it gets
+                return table
+            previousSize,previousError=size,error
+            # jump to the size that should be enough, with a margin
+            scale=(error/maxError)**(1/power) if maxError>0 else 2.0
+            size=min(int(size*max(scale*1.1,1.1))+1,MAX_TABLE_SIZE)
 
     def toSpline(self,
-        percentError:PercentCompatible=0.80
+        percentError:PercentCompatible=0.80,
+        maxKnots:typing.Optional[int]=None,
+        maxSamples:typing.Optional[int]=None
         )->"SplineCurve":
         """
-        Convert to a spline curve
+        Convert to a spline curve by fitting one to the samples
+
+        The result is kept until the curve is modified.
 
-        Used as a standard fallback for math operations
+        :percentError: how far (as a fraction of the value range)
+            the spline is allowed to stray from the samples
+        :maxKnots: fit by least squares with at most this many knots
+            (this is done anyway for large curves)
+        :maxSamples: average runs of samples together first,
+            to fit to at most this many (however far that strays).
+            By default, runs are only averaged where they stay
+            within percentError.
         """
         percentError=asPercent(percentError)
-        from scipy.interpolate import UnivariateSpline
+        key=(self.version,float(percentError),maxKnots,maxSamples)
+        cached=self._splineCache
+        if cached is not None and cached[0]==key:
+            return cached[1]
+        from .splineFitting import fitSpline
         from .splineCurve import SplineCurve
-        # convert from percent error to S
-        x=np.array(range(len(self.samples())))
-        allowedDeviation=percentError*self.rangeAmount
-        s=len(self.samples())*(allowedDeviation**2)
-        # create the spline
-        spline=UnivariateSpline(x,self.samples(),s=s)
-        return SplineCurve(spline)
+        x=self.samplePositions()
+        y=self.valuesAt(x)
+        # convert from percent error to a deviation
+        allowedDeviation=percentError*(np.max(y)-np.min(y))
+        spline=SplineCurve(
+            fitSpline(x,y,allowedDeviation,maxKnots,maxSamples))
+        self._splineCache=(key,spline)
+        return spline
@@ -0,0 +1,276 @@
+"""
+Compile a curve expression into a single fused evaluation function
+"""
+import typing
+import numpy as np
+from .curveBase import CurveBase,CurveValueT,CurveTimeValue
+from .constantCurve import ConstantCurve
+from .curveExpression import CurveExpression,CurveFunction
+
+
+OUTPUT=-1 # register number that means "the output array"
+
+# operators where the order of the operands does not matter
+COMMUTATIVE:typing.Set[CurveFunction]={
+    np.add,np.multiply,np.maximum,np.minimum}
+
+
+class Instruction(typing.NamedTuple):
+    """
+    One step of a compiled curve
+
+    Either evaluates a leaf curve into a register,
+    or applies func to registers/constants
+    """
+    target:int
+    leaf:typing.Optional[CurveBase]=None
+    func:typing.Optional[CurveFunction]=None
+    # each arg is a register number, or a ConstantCurve
+    args:typing.Tuple[typing.Union[int,ConstantCurve],...]=()
+
+
+def compileCurve(
+    curve:CurveBase,
+    blockSize:typing.Optional[int]=None
+    )->"CompiledCurve":
+    """
+    Compile a curve expression into a single fused evaluation function
+    """
+    return CompiledCurve(curve,blockSize)
+
+
+class CompiledCurve(CurveBase[CurveValueT]):
+    """
+    A curve expression compiled into a single fused evaluation function
+
+    When compiled:
+        * common subexpressions are only evaluated once
+            (eg, the same GaussianCurve used twice)
+        * constants are passed straight to the ufuncs rather
+            than being turned into arrays
+        * everything is evaluated blockSize points at a time,
+            with in-place out= ufunc calls into a small set of
+            reusable scratch registers
+
+    This means the only full-size array is the output, no matter
+    how deep the expression is.
+
+    Whenever the expression is modified, it is compiled again.
+    Registers are complex if any leaf or constant is.
+    """
+
+    _dtypeCache:typing.Optional[typing.Tuple[int,np.dtype,np.dtype]]=None
+
+    def __init__(self,
+        expression:CurveBase,
+        blockSize:typing.Optional[int]=None):
+        """ """
+        self.expression:CurveBase=expression
+        if blockSize is None:
+            blockSize=self.CHUNK_SIZE
+        self.blockSize:int=blockSize
+        self.program:typing.List[Instruction]=[]
+        self.registerCount:int=0
+        self.compiledVersion:int=-1
+        self._compile()
+
+    def _compile(self)->None:
+        """
+        Turn the expression tree into a list of instructions
+        """
+        self.compiledVersion=self.expression.version
+        self.program=[]
+        self.registerCount=0
+        if isinstance(self.expression,ConstantCurve):
+            self.program.append(Instruction(OUTPUT,leaf=self.expression))
+            return
+        # flatten the tree, merging identical subexpressions
+        nodes:typing.Dict[typing.Hashable,
+            typing.Tuple[CurveBase,typing.Tuple[typing.Hashable,...]]]={}
+        order:typing.List[typing.Hashable]=[]
+        constants:typing.Dict[typing.Hashable,ConstantCurve]={}
+        def visit(curve:CurveBase)->typing.Hashable:
+            if isinstance(curve,ConstantCurve):
+                # the value is looked up when run, so it can change
+                key:typing.Hashable=('constant',id(curve))
+                constants[key]=curve
+                return key
+            if isinstance(curve,CurveExpression):
+                childKeys=tuple(visit(operand)
+                    for operand in curve.operands)
+                if curve.func in COMMUTATIVE:
+                    childKeys=tuple(sorted(childKeys,key=repr))
+                key=(curve.func,childKeys)
+            else:
+                childKeys=()
+                key=('leaf',id(curve))
+            if key not in nodes:
+                nodes[key]=(curve,childKeys)
+                order.append(key)
+            return key
+        rootKey=visit(self.expression)
+        # find where each value is used for the last time
+        lastUse:typing.Dict[typing.Hashable,int]={}
+        for i,key in enumerate(order):
+            for childKey in nodes[key][1]:
+                lastUse[childKey]=i
+        # assign registers, reusing them as soon as values die
+        registers:typing.Dict[typing.Hashable,int]={}
+        freeRegisters:typing.List[int]=[]
+        def allocate()->int:
+            if freeRegisters:
+                return freeRegisters.pop()
+            self.registerCount+=1
+            return self.registerCount-1
+        for i,key in enumerate(order):
+            if key[0]=='constant':
+                continue
+            curve,childKeys=nodes[key]
+            for childKey in set(childKeys):
+                if lastUse.get(childKey)==i and childKey in registers:
+                    # ufuncs can safely write over their own inputs
+                    freeRegisters.append(registers[childKey])
+            target=OUTPUT if key==rootKey else allocate()
+            registers[key]=target
+            if key[0]=='leaf':
+                self.program.append(Instruction(target,leaf=curve))
+                continue
+            args=tuple(registers[operandKey] if operandKey[0]!='constant'
+                else constants[operandKey]
+                for operandKey in childKeys)
+            self.program.append(Instruction(
+                target,func=typing.cast(CurveExpression,curve).func,
+                args=args))
+
+    def evaluate(self,
+        positions:np.ndarray,
+        out:typing.Optional[np.ndarray]=None
+        )->np.ndarray:
+        """
+        Evaluate the compiled expression
+
+        :out: optional array to put the results into
+        """
+        if self.compiledVersion!=self.expression.version:
+            self._compile()
+        positions=np.asarray(positions,dtype=float)
+        flatPositions=positions.reshape(-1)
+        registerDtype,outDtype=self._dtypes(flatPositions[:1])
+        if out is None:
+            out=np.empty(positions.shape,dtype=outDtype)
+        flatOut=out.reshape(-1)
+        blockSize=max(min(self.blockSize,len(flatPositions)),1)
+        registers=[np.empty(blockSize,dtype=registerDtype)
+            for _ in range(self.registerCount)]
+        for blockStart in range(0,len(flatPositions),blockSize):
+            blockStop=min(blockStart+blockSize,len(flatPositions))
+            count=blockStop-blockStart
+            self._run(
+                flatPositions[blockStart:blockStop],
+                flatOut[blockStart:blockStop],
+                [register[:count] for register in registers])
+        return out
+
+    def _dtypes(self,probe:np.ndarray)->typing.Tuple[np.dtype,np.dtype]:
+        """
+        Get the (register,output) dtypes, trying the leaves and the
+        whole expression at a probe position to find out
+
+        (Kept until the expression is modified)
+        """
+        version=self.expression.version
+        cached=self._dtypeCache
+        if cached is not None and cached[0]==version:
+            return cached[1],cached[2]
+        if len(probe)==0:
+            return np.dtype(float),np.dtype(float)
+        values=[instruction.leaf.valuesAt(probe)
+            for instruction in self.program
+            if instruction.leaf is not None]
+        values.extend(arg.value
+            for instruction in self.program
+            for arg in instruction.args
+            if isinstance(arg,ConstantCurve))
+        registerDtype=np.result_type(float,*values)
+        if self.registerCount==0:
+            outDtype=registerDtype
+        else:
+            outDtype=np.result_type(
+                float,self.expression.valueAt(float(probe[0])))
+        self._dtypeCache=(version,registerDtype,outDtype)
+        return registerDtype,outDtype
+
+    def _run(self,
+        positions:np.ndarray,
+        out:np.ndarray,
+        registers:typing.List[np.ndarray]
+        )->None:
+        """
+        Run the program for one block
+        """
+        def value(arg:typing.Union[int,ConstantCurve])->typing.Any:
+            if isinstance(arg,ConstantCurve):
+                return arg.value
+            return out if arg==OUTPUT else registers[arg]
+        for instruction in self.program:
+            target=out if instruction.target==OUTPUT \
+                else registers[instruction.target]
+            if instruction.leaf is not None:
+                np.copyto(target,instruction.leaf.valuesAt(positions))
+            elif isinstance(instruction.func,np.ufunc):
+                instruction.func(
+                    *(value(arg) for arg in instruction.args),out=target)
+            else:
+                np.copyto(target,typing.cast(CurveFunction,
+                    instruction.func)(
+                        *(value(arg) for arg in instruction.args)))
+
+    @property
+    def version(self)->int:
+        """
+        Changes whenever any part of the expression is modified
+        """
+        return self.expression.version
+
+    @property
+    def releasesGil(self)->bool: # type: ignore
+        """
+        Only if the expression does
+        """
+        return self.expression.releasesGil
+
+    @property
+    def start(self)->CurveTimeValue:
+        """
+        Start time of the curve
+        """
+        return self.expression.start
+
+    @property
+    def end(self)->CurveTimeValue:
+        """
+        End time of the curve
+        """
+        return self.expression.end
+
+    @property
+    def timeShift(self)->CurveTimeValue:
+        """
+        Time shift of the curve
+        """
+        return self.expression.timeShift
+
+    def valueAt(self,position:CurveTimeValue)->CurveValueT:
+        """
+        Get value at a given point
+        """
+        return self.evaluate(np.array([position],dtype=float))[0]
+
+    def valuesAt(self,positions:np.ndarray)->np.ndarray:
+        """
+        Get values at an array of points all at once
+        """
+        return self.evaluate(positions)
+
+    def __repr__(self):
+        return f'compileCurve({self.expression!r})'
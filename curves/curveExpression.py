@@ -0,0 +1,175 @@
+"""
+Lazy math on curves
+"""
+import typing
+import numpy as np
+from .curveBase import (
+    CurveBase,CurveValueT,CurveTimeValue,CurveCompatible,asCurve)
+from .constantCurve import ConstantCurve
+if typing.TYPE_CHECKING:
+    from .curveCompiler import CompiledCurve
+
+
+CurveFunction=typing.Callable[...,np.ndarray]
+
+# operators that can be shown in infix form
+OPERATOR_SYMBOLS:typing.Dict[CurveFunction,str]={
+    np.add:'+',
+    np.subtract:'-',
+    np.multiply:'*',
+    np.divide:'/',
+    np.power:'**'}
+
+# values that leave the other operand unchanged, as (left,right)
+IDENTITIES:typing.Dict[CurveFunction,typing.Tuple[
+    typing.Optional[float],typing.Optional[float]]]={
+    np.add:(0,0),
+    np.subtract:(None,0),
+    np.multiply:(1,1),
+    np.divide:(None,1),
+    np.power:(None,1)}
+
+# operators where (x op a) op b == x op (a op b)
+ASSOCIATIVE:typing.Set[CurveFunction]={np.add,np.multiply}
+
+
+def _asOperand(operand:CurveCompatible)->CurveBase:
+    """
+    Turn numbers into ConstantCurves, and anything else into a curve
+    """
+    if isinstance(operand,(int,float,np.number)):
+        return ConstantCurve(operand)
+    return asCurve(operand)
+
+
+def _fold(func:CurveFunction,*values:typing.Any)->ConstantCurve:
+    """
+    Work out func() of constant values right away
+    """
+    value=func(*values)
+    if isinstance(value,np.generic):
+        value=value.item()
+    return ConstantCurve(value)
+
+
+def curveExpression(
+    func:CurveFunction,
+    *operands:CurveCompatible
+    )->CurveBase:
+    """
+    Create a lazy curve that is func() applied to the operands
+
+    Constants are folded together wherever possible, so
+    this may return a simpler curve than a CurveExpression.
+    """
+    curves=[_asOperand(operand) for operand in operands]
+    constants=[isinstance(curve,ConstantCurve) for curve in curves]
+    if all(constants):
+        return _fold(func,*(curve.value for curve in curves))
+    if len(curves)==2 and any(constants):
+        left,right=curves
+        identities=IDENTITIES.get(func,(None,None))
+        if constants[0] and left.value==identities[0]:
+            return right
+        if constants[1] and right.value==identities[1]:
+            return left
+        if func in ASSOCIATIVE:
+            # (x op a) op b -> x op (a op b)
+            constant,other=(left,right) if constants[0] else (right,left)
+            if isinstance(other,CurveExpression) and other.func==func:
+                inner=other.operands
+                for i,innerOperand in enumerate(inner):
+                    if isinstance(innerOperand,ConstantCurve):
+                        folded=_fold(func,innerOperand.value,constant.value)
+                        return curveExpression(func,inner[1-i],folded)
+    return CurveExpression(func,*curves)
+
+
+class CurveExpression(CurveBase[CurveValueT]):
+    """
+    A lazy curve that is func() applied to other curves
+
+    Nothing is calculated until values are asked for, and then
+    only at the positions asked for, so chains of math on curves
+    never resample or refit anything in between.
+
+    Usually these are created by doing math on curves, eg
+        (curveA+curveB)*2
+    To get a fitted spline, call toSpline() on the result.
+    """
+    def __init__(self,
+        func:CurveFunction,
+        *operands:CurveBase):
+        """
+        :func: usually a numpy ufunc such as np.add
+        """
+        self.func:CurveFunction=func
+        self.operands:typing.Tuple[CurveBase,...]=operands
+        self._compiled:typing.Optional["CompiledCurve"]=None
+
+    @property
+    def version(self)->int:
+        """
+        Changes whenever any of the operands are modified
+        """
+        return sum(operand.version for operand in self.operands)
+
+    @property
+    def releasesGil(self)->bool: # type: ignore
+        """
+        Only if all operands do
+        """
+        return all(operand.releasesGil for operand in self.operands)
+
+    @property
+    def start(self)->CurveTimeValue:
+        """
+        Start of the range where all operands are defined
+        """
+        return max(operand.start+operand.timeShift
+            for operand in self.operands)
+
+    @property
+    def end(self)->CurveTimeValue:
+        """
+        End of the range where all operands are defined
+        """
+        return min(operand.end+operand.timeShift
+            for operand in self.operands)
+
+    def valueAt(self,position:CurveTimeValue)->CurveValueT:
+        """
+        Get value at a given point
+        """
+        return self.func(*(operand.valueAt(position)
+            for operand in self.operands))
+
+    def valuesAt(self,positions:np.ndarray)->np.ndarray:
+        """
+        Get values at an array of points all at once
+
+        This is done by the compiled version of the expression,
+        so there are no intermediate arrays
+        """
+        return self.compiled.valuesAt(positions)
+
+    @property
+    def compiled(self)->"CompiledCurve":
+        """
+        This expression compiled into a single fused evaluation function
+
+        (Compiled the first time it is needed, and again
+        whenever the expression is modified)
+        """
+        if self._compiled is None:
+            from .curveCompiler import compileCurve
+            self._compiled=compileCurve(self)
+        return self._compiled
+
+    def __repr__(self):
+        symbol=OPERATOR_SYMBOLS.get(self.func)
+        if symbol is not None and len(self.operands)==2:
+            return f'({self.operands[0]!r} {symbol} {self.operands[1]!r})'
+        name=getattr(self.func,'__name__',repr(self.func))
+        operands=','.join(repr(operand) for operand in self.operands)
+        return f'{name}({operands})'
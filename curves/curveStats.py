@@ -0,0 +1,135 @@
+"""
+Statistics about the values of a curve
+"""
+import typing
+import numpy as np
+
+
+class CurveStats:
+    """
+    Statistics about the values of a curve
+
+    Everything is gathered in a single pass, and can be
+    built up a block at a time with add(), so the values
+    never need to all be in memory at once.
+
+    NaN values make min, max, mean, etc NaN (like numpy does).
+    With no values at all, they are all NaN as well.
+    Complex values are not supported.
+    """
+
+    BLOCK_SIZE=65536
+
+    def __init__(self,values:typing.Optional[np.ndarray]=None):
+        """
+        :values: optional values to start with
+        """
+        self.count:int=0
+        self._min:float=float('Inf')
+        self._max:float=float('-Inf')
+        self.sum:float=0.0
+        # sum of squared differences from the mean
+        # (more numerically stable than keeping sum of squares)
+        self._m2:float=0.0
+        if values is not None:
+            self.add(values)
+
+    def add(self,values:np.ndarray)->None:
+        """
+        Add more values to the statistics
+        """
+        values=np.asarray(values).ravel()
+        if np.iscomplexobj(values):
+            raise ValueError('Cannot gather statistics of complex values (use the real part or abs() first)') # noqa: E501 # pylint: disable=line-too-long
+        for blockStart in range(0,len(values),self.BLOCK_SIZE):
+            block=values[blockStart:blockStart+self.BLOCK_SIZE]
+            self._addBlock(np.asarray(block,dtype=float))
+
+    def _addBlock(self,values:np.ndarray)->None:
+        """
+        Merge a block of values in, using Chan's parallel algorithm
+        """
+        count=len(values)
+        if count==0:
+            return
+        blockSum=float(np.sum(values))
+        blockMean=blockSum/count
+        deviations=values-blockMean
+        blockM2=float(np.dot(deviations,deviations))
+        totalCount=self.count+count
+        delta=blockMean-self.mean if self.count>0 else 0.0
+        self._m2+=blockM2+delta*delta*self.count*count/totalCount
+        self.sum+=blockSum
+        self.count=totalCount
+        # unlike min() and max(), these always pass NaN on
+        self._min=float(np.minimum(self._min,np.min(values)))
+        self._max=float(np.maximum(self._max,np.max(values)))
+
+    @property
+    def min(self)->float:
+        """
+        The minimum value
+        """
+        if self.count==0:
+            return float('nan')
+        return self._min
+
+    @property
+    def max(self)->float:
+        """
+        The maximum value
+        """
+        if self.count==0:
+            return float('nan')
+        return self._max
+
+    @property
+    def mean(self)->float:
+        """
+        Arithmatic mean
+        """
+        if self.count==0:
+            return float('nan')
+        return self.sum/self.count
+
+    @property
+    def sumSquares(self)->float:
+        """
+        Sum of the squares of all values
+        """
+        if self.count==0:
+            return 0.0
+        return self._m2+self.sum*self.sum/self.count
+
+    @property
+    def variance(self)->float:
+        """
+        Population variance
+        """
+        if self.count==0:
+            return float('nan')
+        return self._m2/self.count
+
+    @property
+    def stdev(self)->float:
+        """
+        Standard deviation
+        """
+        return float(np.sqrt(self.variance))
+
+    @property
+    def valueRange(self)->typing.Tuple[float,float]:
+        """
+        The range of values (min,max)
+        """
+        return self.min,self.max
+
+    @property
+    def rangeAmount(self)->float:
+        """
+        The spread amount of the value range
+        """
+        return self.max-self.min
+
+    def __repr__(self):
+        return f'CurveStats(count={self.count},min={self.min},max={self.max},mean={self.mean},stdev={self.stdev})' # noqa: E501 # pylint: disable=line-too-long
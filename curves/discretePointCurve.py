@@ -2,9 +2,11 @@
 A basic gaussian curve
 """
 import typing
+import os
 import numpy as np
 import scipy.interpolate
 from .curveBase import CurveBase,CurveValueT,CurveTimeValue,CurveCompatible
+from .summaryPyramid import SummaryPyramid
 
 
 def asDiscretePointCurve(curve:CurveCompatible):
@@ -14,9 +16,15 @@ def asDiscretePointCurve(curve:CurveCompatible):
     If it is already a DiscretePointCurve, return it.
     Otherwise, create a DiscretePointCurve
     to wrap it.
+
+    If it is the filename of a .npy file, open it (read-only)
+    as a MemmapDiscretePointCurve.
     """
     if isinstance(curve,DiscretePointCurve):
         return curve
+    if isinstance(curve,(str,os.PathLike)):
+        from .memmapDiscretePointCurve import MemmapDiscretePointCurve
+        return MemmapDiscretePointCurve(curve,mode='r')
     return DiscretePointCurve(curve)
 
 
@@ -24,12 +32,81 @@ class DiscretePointCurve(CurveBase[CurveValueT]):
     """
     A basic gaussian curve
     """
+
+    MIN_CAPACITY=16
+    releasesGil=True
+
+    _interpolatorCache:typing.Optional[typing.Tuple[
+        typing.Tuple[int,str],
+        typing.Callable[[np.ndarray],np.ndarray]]]=None
+    _pyramid:typing.Optional[SummaryPyramid]=None
+
     def __init__(self,
         samples:CurveCompatible,
         interpolation:str='linear'):
-        """ """
-        self._samples=np.array(samples)
-        self.interpolation:str=interpolation
+        """
+        The samples are stored in a buffer that grows by doubling,
+        so that appending is amortized O(1)
+        """
+        if isinstance(samples,CurveBase):
+            samples=samples.samples()
+        self._buffer:np.ndarray=np.array(samples,ndmin=1).ravel()
+        self._count:int=len(self._buffer)
+        self.interpolation=interpolation
+
+    @property
+    def interpolation(self)->str:
+        """
+        How to interpolate between samples
+        (eg, 'linear', 'nearest', 'cubic', 'pchip', 'akima')
+        """
+        return self._interpolation
+    @interpolation.setter
+    def interpolation(self,interpolation:str):
+        self._interpolation=interpolation
+        self._modified()
+
+    @property
+    def _samples(self)->np.ndarray:
+        """
+        The samples in use (a view into the buffer)
+        """
+        return self._buffer[:self._count]
+
+    @property
+    def capacity(self)->int:
+        """
+        How many samples the buffer can hold before it must grow
+        """
+        return len(self._buffer)
+
+    def reserve(self,capacity:int)->None:
+        """
+        Make sure there is room for at least this many samples
+        without growing the buffer
+        """
+        if capacity>self.capacity:
+            self._reallocate(capacity)
+
+    def shrinkToFit(self)->None:
+        """
+        Release any unused space at the end of the buffer
+        """
+        if self.capacity>self._count:
+            self._reallocate(self._count)
+
+    def _reallocate(self,
+        capacity:int,
+        dtype:typing.Optional[np.dtype]=None
+        )->None:
+        """
+        Move the samples into a new buffer of a different size
+        """
+        if dtype is None:
+            dtype=self._buffer.dtype
+        buffer=np.empty(capacity,dtype=dtype)
+        buffer[:self._count]=self._samples
+        self._buffer=buffer
 
     @property
     def start(self)->CurveValueT:
@@ -43,54 +120,348 @@ class DiscretePointCurve(CurveBase[CurveValueT]):
         """
         end index
         """
-        return len(self._samples)
+        return self._count
 
     def append(self,values:CurveCompatible)->None:
         """
         Append any number of values to this curve
         """
-        allPointLists=[self._samples]
-        def _recursiveAppend(values):
-            if isinstance(values,CurveBase):
-                allPointLists.extend(values.samples())
-            elif hasattr(values,'__iter__'):
-                for v in values:
-                    _recursiveAppend(v)
+        if isinstance(values,CurveBase):
+            self._appendArray(values.samples())
+        elif isinstance(values,np.ndarray):
+            self._appendArray(values.ravel())
+        elif hasattr(values,'__iter__'):
+            try:
+                array=np.asarray(values)
+            except ValueError: # ragged, so go through them one by one
+                array=None
+            if array is not None and array.dtype!=object:
+                self._appendArray(array.ravel())
             else:
-                allPointLists.append((v,))
-        _recursiveAppend(values)
-        self._samples=np.concatenate(allPointLists)
+                for value in values:
+                    self.append(value)
+        else:
+            self._appendArray(np.array((values,)))
     extend=append
     concatinate=append
 
+    def _appendArray(self,values:np.ndarray)->None:
+        """
+        Append a flat array of values, growing the buffer if necessary
+        """
+        newCount=self._count+len(values)
+        dtype=np.result_type(self._buffer,values)
+        if newCount>self.capacity or dtype!=self._buffer.dtype:
+            capacity=max(newCount,2*self.capacity,self.MIN_CAPACITY)
+            self._reallocate(capacity,dtype)
+        self._buffer[self._count:newCount]=values
+        if self._pyramid is not None:
+            self._pyramid.invalidate(self._count)
+        self._count=newCount
+        self._modified()
+
     def valueAt(self,position:CurveTimeValue)->CurveValueT:
         """
         Get value at a given point
+
+        Positions outside of the curve are clamped to the ends
         """
+        last=self._count-1
+        if position<=0:
+            return self._samples[0]
+        if position>=last:
+            return self._samples[last]
         if position==int(position):
-            return self._samples[position]
-        x=range(len(self._samples))
-        if self.interpolation=='linear':
-            return np.interp(position,x,self._samples)
+            return self._samples[int(position)]
+        return self.valuesAt(position)[()]
+
+    def valuesAt(self,positions:np.ndarray)->np.ndarray:
+        """
+        Get values at an array of points all at once
+
+        Positions outside of the curve are clamped to the ends
+        """
+        positions=np.clip(np.asarray(positions,dtype=float),
+            0,max(self._count-1,0))
+        return self.interpolator(positions)
+
+    @property
+    def interpolator(self)->typing.Callable[[np.ndarray],np.ndarray]:
+        """
+        A function that interpolates positions between samples
+
+        It is only built once, then kept until either the
+        curve or the interpolation type is changed
+        """
+        key=(self.version,self.interpolation)
+        cached=self._interpolatorCache
+        if cached is not None and cached[0]==key:
+            return cached[1]
+        interpolator=self._createInterpolator()
+        self._interpolatorCache=(key,interpolator)
+        return interpolator
+
+    def _createInterpolator(self)->typing.Callable[[np.ndarray],np.ndarray]:
+        """
+        Create an interpolator for the current samples
+
+        linear and nearest only ever look at the samples they need.
+        The others are fitted to the full set of samples.
+        """
+        if self.interpolation=='linear' or self._count<2:
+            return self._linearInterpolate
+        if self.interpolation=='nearest':
+            return self._nearestInterpolate
+        x=np.arange(self._count)
+        if self.interpolation=='cubic':
+            # a cubic needs 4 samples, so use a lower order if need be
+            return scipy.interpolate.make_interp_spline(
+                x,self._samples,k=min(3,self._count-1))
+        if self.interpolation=='pchip':
+            return scipy.interpolate.PchipInterpolator(x,self._samples)
+        if self.interpolation=='akima':
+            return scipy.interpolate.Akima1DInterpolator(x,self._samples)
         return scipy.interpolate.interp1d(
             x,
             self._samples,
-            kind=self.interpolation)
+            kind=self.interpolation,
+            assume_sorted=True)
+
+    def _linearInterpolate(self,positions:np.ndarray)->np.ndarray:
+        """
+        Linear interpolation of (already clamped) positions
+        """
+        samples=self._samples
+        if self._count<2:
+            return np.full(positions.shape,samples[0],dtype=float)
+        indices=np.minimum(positions.astype(np.intp),self._count-2)
+        fraction=positions-indices
+        low=samples[indices]
+        return low+fraction*(samples[indices+1]-low)
+
+    def _nearestInterpolate(self,positions:np.ndarray)->np.ndarray:
+        """
+        Nearest-neighbor interpolation of (already clamped) positions
+        """
+        return self._samples[np.rint(positions).astype(np.intp)]
+
+    def __setitem__(self,
+        idx:typing.Union[CurveTimeValue,slice],
+        value:CurveValueT):
+        """
+        Set one sample, or a slice of them
+        """
+        if isinstance(idx,slice):
+            indices=range(*idx.indices(self._count))
+            self._samples[idx]=value
+            if not indices:
+                return
+            changedStart=min(indices[0],indices[-1])
+            changedStop=max(indices[0],indices[-1])+1
+        else:
+            if idx!=int(idx):
+                raise NotImplementedError("It would be nice to set non-uniform indices, but we currently cannot do that") # noqa: E501 # pylint: disable=line-too-long
+            idx=int(idx)
+            if not -self._count<=idx<self._count:
+                raise IndexError(f'Sample {idx} is out of range')
+            idx%=self._count
+            self._samples[idx]=value
+            changedStart,changedStop=idx,idx+1
+        if self._pyramid is not None:
+            self._pyramid.invalidate(changedStart,changedStop)
+        self._modified()
+
+    def enablePyramid(self,blockSize:int=64)->SummaryPyramid:
+        """
+        Keep a SummaryPyramid of the samples, so that rangeMin() etc
+        and summarize() are O(log n) rather than O(n)
 
-    def __setitem__(self,idx:CurveTimeValue,value:CurveValueT):
-        if idx!=int(idx):
-            raise NotImplementedError("It would be nice to set non-uniform indices, but we currently cannot do that") # noqa: E501 # pylint: disable=line-too-long
-        self._samples[idx]=value
+        It costs about 3/(blockSize-1) extra floats per sample,
+        and is kept up to date as samples are appended or changed.
+        """
+        if self._pyramid is None or self._pyramid.blockSize!=blockSize:
+            self._pyramid=SummaryPyramid(blockSize)
+        return self._pyramid
+
+    def disablePyramid(self)->None:
+        """
+        Stop keeping a SummaryPyramid
+        """
+        self._pyramid=None
+
+    def _indexRange(self,
+        start:typing.Optional[CurveTimeValue]=None,
+        stop:typing.Optional[CurveTimeValue]=None
+        )->typing.Tuple[int,int]:
+        """
+        Turn a range of positions into a range of sample indices
+        """
+        start=0 if start is None else max(int(np.floor(start)),0)
+        stop=self._count if stop is None else \
+            min(int(np.ceil(stop)),self._count)
+        if start>=stop:
+            raise ValueError('Cannot summarize an empty range')
+        return start,stop
+
+    def rangeSummary(self,
+        start:typing.Optional[CurveTimeValue]=None,
+        stop:typing.Optional[CurveTimeValue]=None
+        )->typing.Tuple[CurveValueT,CurveValueT,float]:
+        """
+        Get the (min,max,mean) of the samples from start to stop
+        """
+        start,stop=self._indexRange(start,stop)
+        if self._pyramid is not None:
+            low,high,total=self._pyramid.query(self._samples,start,stop)
+            return low,high,total/(stop-start)
+        samples=self._samples[start:stop]
+        return samples.min(),samples.max(),samples.mean()
+
+    def rangeMin(self,
+        start:typing.Optional[CurveTimeValue]=None,
+        stop:typing.Optional[CurveTimeValue]=None
+        )->CurveValueT:
+        """
+        Get the minimum of the samples from start to stop
+        """
+        if self._pyramid is not None:
+            return self.rangeSummary(start,stop)[0]
+        start,stop=self._indexRange(start,stop)
+        return self._samples[start:stop].min()
+
+    def rangeMax(self,
+        start:typing.Optional[CurveTimeValue]=None,
+        stop:typing.Optional[CurveTimeValue]=None
+        )->CurveValueT:
+        """
+        Get the maximum of the samples from start to stop
+        """
+        if self._pyramid is not None:
+            return self.rangeSummary(start,stop)[1]
+        start,stop=self._indexRange(start,stop)
+        return self._samples[start:stop].max()
+
+    def rangeMean(self,
+        start:typing.Optional[CurveTimeValue]=None,
+        stop:typing.Optional[CurveTimeValue]=None
+        )->float:
+        """
+        Get the mean of the samples from start to stop
+        """
+        if self._pyramid is not None:
+            return self.rangeSummary(start,stop)[2]
+        start,stop=self._indexRange(start,stop)
+        return self._samples[start:stop].mean()
+
+    def summarize(self,
+        buckets:int,
+        start:typing.Optional[CurveTimeValue]=None,
+        stop:typing.Optional[CurveTimeValue]=None
+        )->typing.Tuple[np.ndarray,np.ndarray,np.ndarray]:
+        """
+        Get a zoomed-out view of the samples from start to stop
+
+        Returns (mins,maxs,means) arrays of length buckets
+        (or fewer, if there are fewer samples than that)
+
+        With a pyramid, this never needs to look at more than a few
+        summary blocks per bucket, no matter how many samples there are.
+        """
+        start,stop=self._indexRange(start,stop)
+        if self._pyramid is not None:
+            return self._pyramid.summarize(self._samples,start,stop,buckets)
+        buckets=max(min(buckets,stop-start),1)
+        edges=(np.arange(buckets)*(stop-start))//buckets
+        samples=self._samples[start:stop]
+        counts=np.diff(np.append(edges,stop-start))
+        return (np.minimum.reduceat(samples,edges),
+            np.maximum.reduceat(samples,edges),
+            np.add.reduceat(samples,edges,dtype=float)/counts)
 
     def samples(self,
         start:typing.Optional[CurveTimeValue]=None,
         stop:typing.Optional[CurveTimeValue]=None,
-        step:CurveTimeValue=1
+        step:CurveTimeValue=1,
+        workers:typing.Optional[int]=None,
+        copy:bool=False
         )->np.ndarray:
         """
         Get a block of samples
+
+        Whole-number ranges return a read-only view of the buffer
+        without copying.  (Change samples with __setitem__ or append,
+        so that anything cached about the curve is updated.)
+        If the buffer is reallocated (eg, by appending)
+        the view keeps the old samples, but no longer follows changes.
+        For a MemmapDiscretePointCurve, the file cannot be shrunk
+        (eg, by close()) while such views are alive.
+
+        :copy: get a new array, which is fine to change
+        """
+        if self._isWholeRange(start,stop,step):
+            # whole samples can be sliced without copying
+            view=self._samples[self._wholeRange(start,stop,step)]
+            return view.copy() if copy else self._exportView(view)
+        return super().samples(start,stop,step,workers,copy)
+
+    def iterChunks(self,
+        start:typing.Optional[CurveTimeValue]=None,
+        stop:typing.Optional[CurveTimeValue]=None,
+        step:CurveTimeValue=1,
+        chunkSize:typing.Optional[int]=None
+        )->typing.Generator[np.ndarray,None,None]:
+        """
+        Lazily get samples as a series of arrays, chunkSize at a time
+
+        Whole-number ranges are sliced out of the buffer without copying,
+        as read-only views (see samples() for how long they stay valid)
+        """
+        if not self._isWholeRange(start,stop,step):
+            yield from super().iterChunks(start,stop,step,chunkSize)
+            return
+        if chunkSize is None:
+            chunkSize=self.CHUNK_SIZE
+        wholeRange=self._wholeRange(start,stop,step)
+        chunkStride=chunkSize*wholeRange.step
+        for chunkStart in range(
+                wholeRange.start,wholeRange.stop,chunkStride):
+            chunkStop=min(chunkStart+chunkStride,wholeRange.stop)
+            yield self._exportView(
+                self._samples[chunkStart:chunkStop:wholeRange.step])
+
+    def _exportView(self,view:np.ndarray)->np.ndarray:
+        """
+        Make a view of the buffer safe to hand out
+
+        It is read-only, since writing through it would not
+        call _modified()
+        """
+        view.flags.writeable=False
+        return view
+
+    def _wholeRange(self,
+        start:typing.Optional[CurveTimeValue]=None,
+        stop:typing.Optional[CurveTimeValue]=None,
+        step:CurveTimeValue=1
+        )->slice:
+        """
+        Get a sample range as a slice of whole sample indices
+        """
+        start=0 if start is None else int(start)
+        stop=self._count if stop is None else int(stop)
+        return slice(start,stop,int(step))
+
+    def _isWholeRange(self,
+        start:typing.Optional[CurveTimeValue]=None,
+        stop:typing.Optional[CurveTimeValue]=None,
+        step:CurveTimeValue=1
+        )->bool:
+        """
+        Is this sample range whole sample indices within the curve,
+        so that no interpolation is required
         """
-        if start is None and stop is None:
-            return self._samples
-        return np.array(
-            self.valueAt(position) for position in range(start,stop,step))
+        start=0 if start is None else start
+        stop=self._count if stop is None else stop
+        return start==int(start) and stop==int(stop) \
+            and step==int(step) and step>0 \
+            and 0<=start<=stop<=self._count
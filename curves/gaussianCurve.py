@@ -12,6 +12,8 @@ class GaussianCurve(CurveBase[CurveValueT]):
     """
     A basic gaussian curve
     """
+
+    releasesGil=True
     def __init__(self,mean:CurveValueT,stdev:CurveValueT):
         self._mean=mean
         self._stdev=stdev
@@ -44,6 +46,20 @@ class GaussianCurve(CurveBase[CurveValueT]):
         exponent=-((position-self.mean)**2)/(2*self.stdev**2)
         return self.coefficient*np.exp(exponent)
 
+    def valuesAt(self,positions:np.ndarray)->np.ndarray:
+        """
+        Get values at an array of points all at once
+        """
+        mean=self.mean
+        stdev=self.stdev
+        exponent=np.array(positions,dtype=float)
+        exponent-=mean
+        np.square(exponent,out=exponent)
+        exponent*=-1/(2*stdev**2)
+        np.exp(exponent,out=exponent)
+        exponent*=1/(stdev*SQRT_2PI)
+        return exponent
+
     @property
     def coefficient(self)->CurveValueT:
         """
@@ -52,7 +68,7 @@ class GaussianCurve(CurveBase[CurveValueT]):
         return 1/(self.stdev*SQRT_2PI)
     @coefficient.setter
     def coefficient(self,coefficient:CurveValueT):
-        self.stdev=SQRT_2PI/coefficient
+        self.stdev=1.0/(coefficient*SQRT_2PI)
 
     @property
     def stdev(self)->CurveValueT:
@@ -60,6 +76,10 @@ class GaussianCurve(CurveBase[CurveValueT]):
         Standard deviation
         """
         return self._stdev
+    @stdev.setter
+    def stdev(self,stdev:CurveValueT):
+        self._stdev=stdev
+        self._modified()
 
     @property
     def mean(self)->CurveValueT:
@@ -67,3 +87,7 @@ class GaussianCurve(CurveBase[CurveValueT]):
         Arithmatic mean
         """
         return self._mean
+    @mean.setter
+    def mean(self,mean:CurveValueT):
+        self._mean=mean
+        self._modified()
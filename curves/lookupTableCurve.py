@@ -0,0 +1,196 @@
+"""
+A curve that looks its values up in a precalculated table
+"""
+import typing
+import numpy as np
+from .curveBase import CurveBase,CurveValueT,CurveTimeValue
+
+
+# the fewest and most entries compileLUT() will try
+MIN_TABLE_SIZE=64
+MAX_TABLE_SIZE=1<<24
+
+
+class LookupTableCurve(CurveBase[CurveValueT]):
+    """
+    A curve that looks its values up in a precalculated table
+    (like a wavetable) rather than calculating them
+
+    Evaluating is just a gather and a lerp (or a 4-point cubic),
+    no matter how expensive the original curve is.  Outside the
+    table, the original curve is used.
+
+    If the original curve is modified, the table is rebuilt.
+
+    Usually you create this with curve.compileLUT()
+    """
+
+    releasesGil=True
+
+    def __init__(self,
+        curve:CurveBase,
+        tableStart:CurveTimeValue,
+        tableStop:CurveTimeValue,
+        size:int,
+        interpolation:str='linear'):
+        """
+        :tableStart,tableStop: the range the table covers (inclusive)
+        :size: how many entries are in the table
+        :interpolation: 'linear' or 'cubic' (Catmull-Rom)
+        """
+        if interpolation not in ('linear','cubic'):
+            raise ValueError(f'Unknown table interpolation "{interpolation}"') # noqa: E501 # pylint: disable=line-too-long
+        if size<2 or tableStop<=tableStart:
+            raise ValueError('A table needs at least 2 entries over a range')
+        self.curve:CurveBase=curve
+        self.tableStart:CurveTimeValue=tableStart
+        self.tableStop:CurveTimeValue=tableStop
+        self.size:int=size
+        self.interpolation:str=interpolation
+        self.spacing:float=(tableStop-tableStart)/(size-1)
+        self._table:np.ndarray=np.empty(0)
+        self._sourceVersion:typing.Optional[int]=None
+        self._build()
+
+    def _build(self)->None:
+        """
+        Fill in the table from the original curve
+
+        A cubic table also gets an extra entry at each end so
+        that every lookup has four neighbors.
+        """
+        padding=1 if self.interpolation=='cubic' else 0
+        indices=np.arange(-padding,self.size+padding,dtype=float)
+        indices*=self.spacing
+        indices+=self.tableStart
+        indices[padding+self.size-1]=self.tableStop # exactly
+        self._table=np.asarray(self.curve.valuesAt(indices),dtype=float)
+        self._sourceVersion=self.curve.version
+        self._modified()
+
+    @property
+    def version(self)->int:
+        """
+        Changes whenever the table or the original curve does
+        """
+        return self._version+self.curve.version
+
+    @property
+    def table(self)->np.ndarray:
+        """
+        The table of values (rebuilt if the original curve has changed)
+        """
+        if self._sourceVersion!=self.curve.version:
+            self._build()
+        return self._table
+
+    @property
+    def start(self)->CurveTimeValue:
+        """
+        Start time of the curve
+        """
+        return self.curve.start
+
+    @property
+    def end(self)->CurveTimeValue:
+        """
+        End time of the curve
+        """
+        return self.curve.end
+
+    @property
+    def timeShift(self)->CurveTimeValue:
+        """
+        Same as the original curve
+        """
+        return self.curve.timeShift
+
+    def valueAt(self,position:CurveTimeValue)->CurveValueT:
+        """
+        Get value at a given point
+        """
+        if not self.tableStart<=position<=self.tableStop:
+            return self.curve.valueAt(position)
+        table=self.table
+        index=(position-self.tableStart)/self.spacing
+        whole=min(int(index),self.size-2)
+        fraction=index-whole
+        if self.interpolation=='linear':
+            low=float(table[whole])
+            return low+fraction*(float(table[whole+1])-low)
+        p0,p1,p2,p3=table[whole:whole+4].tolist()
+        return p1+0.5*fraction*(p2-p0+fraction*(
+            2*p0-5*p1+4*p2-p3+fraction*(3*(p1-p2)+p3-p0)))
+
+    def valuesAt(self,positions:np.ndarray)->np.ndarray:
+        """
+        Get values at an array of points all at once
+        """
+        positions=np.asarray(positions,dtype=float)
+        table=self.table
+        if positions.size and positions.min()>=self.tableStart \
+                and positions.max()<=self.tableStop:
+            return self._lookup(table,positions)
+        inside=(positions>=self.tableStart)&(positions<=self.tableStop)
+        values=np.empty(positions.shape,dtype=float)
+        values[inside]=self._lookup(table,positions[inside])
+        outside=~inside
+        values[outside]=self.curve.valuesAt(positions[outside])
+        return values
+
+    def _lookup(self,table:np.ndarray,positions:np.ndarray)->np.ndarray:
+        """
+        Look up positions that are known to be inside the table
+
+        (This is done in place as much as possible, since it is
+        mostly memory bound)
+        """
+        fraction=positions-self.tableStart
+        fraction*=1/self.spacing
+        whole=fraction.astype(np.intp)
+        np.minimum(whole,self.size-2,out=whole)
+        fraction-=whole
+        if self.interpolation=='linear':
+            values=table.take(whole)
+            whole+=1
+            high=table.take(whole)
+            high-=values
+            high*=fraction
+            values+=high
+            return values
+        # Catmull-Rom, where table[whole+1] is the entry at whole
+        p0=table.take(whole)
+        whole+=1
+        p1=table.take(whole)
+        whole+=1
+        p2=table.take(whole)
+        whole+=1
+        p3=table.take(whole)
+        # p1+0.5*f*(c+f*(b+f*a))
+        a=3*(p1-p2)+p3-p0
+        b=2*p0-5*p1+4*p2-p3
+        c=p2-p0
+        values=a*fraction
+        values+=b
+        values*=fraction
+        values+=c
+        values*=fraction
+        values*=0.5
+        values+=p1
+        return values
+
+    def maxError(self)->float:
+        """
+        The largest difference from the original curve, checked
+        at quarter points between each pair of table entries
+        """
+        positions=np.arange(self.size-1,dtype=float)[:,None]+ \
+            np.array([0.25,0.5,0.75])[None,:]
+        positions=positions.ravel()
+        positions*=self.spacing
+        positions+=self.tableStart
+        return float(np.max(np.abs(
+            self.valuesAt(positions)-self.curve.valuesAt(positions))))
+
+    def __repr__(self):
+        return f'LookupTableCurve({self.curve!r},size={self.size},interpolation={self.interpolation})' # noqa: E501 # pylint: disable=line-too-long
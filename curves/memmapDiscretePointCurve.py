@@ -0,0 +1,231 @@
+"""
+A DiscretePointCurve whose samples live in a file on disk
+"""
+import typing
+import os
+import io
+import weakref
+import numpy as np
+from .errors import CurveException
+from .curveBase import CurveValueT
+from .discretePointCurve import DiscretePointCurve
+
+
+PathLike=typing.Union[str,os.PathLike]
+
+
+class MemmapDiscretePointCurve(DiscretePointCurve[CurveValueT]):
+    """
+    A DiscretePointCurve whose samples live in a file on disk
+
+    The file is memory-mapped, so opening it is O(1) no matter how
+    big it is, and only the pages that are actually looked at are
+    read in.  Appends and changes write through to the file.
+
+    The file can either be a .npy file, or for any other extension,
+    a raw array of samples (in which case dtype must be given).
+
+    While the curve is open, a .npy file may have unused space at
+    the end for appending into.  close() trims it off.  Raw files
+    have nowhere to record how many samples they hold, so they are
+    always grown to exactly the size of the samples.
+    """
+
+    def __init__(self, # pylint: disable=super-init-not-called
+        filename:PathLike,
+        dtype:typing.Optional[np.dtype]=None,
+        mode:str='r+',
+        interpolation:str='linear'):
+        """
+        :mode: the same as for np.memmap
+            'r' read only
+            'r+' read and write
+            'w+' create or overwrite
+            'c' copy on write (changes are not saved, cannot append)
+        """
+        self.filename:str=os.fspath(filename)
+        # views of the samples that have been handed out
+        # (ndarrays cannot go in a WeakSet, since they are unhashable)
+        self._views:typing.List["weakref.ref[np.ndarray]"]=[]
+        self.mode:str=mode
+        self.interpolation:str=interpolation
+        self._isNpy:bool=self.filename.lower().endswith('.npy')
+        if mode=='w+':
+            self._create(np.dtype(float if dtype is None else dtype))
+        if self._isNpy:
+            self._readHeader()
+            if dtype is not None and np.dtype(dtype)!=self._dtype:
+                raise CurveException(f'"{self.filename}" contains {self._dtype} not {np.dtype(dtype)}') # noqa: E501 # pylint: disable=line-too-long
+        else:
+            if dtype is None:
+                raise CurveException('dtype is required for raw sample files') # noqa: E501 # pylint: disable=line-too-long
+            self._dtype=np.dtype(dtype)
+            self._offset=0
+            self._count=os.path.getsize(self.filename)//self._dtype.itemsize
+        capacity=(os.path.getsize(self.filename)-self._offset) \
+            //self._dtype.itemsize
+        self._map(capacity)
+
+    @property
+    def writable(self)->bool:
+        """
+        Can this curve be appended to
+        """
+        return self.mode in ('r+','w+')
+
+    def _create(self,dtype:np.dtype)->None:
+        """
+        Create a new, empty, file
+        """
+        with open(self.filename,'wb') as f:
+            if self._isNpy:
+                f.write(self._header(dtype,0))
+
+    def _header(self,dtype:np.dtype,count:int)->bytes:
+        """
+        Create a .npy file header
+        """
+        header=io.BytesIO()
+        np.lib.format.write_array_header_1_0(header,{
+            'descr':np.lib.format.dtype_to_descr(dtype),
+            'fortran_order':False,
+            'shape':(count,)})
+        return header.getvalue()
+
+    def _readHeader(self)->None:
+        """
+        Get the dtype, sample count, and data offset
+        from a .npy file header
+        """
+        with open(self.filename,'rb') as f:
+            version=np.lib.format.read_magic(f)
+            if version==(1,0):
+                shape,_,dtype=np.lib.format.read_array_header_1_0(f)
+            else:
+                shape,_,dtype=np.lib.format.read_array_header_2_0(f)
+            self._offset=f.tell()
+        if len(shape)!=1:
+            raise CurveException(f'"{self.filename}" is not a 1D array')
+        self._dtype=dtype
+        self._count=int(np.prod(shape))
+
+    def _writeHeader(self)->None:
+        """
+        Update the sample count in a .npy file header
+        """
+        header=self._header(self._dtype,self._count)
+        if len(header)!=self._offset:
+            raise CurveException(f'Cannot update the header of "{self.filename}" in place') # noqa: E501 # pylint: disable=line-too-long
+        with open(self.filename,'r+b') as f:
+            f.write(header)
+
+    def _map(self,capacity:int)->None:
+        """
+        Memory-map the first capacity samples of the file
+        """
+        if capacity<=0:
+            # it is not possible to mmap zero bytes
+            self._buffer=np.empty(0,dtype=self._dtype)
+            return
+        mode='r+' if self.mode=='w+' else self.mode
+        self._buffer=np.memmap(self.filename,dtype=self._dtype,
+            mode=mode,offset=self._offset,shape=(capacity,))
+
+    def _exportView(self,view:np.ndarray)->np.ndarray:
+        """
+        Make a view of the memory map safe to hand out,
+        and keep track of it until it goes away
+        """
+        view=super()._exportView(view)
+        self._pruneViews()
+        self._views.append(weakref.ref(view))
+        return view
+
+    def _pruneViews(self)->None:
+        """
+        Forget about views that have gone away
+        """
+        self._views=[ref for ref in self._views if ref() is not None]
+
+    @property
+    def viewsExported(self)->bool:
+        """
+        Are any views of the memory map (eg, from samples()
+        or iterChunks()) still alive
+
+        While they are, the file cannot be shrunk.
+        (Only the views handed out are tracked, so slicing one and
+        keeping just the slice is not noticed.  Copy it instead.)
+        """
+        self._pruneViews()
+        return len(self._views)>0
+
+    def reserve(self,capacity:int)->None:
+        """
+        Make sure there is room for at least this many samples
+        without growing the file
+
+        (Does nothing for raw files, which never have unused space)
+        """
+        if self._isNpy:
+            super().reserve(capacity)
+
+    def _reallocate(self,
+        capacity:int,
+        dtype:typing.Optional[np.dtype]=None
+        )->None:
+        """
+        Grow or shrink the file, then map it again
+        """
+        if not self.writable:
+            raise CurveException(f'"{self.filename}" is opened read-only')
+        if dtype is not None and dtype!=self._dtype:
+            raise CurveException(f'Cannot change "{self.filename}" from {self._dtype} to {dtype}') # noqa: E501 # pylint: disable=line-too-long
+        if capacity<self.capacity and self.viewsExported:
+            # views of pages past the new end of the file would crash
+            # the whole process (SIGBUS) when they were next touched
+            raise CurveException(f'Cannot shrink "{self.filename}" while views of its samples (eg, from samples() or iterChunks()) are still in use') # noqa: E501 # pylint: disable=line-too-long
+        self.flush()
+        self._buffer=np.empty(0,dtype=self._dtype)
+        os.truncate(self.filename,self._offset+capacity*self._dtype.itemsize)
+        self._map(capacity)
+
+    def _appendArray(self,values:np.ndarray)->None:
+        """
+        Append a flat array of values, growing the file if necessary
+        """
+        if not np.can_cast(values.dtype,self._dtype,'same_kind'):
+            raise CurveException(f'Cannot append {values.dtype} values to "{self.filename}" which is {self._dtype}') # noqa: E501 # pylint: disable=line-too-long
+        newCount=self._count+len(values)
+        if not self._isNpy and newCount>self.capacity:
+            # grow to exactly fit, since the file size is the count
+            self._reallocate(newCount)
+        super()._appendArray(values.astype(self._dtype,copy=False))
+        if self._isNpy:
+            self._writeHeader()
+
+    def flush(self)->None:
+        """
+        Make sure all changes are written to the file
+        """
+        if isinstance(self._buffer,np.memmap):
+            self._buffer.flush()
+
+    def close(self)->None:
+        """
+        Write everything out, trim any unused space off the end
+        of the file, and release the memory map
+
+        Any views of the samples must be released (or copied) first
+        """
+        if self.writable:
+            self.shrinkToFit()
+        self.flush()
+        self._buffer=np.empty(0,dtype=self._dtype)
+        self._count=0
+
+    def __enter__(self)->"MemmapDiscretePointCurve":
+        return self
+
+    def __exit__(self,*args)->None:
+        self.close()
@@ -0,0 +1,210 @@
+"""
+Sample curves in parallel
+
+Curves whose evaluation releases the GIL (numpy ufuncs and the like)
+are split across threads.  Others are split across processes,
+which write straight into a shared memory output array so that
+the results never need to be pickled.
+"""
+import typing
+import weakref
+import concurrent.futures
+from multiprocessing import shared_memory
+import numpy as np
+from .curveBase import CurveBase,CurveTimeValue
+
+
+# below this many samples per worker, it is not worth splitting up
+MIN_SAMPLES_PER_WORKER=16384
+
+
+def _shardRanges(count:int,shardCount:int)->typing.List[typing.Tuple[int,int]]:
+    """
+    Split range(count) into up to shardCount (start,stop) pieces
+    """
+    bounds=np.linspace(0,count,max(min(shardCount,count),1)+1).astype(int)
+    return list(zip(bounds[:-1].tolist(),bounds[1:].tolist()))
+
+
+def _samplePositions(
+    start:CurveTimeValue,
+    step:CurveTimeValue,
+    first:int,
+    count:int
+    )->np.ndarray:
+    """
+    Positions first..first+count of np.arange(start,stop,step)
+
+    These are worked out exactly the way np.arange does it,
+    (start+i*((start+step)-start)) so that a shard comes out
+    bit-for-bit the same as the serial samples.
+    """
+    positions=np.arange(first,first+count,dtype=float)
+    positions*=(start+step)-start
+    positions+=start
+    return positions
+
+
+def _sharedArray(
+    shape:typing.Tuple[int,...]
+    )->typing.Tuple[np.ndarray,shared_memory.SharedMemory]:
+    """
+    Create a float array in shared memory
+
+    The caller unlinks the shared memory once the workers are done
+    with it by name.  The mapping itself stays open, and is closed
+    when the array (and any views of it) are garbage collected.
+    """
+    memory=shared_memory.SharedMemory(
+        create=True,size=max(int(np.prod(shape))*8,1))
+    out=np.ndarray(shape,dtype=float,buffer=memory.buf)
+    weakref.finalize(out,memory.close)
+    return out,memory
+
+
+def _useProcesses(curves:typing.Iterable[CurveBase])->bool:
+    """
+    Processes are only needed if something holds on to the GIL
+    """
+    return not all(curve.releasesGil for curve in curves)
+
+
+def _sampleInto(
+    curves:typing.Sequence[CurveBase],
+    out:np.ndarray,
+    start:CurveTimeValue,
+    step:CurveTimeValue,
+    first:int
+    )->None:
+    """
+    Fill out[curve,sample] with samples first,first+1,... of each curve
+    """
+    positions=_samplePositions(start,step,first,out.shape[1])
+    for row,curve in zip(out,curves):
+        row[:]=curve.valuesAt(positions)
+
+
+def _sampleIntoSharedMemory(
+    curves:typing.Sequence[CurveBase],
+    memoryName:str,
+    shape:typing.Tuple[int,int],
+    rows:typing.Tuple[int,int],
+    columns:typing.Tuple[int,int],
+    start:CurveTimeValue,
+    step:CurveTimeValue
+    )->None:
+    """
+    Process pool worker that samples into a shared memory array
+    """
+    memory=shared_memory.SharedMemory(name=memoryName)
+    try:
+        out=np.ndarray(shape,dtype=float,buffer=memory.buf)
+        _sampleInto(curves,
+            out[rows[0]:rows[1],columns[0]:columns[1]],
+            start,step,columns[0])
+        del out
+    finally:
+        memory.close()
+
+
+def _sampleShards(
+    curves:typing.Sequence[CurveBase],
+    start:CurveTimeValue,
+    step:CurveTimeValue,
+    count:int,
+    shards:typing.List[typing.Tuple[
+        typing.Tuple[int,int],typing.Tuple[int,int]]],
+    workers:int,
+    useProcesses:bool
+    )->np.ndarray:
+    """
+    Sample each (rows,columns) shard of a (curves x count) output array
+    """
+    shape=(len(curves),count)
+    if not useProcesses:
+        out=np.empty(shape,dtype=float)
+        with concurrent.futures.ThreadPoolExecutor(workers) as pool:
+            futures=[pool.submit(_sampleInto,
+                curves[rows[0]:rows[1]],
+                out[rows[0]:rows[1],columns[0]:columns[1]],
+                start,step,columns[0])
+                for rows,columns in shards]
+            for future in futures:
+                future.result()
+        return out
+    # the output is the shared memory itself, so it is never copied
+    out,memory=_sharedArray(shape)
+    try:
+        with concurrent.futures.ProcessPoolExecutor(workers) as pool:
+            futures=[pool.submit(_sampleIntoSharedMemory,
+                curves[rows[0]:rows[1]],memory.name,shape,
+                rows,columns,start,step)
+                for rows,columns in shards]
+            for future in futures:
+                future.result()
+    finally:
+        memory.unlink()
+    return out
+
+
+def parallelSamples(
+    curve:CurveBase,
+    start:CurveTimeValue,
+    stop:CurveTimeValue,
+    step:CurveTimeValue=1,
+    workers:int=2,
+    useProcesses:typing.Optional[bool]=None
+    )->np.ndarray:
+    """
+    Get a block of samples from one curve,
+    splitting the range across workers
+
+    :useProcesses: force processes (True) or threads (False)
+        the default is to decide based on curve.releasesGil
+    """
+    count=max(int(np.ceil((stop-start)/step)),0)
+    workers=min(workers,max(count//MIN_SAMPLES_PER_WORKER,1))
+    if workers<=1:
+        return curve.valuesAt(curve.samplePositions(start,stop,step))
+    if useProcesses is None:
+        useProcesses=_useProcesses((curve,))
+    shards=[((0,1),columns) for columns in _shardRanges(count,workers)]
+    return _sampleShards([curve],start,step,count,shards,
+        workers,useProcesses)[0]
+
+
+def sampleMany(
+    curves:typing.Sequence[CurveBase],
+    start:CurveTimeValue,
+    stop:CurveTimeValue,
+    step:CurveTimeValue=1,
+    workers:typing.Optional[int]=None,
+    useProcesses:typing.Optional[bool]=None
+    )->np.ndarray:
+    """
+    Sample many curves over the same range
+
+    Returns a (curves x samples) array
+
+    :workers: how many threads/processes to use (default=1)
+    :useProcesses: force processes (True) or threads (False)
+        the default is to decide based on curve.releasesGil
+    """
+    curves=list(curves)
+    count=max(int(np.ceil((stop-start)/step)),0)
+    if workers is None or workers<=1 or len(curves)*count==0:
+        out=np.empty((len(curves),count),dtype=float)
+        _sampleInto(curves,out,start,step,0)
+        return out
+    if useProcesses is None:
+        useProcesses=_useProcesses(curves)
+    if len(curves)>=workers:
+        # give each worker several groups of curves to balance the load
+        shards=[(rows,(0,count))
+            for rows in _shardRanges(len(curves),workers*4)]
+    else:
+        shards=[((row,row+1),columns)
+            for row in range(len(curves))
+            for columns in _shardRanges(count,workers)]
+    return _sampleShards(curves,start,step,count,shards,
+        workers,useProcesses)
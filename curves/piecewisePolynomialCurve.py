@@ -0,0 +1,185 @@
+"""
+A curve made of a different polynomial for each segment
+"""
+import typing
+import numpy as np
+from .curveBase import (
+    CurveBase,asCurve,CurveValueT,CurveTimeValue,CurveCompatible)
+
+
+class PiecewisePolynomialCurve(CurveBase[CurveValueT]):
+    """
+    A curve made of a different polynomial for each segment
+
+    Segment i runs from breakpoints[i] to breakpoints[i+1] and
+    its value is the polynomial coefficients[i] (highest power first)
+    of the distance from breakpoints[i].  Using the local distance
+    keeps the coefficients small and accurate no matter how
+    long the curve is.
+
+    This can represent a long signal compactly, where one polynomial
+    would need an enormous order.
+    """
+
+    releasesGil=True
+
+    def __init__(self,
+        breakpoints:np.ndarray,
+        coefficients:np.ndarray):
+        """
+        :breakpoints: k+1 increasing segment boundaries
+        :coefficients: k by (order+1) array of segment polynomials
+        """
+        breakpoints=np.asarray(breakpoints,dtype=float)
+        coefficients=np.array(coefficients,dtype=float,ndmin=2)
+        if len(breakpoints)!=len(coefficients)+1:
+            raise ValueError('There must be one more breakpoint than there are segments') # noqa: E501 # pylint: disable=line-too-long
+        self.breakpoints=breakpoints
+        self.coefficients=coefficients
+
+    @property
+    def breakpoints(self)->np.ndarray:
+        """
+        The segment boundaries
+
+        (Read-only, assign a new array to change them)
+        """
+        return self._breakpoints
+    @breakpoints.setter
+    def breakpoints(self,breakpoints:np.ndarray):
+        breakpoints=np.array(breakpoints,dtype=float)
+        if np.any(np.diff(breakpoints)<=0):
+            raise ValueError('breakpoints must be increasing')
+        breakpoints.flags.writeable=False
+        self._breakpoints=breakpoints
+        self._modified()
+
+    @property
+    def coefficients(self)->np.ndarray:
+        """
+        The polynomial of each segment, highest power first
+
+        (Read-only, assign a new array to change them)
+        """
+        return self._coefficients
+    @coefficients.setter
+    def coefficients(self,coefficients:np.ndarray):
+        coefficients=np.array(coefficients,dtype=float,ndmin=2)
+        coefficients.flags.writeable=False
+        self._coefficients=coefficients
+        self._modified()
+
+    @classmethod
+    def fromCurve(cls,
+        curve:CurveCompatible,
+        segmentLength:int=1024,
+        order:int=3
+        )->"PiecewisePolynomialCurve":
+        """
+        Fit a polynomial to every segmentLength samples of a curve
+
+        All the full-length segments share the same local x values,
+        so they are all fitted by least squares in a single solve.
+
+        (Segments are fitted independently, so there may be small
+        jumps where they meet.)
+        """
+        curve=asCurve(curve)
+        x=curve.samplePositions()
+        y=curve.valuesAt(x)
+        count=len(y)
+        if count<2:
+            raise ValueError('Need at least 2 samples to fit')
+        segmentLength=max(min(segmentLength,count),2)
+        order=min(order,segmentLength-1)
+        fullSegments=count//segmentLength
+        # a short leftover segment is merged into the one before it
+        leftover=count-fullSegments*segmentLength
+        if 0<leftover<=order:
+            fullSegments-=1
+        breakpoints=list(x[:fullSegments*segmentLength:segmentLength])
+        local=x[:segmentLength]-x[0]
+        vandermonde=np.vander(local,order+1)
+        rows=y[:fullSegments*segmentLength].reshape(
+            fullSegments,segmentLength)
+        solution,_,_,_=np.linalg.lstsq(vandermonde,rows.T,rcond=None)
+        coefficients=[solution.T]
+        tailStart=fullSegments*segmentLength
+        if tailStart<count:
+            breakpoints.append(x[tailStart])
+            tailLocal=x[tailStart:]-x[tailStart]
+            tail,_,_,_=np.linalg.lstsq(
+                np.vander(tailLocal,order+1),y[tailStart:],rcond=None)
+            coefficients.append(tail[None,:])
+        breakpoints.append(x[-1]+(x[-1]-x[-2]))
+        return cls(np.array(breakpoints),np.concatenate(coefficients))
+
+    @property
+    def start(self)->CurveTimeValue:
+        """
+        Start time of the curve
+        """
+        return float(self.breakpoints[0])
+
+    @property
+    def end(self)->CurveTimeValue:
+        """
+        End time of the curve
+        """
+        return float(self.breakpoints[-1])
+
+    @property
+    def order(self)->int:
+        """
+        The order of the segment polynomials
+        """
+        return self.coefficients.shape[1]-1
+
+    @property
+    def segmentCount(self)->int:
+        """
+        How many segments there are
+        """
+        return len(self.coefficients)
+
+    def segmentAt(self,
+        positions:typing.Union[CurveTimeValue,np.ndarray]
+        )->typing.Union[int,np.ndarray]:
+        """
+        Find which segment each position is in
+
+        Positions off either end belong to the first or last segment
+        """
+        indices=np.searchsorted(self.breakpoints,positions,side='right')-1
+        return np.clip(indices,0,self.segmentCount-1)
+
+    def valueAt(self,position:CurveTimeValue)->CurveValueT:
+        """
+        Get value at a given point
+        """
+        segment=int(self.segmentAt(position))
+        local=position-self.breakpoints[segment]
+        result=0.0
+        for coefficient in self.coefficients[segment].tolist():
+            result=result*local+coefficient
+        return result
+
+    def valuesAt(self,positions:np.ndarray)->np.ndarray:
+        """
+        Get values at an array of points all at once
+
+        Every point is evaluated in the same pass, each with the
+        coefficients of its own segment.
+        """
+        positions=np.asarray(positions,dtype=float)
+        segments=self.segmentAt(positions)
+        local=positions-self.breakpoints[segments]
+        coefficients=self.coefficients
+        out=coefficients[segments,0]
+        for power in range(1,coefficients.shape[1]):
+            out*=local
+            out+=coefficients[segments,power]
+        return out
+
+    def __repr__(self):
+        return f'PiecewisePolynomialCurve(segments={self.segmentCount},order={self.order},start={self.start},end={self.end})' # noqa: E501 # pylint: disable=line-too-long
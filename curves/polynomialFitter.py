@@ -0,0 +1,227 @@
+"""
+Least-squares polynomial fitting that can keep up with a growing curve
+"""
+import typing
+import math
+import numpy as np
+from .curveBase import CurveBase,CurveTimeValue
+from .errors import NonDiscreteCurveException
+if typing.TYPE_CHECKING:
+    from .quadraticCurve import QuadraticCurve
+
+
+# re-center once x values get this many scales away from the center
+REBASE_LIMIT=4.0
+
+
+class StreamingPolyFitter:
+    """
+    Least-squares polynomial fitting that can keep up with a growing curve
+
+    Rather than keeping the samples, this keeps the sums needed for
+    the normal equations (sum of w*u**k and sum of w*u**k*y, where
+    u=(x-center)/scale), so adding more samples never means going
+    back over the old ones.
+
+    Centering and scaling x keeps the sums well conditioned.  If new x
+    values wander too far away, the sums are shifted to a new center.
+
+    Usage:
+        fitter=StreamingPolyFitter(order=1)
+        fitter.update(curve) # then call again whenever curve grows
+        trend=fitter.fit()
+    """
+
+    def __init__(self,
+        order:int=1,
+        forgetting:float=1.0,
+        center:typing.Optional[float]=None,
+        scale:typing.Optional[float]=None):
+        """
+        :order: the order of polynomial to fit (1=line, 2=parabola, etc)
+        :forgetting: each new sample multiplies the weight of all
+            older samples by this (1.0=never forget)
+        :center,scale: how to normalize x (default is to work it out
+            from the first samples)
+        """
+        if not 0.0<forgetting<=1.0:
+            raise ValueError('forgetting must be in the range (0,1]')
+        self.order:int=order
+        self.forgetting:float=forgetting
+        self.center:typing.Optional[float]=center
+        self.scale:typing.Optional[float]=scale
+        self.nextPosition:typing.Optional[CurveTimeValue]=None
+        self.count:int=0
+        self._powerSums:np.ndarray=np.zeros(2*order+1)
+        self._valueSums:np.ndarray=np.zeros(order+1)
+        self._xRange:typing.Tuple[float,float]=(math.inf,-math.inf)
+
+    def reset(self)->None:
+        """
+        Forget all samples
+        """
+        self._powerSums=np.zeros(2*self.order+1)
+        self._valueSums=np.zeros(self.order+1)
+        self.count=0
+        self._xRange=(math.inf,-math.inf)
+        self.nextPosition=None
+
+    @property
+    def weight(self)->float:
+        """
+        The total weight of the samples (the count, if not forgetting)
+        """
+        return float(self._powerSums[0])
+
+    def add(self,
+        y:np.ndarray,
+        x:typing.Optional[np.ndarray]=None
+        )->None:
+        """
+        Add samples
+
+        :x: positions of the samples (default is to carry on
+            one at a time from the last ones added)
+        """
+        y=np.asarray(y,dtype=float).ravel()
+        if len(y)==0:
+            return
+        if x is None:
+            start=0 if self.nextPosition is None else self.nextPosition
+            x=np.arange(len(y),dtype=float)
+            x+=start
+        else:
+            x=np.asarray(x,dtype=float).ravel()
+        self.nextPosition=x[-1]+1
+        self._xRange=(min(self._xRange[0],x.min()),
+            max(self._xRange[1],x.max()))
+        if self.center is None or self.scale is None:
+            self._pickNormalization()
+        elif max(abs(self._xRange[0]-self.center),
+                abs(self._xRange[1]-self.center))>REBASE_LIMIT*self.scale:
+            self.rebase()
+        u=x-self.center
+        u/=self.scale
+        weights=np.ones(len(y))
+        if self.forgetting<1.0:
+            self._powerSums*=self.forgetting**len(y)
+            self._valueSums*=self.forgetting**len(y)
+            weights=self.forgetting**np.arange(len(y)-1,-1,-1,dtype=float)
+        powers=np.vander(u,2*self.order+1,increasing=True)
+        self._powerSums+=weights@powers
+        self._valueSums+=(weights*y)@powers[:,:self.order+1]
+        self.count+=len(y)
+
+    def update(self,
+        curve:CurveBase,
+        chunkSize:typing.Optional[int]=None
+        )->None:
+        """
+        Add any samples of a discrete curve that have not been added yet
+
+        Call this again after appending to the curve to
+        fit the new samples as well. (Only appended samples are
+        picked up, not changes to ones already added.)
+        """
+        if not curve.isDiscrete:
+            raise NonDiscreteCurveException('Cannot fit all points of an infinite curve') # noqa: E501 # pylint: disable=line-too-long
+        start=self.nextPosition
+        if start is None:
+            start=curve.start+curve.timeShift
+        offset=0
+        for chunk in curve.iterChunks(start,chunkSize=chunkSize):
+            # the same positions iterChunks() sampled at
+            x=np.arange(offset,offset+len(chunk),dtype=float)
+            x+=start
+            self.add(chunk,x)
+            offset+=len(chunk)
+
+    def _pickNormalization(self)->None:
+        """
+        Choose the center and scale from the x range seen so far
+        """
+        low,high=self._xRange
+        center=(low+high)/2 if self.center is None else self.center
+        scale=self.scale
+        if scale is None:
+            scale=max((high-low)/2,1.0)
+        if self.count>0:
+            self.rebase(center,scale)
+        else:
+            self.center,self.scale=center,scale
+
+    def rebase(self,
+        center:typing.Optional[float]=None,
+        scale:typing.Optional[float]=None
+        )->None:
+        """
+        Change the center and scale of x, adjusting the sums to match
+
+        (default is to fit the x range seen so far)
+        """
+        low,high=self._xRange
+        if center is None:
+            center=(low+high)/2
+        if scale is None:
+            scale=max((high-low)/2,1.0)
+        # newU=a*u+d, so sum(newU**k)=sum(C(k,j)*a**j*d**(k-j)*u**j)
+        a=self.scale/scale
+        d=(self.center-center)/scale
+        size=2*self.order+1
+        transform=np.zeros((size,size))
+        for k in range(size):
+            for j in range(k+1):
+                transform[k,j]=math.comb(k,j)*a**j*d**(k-j)
+        self._powerSums=transform@self._powerSums
+        self._valueSums=transform[:self.order+1,:self.order+1]@ \
+            self._valueSums
+        self.center,self.scale=center,scale
+
+    @property
+    def normalizedCoefficients(self)->np.ndarray:
+        """
+        Coefficients for u=(x-center)/scale, lowest power first
+        """
+        if self.count==0:
+            raise ValueError('Nothing to fit')
+        order=self.order
+        indices=np.arange(order+1)
+        gram=self._powerSums[indices[:,None]+indices[None,:]]
+        coefficients,_,_,_=np.linalg.lstsq(gram,self._valueSums,rcond=None)
+        return coefficients
+
+    @property
+    def coefficients(self)->np.ndarray:
+        """
+        Coefficients for x, highest power first (like np.polyfit)
+        """
+        normalized=np.polynomial.Polynomial(self.normalizedCoefficients)
+        u=np.polynomial.Polynomial(
+            [-self.center/self.scale,1.0/self.scale])
+        coefficients=np.zeros(self.order+1)
+        xCoefficients=normalized(u).coef
+        coefficients[:len(xCoefficients)]=xCoefficients
+        return coefficients[::-1]
+
+    def evaluate(self,x:np.ndarray)->np.ndarray:
+        """
+        Evaluate the best fit so far at x
+
+        This works in normalized x, so stays accurate for high
+        orders far from zero, where the plain coefficients of
+        fit() can lose precision.
+        """
+        u=np.asarray(x,dtype=float)-self.center
+        u/=self.scale
+        return np.polynomial.polynomial.polyval(
+            u,self.normalizedCoefficients)
+
+    def fit(self)->"QuadraticCurve":
+        """
+        Get the best fit to the samples so far
+        """
+        from .quadraticCurve import QuadraticCurve
+        return QuadraticCurve(self.coefficients)
+
+    def __repr__(self):
+        return f'StreamingPolyFitter(order={self.order},count={self.count},forgetting={self.forgetting})' # noqa: E501 # pylint: disable=line-too-long
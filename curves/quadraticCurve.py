@@ -13,24 +13,55 @@ def asQuadraticCurve(curve:CurveCompatible,order:int=1):
 
     If it is already a QuadraticCurve, return it.
     Otherwise, fit a QuadraticCurve to the data.
+
+    The fit is done a chunk at a time, so the samples never all
+    need to be in memory.  To keep refitting a curve as it grows,
+    use a StreamingPolyFitter directly.
     """
     if isinstance(curve,QuadraticCurve):
         return curve
-    curve=asCurve(curve).samples()
-    x=np.array(range(len(curve)))
-    coeffients=np.polyfit(x,curve,deg=order)
-    return QuadraticCurve(coeffients)
+    from .polynomialFitter import StreamingPolyFitter
+    fitter=StreamingPolyFitter(order)
+    fitter.update(asCurve(curve))
+    return fitter.fit()
 
 
 class QuadraticCurve(CurveBase[CurveValueT]):
     """
     A basic quadratic curve
     """
+
+    releasesGil=True
     def __init__(self,
         coeffients:np.ndarray):
         """ """
         self.coeffients=coeffients
 
+    @property
+    def coeffients(self)->np.ndarray:
+        """
+        Polynomial coefficients, highest power first
+
+        (Read-only, assign a new array to change them)
+        """
+        return self._coefficients64
+    @coeffients.setter
+    def coeffients(self,coeffients:np.ndarray):
+        # ready to go for each kind of solve()
+        self.isComplex:bool=bool(np.iscomplexobj(coeffients))
+        if self.isComplex:
+            self._coefficients64=np.array(
+                coeffients,dtype=np.complex128,ndmin=1)
+            self._coefficients32=self._coefficients64.astype(np.complex64)
+        else:
+            self._coefficients64=np.array(
+                coeffients,dtype=np.float64,ndmin=1)
+            self._coefficients32=self._coefficients64.astype(np.float32)
+        self._coefficients64.flags.writeable=False
+        self._coefficients32.flags.writeable=False
+        self._scalarCoefficients=tuple(self._coefficients64.tolist())
+        self._modified()
+
     @property
     def start(self)->CurveTimeValue:
         """
@@ -52,12 +83,52 @@ class QuadraticCurve(CurveBase[CurveValueT]):
         """
         return len(self.coeffients)
 
-    def solve(self,x:np.ndarray)->np.ndarray:
+    def solve(self,
+        x:typing.Union[float,np.ndarray],
+        out:typing.Optional[np.ndarray]=None,
+        dtype:typing.Optional[np.dtype]=None
+        )->typing.Union[float,np.ndarray]:
         """
         Solve the function for a given x
+
+        This uses Horner's method, in place, so needs no more
+        memory than the result.
+
+        :out: array to put the results in (its dtype is used)
+        :dtype: float32 or float64 (default is float32 if x is float32,
+            otherwise float64).  With complex coefficients, these
+            become complex64 or complex128.
         """
-        poly=np.poly1d(self.coeffients)
-        return poly(x)
+        if out is None and np.ndim(x)==0 and dtype is None:
+            # a single value, so plain python is quickest
+            value=complex(x) if np.iscomplexobj(x) else float(x)
+            result=0.0
+            for coefficient in self._scalarCoefficients:
+                result=result*value+coefficient
+            return result
+        x=np.asarray(x)
+        if out is not None:
+            dtype=out.dtype
+        elif dtype is None:
+            dtype=np.float32 if x.dtype in (np.float32,np.complex64) \
+                else np.float64
+        single=np.dtype(dtype) in (np.float32,np.complex64)
+        coefficients=self._coefficients32 if single \
+            else self._coefficients64
+        if out is None:
+            if self.isComplex or np.iscomplexobj(x):
+                dtype=np.complex64 if single else np.complex128
+            out=np.empty(x.shape,dtype=dtype)
+        if len(coefficients)==0:
+            out[...]=0
+            return out
+        out[...]=coefficients[0]
+        if len(coefficients)>1:
+            x=x.astype(dtype,copy=False)
+            for coefficient in coefficients[1:]:
+                out*=x
+                out+=coefficient
+        return out
     __call__=solve
 
     def valueAt(self,position:CurveTimeValue)->CurveValueT:
@@ -66,13 +137,12 @@ class QuadraticCurve(CurveBase[CurveValueT]):
         """
         return self.solve(position)
 
-    def samples(self,
-        start:typing.Optional[CurveTimeValue]=None,
-        stop:typing.Optional[CurveTimeValue]=None,
-        step:CurveTimeValue=1
-        )->np.ndarray:
+    def valuesAt(self,positions:np.ndarray)->np.ndarray:
         """
-        Get a block of samples
+        Get values at an array of points all at once
         """
-        return self.solve(np.array(range(start,stop,step)))
+        positions=np.asarray(positions)
+        if not np.iscomplexobj(positions):
+            positions=positions.astype(float,copy=False)
+        return self.solve(positions,dtype=np.float64)
 LinearCurve=QuadraticCurve
@@ -0,0 +1,167 @@
+"""
+A process-wide cache of blocks of samples
+"""
+import typing
+import collections
+import threading
+import weakref
+import numpy as np
+if typing.TYPE_CHECKING:
+    from .curveBase import CurveBase
+
+
+DEFAULT_MAX_BYTES=64*1024*1024
+
+SampleKey=typing.Tuple[int,int,float,float,float]
+
+
+class SampleCache:
+    """
+    A cache of blocks of samples, shared by every curve
+
+    Blocks are keyed by (curve,version,start,stop,step), so a curve
+    being modified means its old blocks are never looked at again
+    (and they soon fall out the end of the cache).
+
+    The least recently used blocks are thrown away to keep the total
+    under maxBytes.  Curves are only weakly referenced, so caching
+    never keeps a curve alive, and a curve's blocks are dropped
+    when it goes away.
+
+    Cached arrays are read-only, since they are shared.
+    """
+
+    def __init__(self,maxBytes:int=DEFAULT_MAX_BYTES):
+        """
+        :maxBytes: how much memory the cache may use (0=disabled)
+        """
+        self.maxBytes:int=maxBytes
+        self.bytes:int=0
+        self.hits:int=0
+        self.misses:int=0
+        self.evictions:int=0
+        self._entries:typing.OrderedDict[SampleKey,np.ndarray]= \
+            collections.OrderedDict()
+        # the curves that have blocks cached, by id
+        self._curves:typing.Dict[int,weakref.ref]={}
+        # reentrant, since a curve can be garbage collected (calling
+        # forget()) while the lock is held
+        self._lock=threading.RLock()
+
+    @property
+    def enabled(self)->bool:
+        """
+        Whether anything will be cached
+        """
+        return self.maxBytes>0
+
+    def __len__(self)->int:
+        return len(self._entries)
+
+    def get(self,
+        curve:"CurveBase",
+        start:float,
+        stop:float,
+        step:float
+        )->typing.Optional[np.ndarray]:
+        """
+        Get a cached block of samples, or None
+        """
+        key=(id(curve),curve.version,start,stop,step)
+        with self._lock:
+            samples=self._entries.get(key)
+            if samples is None:
+                self.misses+=1
+                return None
+            ref=self._curves.get(key[0])
+            if ref is None or ref() is not curve:
+                # a different curve that happens to have the same id
+                self.misses+=1
+                return None
+            self._entries.move_to_end(key)
+            self.hits+=1
+        return samples
+
+    def put(self,
+        curve:"CurveBase",
+        start:float,
+        stop:float,
+        step:float,
+        samples:np.ndarray
+        )->np.ndarray:
+        """
+        Add a block of samples to the cache
+
+        Returns the cached samples, which are read-only (unless
+        they were too big to cache)
+        """
+        if samples.nbytes>self.maxBytes:
+            return samples
+        samples.flags.writeable=False
+        curveId=id(curve)
+        key=(curveId,curve.version,start,stop,step)
+        with self._lock:
+            ref=self._curves.get(curveId)
+            if ref is None or ref() is not curve:
+                try:
+                    self._curves[curveId]=weakref.ref(
+                        curve,lambda _,curveId=curveId:self.forget(curveId))
+                except TypeError: # cannot be weakly referenced
+                    return samples
+            old=self._entries.pop(key,None)
+            if old is not None:
+                self.bytes-=old.nbytes
+            self._entries[key]=samples
+            self.bytes+=samples.nbytes
+            while self.bytes>self.maxBytes:
+                self._evict()
+        return samples
+
+    def _evict(self)->None:
+        """
+        Throw away the least recently used block
+
+        (must hold the lock)
+        """
+        _,samples=self._entries.popitem(last=False)
+        self.bytes-=samples.nbytes
+        self.evictions+=1
+
+    def forget(self,curveId:int)->None:
+        """
+        Drop every block belonging to a curve
+        """
+        with self._lock:
+            self._curves.pop(curveId,None)
+            for key in [key for key in self._entries if key[0]==curveId]:
+                self.bytes-=self._entries.pop(key).nbytes
+
+    def clear(self)->None:
+        """
+        Empty the cache (the counters are kept)
+        """
+        with self._lock:
+            self._entries.clear()
+            self._curves.clear()
+            self.bytes=0
+
+    def resetCounters(self)->None:
+        """
+        Set the hit, miss and eviction counts back to zero
+        """
+        self.hits=self.misses=self.evictions=0
+
+    @property
+    def hitRate(self)->float:
+        """
+        The fraction of lookups that were hits
+        """
+        lookups=self.hits+self.misses
+        return self.hits/lookups if lookups else 0.0
+
+    def __repr__(self):
+        return f'SampleCache(blocks={len(self)},bytes={self.bytes},maxBytes={self.maxBytes},hits={self.hits},misses={self.misses},evictions={self.evictions})' # noqa: E501 # pylint: disable=line-too-long
+
+
+# the cache used by CurveBase.samples()
+sampleCache=SampleCache()
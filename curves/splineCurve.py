@@ -16,14 +16,25 @@ class SplineCurve(CurveBase[CurveValueT]):
     """
     def __init__(self,
         controlPoints:typing.Union[
+            UnivariateSpline,
             typing.Iterable[typing.Iterable[int]],
             np.ndarray[int,CurveValueT]]):
-        """ """
+        """
+        :controlPoints: can be a list of y values,
+            an [x values,y values] pair,
+            or an already-fitted UnivariateSpline
+        """
+        if isinstance(controlPoints,UnivariateSpline):
+            self._spline=controlPoints
+            knots=controlPoints.get_knots()
+            self._controlPoints=np.array(
+                [knots,controlPoints(knots)])
+            return
         if not isinstance(controlPoints,np.ndarray):
             controlPoints=np.array(controlPoints)
         self._controlPoints=controlPoints
         if len(self._controlPoints.shape)<2:
-            x=np.ndarray(range(len(self._controlPoints)))
+            x=np.arange(len(self._controlPoints))
             y=self._controlPoints
             s=1
         else:
@@ -32,49 +43,19 @@ class SplineCurve(CurveBase[CurveValueT]):
             s=0
         self._spline=UnivariateSpline(x,y,s=s)
 
-    def samples(self,
-        start:typing.Optional[CurveTimeValue]=None,
-        stop:typing.Optional[CurveTimeValue]=None,
-        step:CurveTimeValue=1
-        )->np.ndarray:
-        """
-        Get a block of samples
-        """
-        if start is None and stop is None:
-            return self.samples()
-        return np.array(
-            self.valueAt(position) for position in range(start,stop,step))
-
     @property
     def start(self)->CurveValueT:
         """
         start index
         """
-        return self._controlPoints[0][0]
+        return self._spline.get_knots()[0]
 
     @property
     def end(self)->CurveValueT:
         """
         end index
         """
-        return self._controlPoints[-1][0]
-
-    def _apply(self,
-        other:typing.Union[CurveBase[CurveValueT],float,int],
-        func:typing.Callable[[np.ndarray],np.ndarray]
-        )->"SplineCurve[CurveValueT]":
-        """
-        """
-        if isinstance(other,(float,int)):
-            result_samples=func(self.samples(),other)
-        elif isinstance(other,SplineCurve):
-            result_samples=func(self.samples(),other.samples())
-        elif hasattr(other,'toSpline'):
-            other=other.toSpline()
-            result_samples=func(self.samples(),other.samples())
-        else:
-            raise TypeError(f"Unsupported operation with {type(other)}")
-        return SplineCurve[CurveValueT](result_samples)
+        return self._spline.get_knots()[-1]
 
     def valueAt(self,position:CurveTimeValue)->CurveValueT:
         """
@@ -82,23 +63,19 @@ class SplineCurve(CurveBase[CurveValueT]):
         """
         return self._spline(position)
 
-    def __add__(self,other):
-        return self._apply(other,np.add)
-
-    def __sub__(self,other):
-        return self._apply(other,np.subtract)
-
-    def __mul__(self,other):
-        return self._apply(other,np.multiply)
-
-    def __truediv__(self,other):
-        return self._apply(other,np.divide)
+    def valuesAt(self,positions:np.ndarray)->np.ndarray:
+        """
+        Get values at an array of points all at once
+        """
+        return self._spline(np.asarray(positions,dtype=float))
 
     def toSpline(self,
-        percentError:PercentCompatible=1.0
+        percentError:PercentCompatible=1.0,
+        maxKnots:typing.Optional[int]=None,
+        maxSamples:typing.Optional[int]=None
         )->"SplineCurve[CurveValueT]":
         """
         Redundant, but necessary for compatability
         """
-        _=percentError # it will always be a 100% fit
+        _=percentError,maxKnots,maxSamples # it will always be a 100% fit
         return self
@@ -0,0 +1,131 @@
+"""
+Fit splines to large numbers of samples
+"""
+import typing
+import numpy as np
+from scipy.interpolate import UnivariateSpline,LSQUnivariateSpline
+
+
+# above this many samples, fit with a limited number of knots rather
+# than letting UnivariateSpline place one wherever it likes
+SMOOTHING_SPLINE_LIMIT=100000
+
+# the most knots to use for a least-squares fit
+DEFAULT_MAX_KNOTS=1000
+
+# the most samples to fit to, after pre-decimation
+DEFAULT_MAX_SAMPLES=1000000
+
+
+def predecimate(
+    x:np.ndarray,
+    y:np.ndarray,
+    maxSamples:int=DEFAULT_MAX_SAMPLES,
+    allowedDeviation:typing.Optional[float]=None
+    )->typing.Tuple[np.ndarray,np.ndarray]:
+    """
+    Reduce the samples towards maxSamples by averaging runs of them
+
+    Runs are as short as they can be while still getting down to
+    maxSamples.  The leftover samples at the end (if any) are
+    averaged together as one more, shorter run.
+
+    :allowedDeviation: only average a run if none of its values are
+        further than this from its mean.  Other runs (eg, a narrow
+        spike) are kept sample for sample, so there may be more than
+        maxSamples left.  The default is to average every run.
+    """
+    factor=-(-len(y)//maxSamples)
+    if factor<=1:
+        return x,y
+    # the leftover tail is one more (shorter) run
+    runStarts=np.arange(0,len(y),factor)
+    xMeans=np.add.reduceat(x,runStarts)
+    yMeans=np.add.reduceat(y,runStarts)
+    runLengths=np.diff(np.append(runStarts,len(y)))
+    xMeans/=runLengths
+    yMeans/=runLengths
+    if allowedDeviation is None:
+        return xMeans,yMeans
+    spread=np.maximum(
+        np.maximum.reduceat(y,runStarts)-yMeans,
+        yMeans-np.minimum.reduceat(y,runStarts))
+    averaged=spread<=allowedDeviation
+    if np.all(averaged):
+        return xMeans,yMeans
+    kept=np.repeat(~averaged,runLengths)
+    keptIndices=np.flatnonzero(kept)
+    # put the kept samples back in between the averaged runs
+    order=np.argsort(np.concatenate((runStarts[averaged],keptIndices)),
+        kind='stable')
+    return (np.concatenate((xMeans[averaged],x[keptIndices]))[order],
+        np.concatenate((yMeans[averaged],y[keptIndices]))[order])
+
+
+def curvatureKnots(
+    x:np.ndarray,
+    y:np.ndarray,
+    knotCount:int
+    )->np.ndarray:
+    """
+    Choose interior knots, putting more where the curve bends more
+
+    Knots are placed at equal steps of the cumulative
+    |second derivative|, plus a constant so that flat
+    stretches still get some.
+    """
+    knotCount=min(knotCount,len(x)-5)
+    if knotCount<1:
+        return np.array([])
+    bend=np.abs(np.diff(y,2))
+    bend+=bend.mean()+np.finfo(float).tiny
+    cumulative=np.concatenate(((0.0,),np.cumsum(bend)))
+    targets=np.linspace(0,cumulative[-1],knotCount+2)[1:-1]
+    indices=np.searchsorted(cumulative,targets)+1
+    # knots must be strictly inside and distinct
+    indices=np.unique(np.clip(indices,2,len(x)-3))
+    return x[indices]
+
+
+def fitSpline(
+    x:np.ndarray,
+    y:np.ndarray,
+    allowedDeviation:float,
+    maxKnots:typing.Optional[int]=None,
+    maxSamples:typing.Optional[int]=None
+    )->UnivariateSpline:
+    """
+    Fit a cubic spline to samples, staying within allowedDeviation
+
+    First the samples are pre-decimated.  If maxSamples is given,
+    that is a hard limit.  Otherwise, runs of samples are averaged
+    towards DEFAULT_MAX_SAMPLES only where they stay within
+    allowedDeviation, so that narrow features are not flattened
+    before the fitter ever sees them.
+    Then small numbers of samples get a smoothing UnivariateSpline.
+    Larger ones (or if maxKnots is given) are fitted with an
+    LSQUnivariateSpline, doubling the number of knots (placed by
+    curvature) until the rms error is within allowedDeviation or
+    maxKnots is reached.
+    """
+    if maxSamples is None:
+        x,y=predecimate(x,y,DEFAULT_MAX_SAMPLES,allowedDeviation)
+    else:
+        x,y=predecimate(x,y,maxSamples)
+    if maxKnots is None and len(y)<=SMOOTHING_SPLINE_LIMIT:
+        return UnivariateSpline(x,y,s=len(y)*(allowedDeviation**2))
+    if maxKnots is None:
+        maxKnots=DEFAULT_MAX_KNOTS
+    knotCount=min(16,maxKnots)
+    while True:
+        knots=curvatureKnots(x,y,knotCount)
+        try:
+            spline=LSQUnivariateSpline(x,y,knots)
+        except ValueError:
+            # knots did not satisfy Schoenberg-Whitney, so spread evenly
+            knots=np.linspace(x[0],x[-1],len(knots)+2)[1:-1]
+            spline=LSQUnivariateSpline(x,y,knots)
+        error=np.sqrt(spline.get_residual()/len(y))
+        if error<=allowedDeviation or knotCount>=maxKnots:
+            return spline
+        knotCount=min(knotCount*2,maxKnots)
@@ -0,0 +1,287 @@
+"""
+A multi-resolution summary of a large array of samples
+"""
+import typing
+import numpy as np
+
+
+SummaryT=typing.Tuple[float,float,float] # (min,max,sum)
+
+
+class SummaryPyramid:
+    """
+    A multi-resolution (mipmap style) summary of a large array of samples
+
+    Level 0 holds the min, max and sum of each blockSize samples,
+    level 1 the same for each blockSize level 0 blocks, and so on.
+    (The count of any block follows from its position, so is
+    not stored.)
+
+    This lets the min/max/sum/mean of any range of samples be found
+    in O(log n), and zoomed-out views be made without touching
+    the samples themselves.
+
+    The pyramid is updated lazily.  Whoever owns the samples calls
+    invalidate() for anything that changes, and then the
+    changed blocks are recalculated by the next refresh().
+    """
+
+    def __init__(self,blockSize:int=64):
+        if blockSize<2:
+            raise ValueError('blockSize must be at least 2')
+        self.blockSize:int=blockSize
+        self.size:int=0 # how many samples are summarized
+        # each level is [mins,maxs,sums,length]
+        # where the arrays have spare capacity beyond length
+        self._levels:typing.List[typing.List[typing.Any]]=[]
+        self._dirtyStart:int=0
+        self._dirtyStop:int=0
+
+    @property
+    def levels(self)->int:
+        """
+        How many levels there are
+        """
+        return len(self._levels)
+
+    def blockSamples(self,level:int)->int:
+        """
+        How many samples each block of a level summarizes
+        """
+        return self.blockSize**(level+1)
+
+    def invalidate(self,start:int=0,stop:typing.Optional[int]=None)->None:
+        """
+        Mark samples start..stop as changed
+
+        :stop: None means all the way to the end (eg, after appending)
+        """
+        if stop is None:
+            stop=np.iinfo(np.int64).max
+        if self._dirtyStart>=self._dirtyStop:
+            self._dirtyStart,self._dirtyStop=start,stop
+        else:
+            self._dirtyStart=min(self._dirtyStart,start)
+            self._dirtyStop=max(self._dirtyStop,stop)
+
+    def refresh(self,samples:np.ndarray)->None:
+        """
+        Recalculate whatever blocks have changed
+
+        (Appending k samples only touches about k/blockSize blocks,
+        so keeping up with appends is amortized O(1) per sample)
+        """
+        size=len(samples)
+        start,stop=self._dirtyStart,self._dirtyStop
+        changed=start<stop
+        if size!=self.size:
+            # anything past the old end has been added (or removed)
+            if not changed:
+                start,stop=size,size
+            start=min(start,self.size,size)
+            stop=max(stop,size)
+            self.size=size
+            changed=True
+        self._dirtyStart=self._dirtyStop=0
+        if not changed:
+            return
+        stop=min(stop,size)
+        del self._levels[self._levelCount(size):]
+        blockSize=self.blockSize
+        childMins=childMaxs=childSums=samples
+        childLength=size
+        for level in range(self._levelCount(size)):
+            start//=blockSize
+            stop=-(-stop//blockSize)
+            length=-(-childLength//blockSize)
+            if level==len(self._levels):
+                self._levels.append([
+                    np.empty(0),np.empty(0),np.empty(0),0])
+                start,stop=0,length
+            entry=self._levels[level]
+            self._resize(entry,length)
+            childStart=start*blockSize
+            childStop=min(stop*blockSize,childLength)
+            if childStart<childStop:
+                edges=np.arange(childStart,childStop,blockSize)
+                entry[0][start:stop]=np.minimum.reduceat(
+                    childMins[childStart:childStop],edges-childStart)
+                entry[1][start:stop]=np.maximum.reduceat(
+                    childMaxs[childStart:childStop],edges-childStart)
+                entry[2][start:stop]=np.add.reduceat(
+                    childSums[childStart:childStop],edges-childStart,
+                    dtype=float)
+            childMins,childMaxs,childSums,childLength=self._view(entry)
+
+    def _levelCount(self,size:int)->int:
+        """
+        How many levels are needed to get down to a single block
+        """
+        levels=1
+        blockSamples=self.blockSize
+        while blockSamples<size:
+            blockSamples*=self.blockSize
+            levels+=1
+        return levels if size>0 else 0
+
+    @staticmethod
+    def _resize(entry:typing.List[typing.Any],length:int)->None:
+        """
+        Set the length of a level, growing its arrays by doubling
+        """
+        if length>len(entry[0]):
+            capacity=max(length,2*len(entry[0]))
+            for i in range(3):
+                array=np.empty(capacity)
+                array[:entry[3]]=entry[i][:entry[3]]
+                entry[i]=array
+        entry[3]=length
+
+    @staticmethod
+    def _view(entry:typing.List[typing.Any]
+        )->typing.Tuple[np.ndarray,np.ndarray,np.ndarray,int]:
+        """
+        (mins,maxs,sums,length) of a level, without the spare capacity
+        """
+        length=entry[3]
+        return entry[0][:length],entry[1][:length],entry[2][:length],length
+
+    def query(self,
+        samples:np.ndarray,
+        start:int,
+        stop:int
+        )->SummaryT:
+        """
+        Get the (min,max,sum) of samples start..stop
+
+        Only the partial blocks at either end of each level are looked
+        at, so this is O(blockSize*log(n)) rather than O(n)
+        """
+        self.refresh(samples)
+        start=max(start,0)
+        stop=min(stop,len(samples))
+        if start>=stop:
+            raise ValueError('Cannot summarize an empty range')
+        blockSize=self.blockSize
+        mins=[]
+        maxs=[]
+        sums=[]
+        levelMins=levelMaxs=levelSums=samples
+        level=0
+        while True:
+            innerStart=-(-start//blockSize)*blockSize
+            innerStop=(stop//blockSize)*blockSize
+            if innerStart>=innerStop or level>=len(self._levels):
+                # no whole blocks left, so finish at this level
+                pieces=[(start,stop)]
+            else:
+                pieces=[(start,innerStart),(innerStop,stop)]
+            for pieceStart,pieceStop in pieces:
+                if pieceStart<pieceStop:
+                    mins.append(levelMins[pieceStart:pieceStop].min())
+                    maxs.append(levelMaxs[pieceStart:pieceStop].max())
+                    sums.append(levelSums[pieceStart:pieceStop].sum(
+                        dtype=float))
+            if len(pieces)==1:
+                break
+            start,stop=innerStart//blockSize,innerStop//blockSize
+            levelMins,levelMaxs,levelSums,_=self._view(self._levels[level])
+            level+=1
+        return float(min(mins)),float(max(maxs)),float(sum(sums))
+
+    def summarize(self,
+        samples:np.ndarray,
+        start:int,
+        stop:int,
+        buckets:int
+        )->typing.Tuple[np.ndarray,np.ndarray,np.ndarray]:
+        """
+        Get (mins,maxs,means) of samples start..stop split into buckets
+
+        The middle of each bucket comes from the coarsest level whose
+        blocks fit in a bucket, and the partial blocks at either end
+        from successively finer levels, the same way query() works.
+        So a zoomed-out view only ever looks at O(blockSize*log(n))
+        values per bucket, and each bucket covers exactly its
+        own samples.
+        """
+        self.refresh(samples)
+        start=max(start,0)
+        stop=min(stop,len(samples))
+        if start>=stop:
+            raise ValueError('Cannot summarize an empty range')
+        buckets=max(min(buckets,stop-start),1)
+        bucketSamples=(stop-start)/buckets
+        coarsest=-1
+        for level in range(len(self._levels)):
+            if self.blockSamples(level)>bucketSamples:
+                break
+            coarsest=level
+        edges=start+(np.arange(buckets+1)*(stop-start))//buckets
+        low,high=edges[:-1],edges[1:]
+        bucketMins=np.full(buckets,np.inf)
+        bucketMaxs=np.full(buckets,-np.inf)
+        bucketSums=np.zeros(buckets)
+        # the samples of each bucket covered so far are coveredStart..
+        # coveredStop, which starts out empty and grows outwards
+        coveredStart=low.copy()
+        coveredStop=low.copy()
+        for level in range(coarsest,-2,-1):
+            if level<0:
+                unit=1
+                arrays=(samples,samples,samples)
+            else:
+                unit=self.blockSamples(level)
+                arrays=self._view(self._levels[level])[:3]
+            empty=coveredStart>=coveredStop
+            blockLow=-(-low//unit)
+            blockHigh=high//unit
+            # whole blocks left of the covered samples (or all of them)
+            leftStop=np.where(empty,blockHigh,coveredStart//unit)
+            # whole blocks right of the covered samples
+            rightStart=np.where(empty,blockHigh,coveredStop//unit)
+            for rangeStart,rangeStop in (
+                    (blockLow,leftStop),(rightStart,blockHigh)):
+                self._accumulate(arrays,rangeStart,rangeStop,
+                    bucketMins,bucketMaxs,bucketSums)
+            left=blockLow<leftStop
+            right=rightStart<blockHigh
+            coveredStart=np.where(left,blockLow*unit,coveredStart)
+            coveredStop=np.where((empty&left)|right,
+                blockHigh*unit,coveredStop)
+        return bucketMins,bucketMaxs,bucketSums/(high-low)
+
+    @staticmethod
+    def _accumulate(
+        arrays:typing.Tuple[np.ndarray,np.ndarray,np.ndarray],
+        starts:np.ndarray,
+        stops:np.ndarray,
+        mins:np.ndarray,
+        maxs:np.ndarray,
+        sums:np.ndarray
+        )->None:
+        """
+        Fold the (min,max,sum) of arrays[starts[i]:stops[i]] into
+        mins[i], maxs[i], sums[i], for every i with a non-empty range
+
+        Only the values in the ranges are gathered and looked at.
+        """
+        nonEmpty=np.flatnonzero(starts<stops)
+        if len(nonEmpty)==0:
+            return
+        starts=starts[nonEmpty]
+        lengths=stops[nonEmpty]-starts
+        offsets=np.zeros(len(lengths),dtype=np.intp)
+        np.cumsum(lengths[:-1],out=offsets[1:])
+        indices=np.arange(offsets[-1]+lengths[-1])
+        indices+=np.repeat(starts-offsets,lengths)
+        levelMins,levelMaxs,levelSums=arrays
+        mins[nonEmpty]=np.minimum(mins[nonEmpty],
+            np.minimum.reduceat(levelMins[indices],offsets))
+        maxs[nonEmpty]=np.maximum(maxs[nonEmpty],
+            np.maximum.reduceat(levelMaxs[indices],offsets))
+        sums[nonEmpty]+=np.add.reduceat(
+            levelSums[indices],offsets,dtype=float)
+
+    def __repr__(self):
+        return f'SummaryPyramid(size={self.size},blockSize={self.blockSize},levels={self.levels})' # noqa: E501 # pylint: disable=line-too-long
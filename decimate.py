@@ -0,0 +1,152 @@
+"""
+Reduce a large number of curve points down to what
+can actually be seen on a plot, without losing the peaks
+"""
+import typing
+import numpy as np
+if typing.TYPE_CHECKING:
+    from PIL import Image
+
+
+Color=typing.Tuple[int,int,int]
+
+
+def _buckets(values:np.ndarray,buckets:int)->np.ndarray:
+    """
+    Split values up into a (buckets,bucketSize) array
+
+    The last bucket is padded out with its last value, so that
+    padding never changes the min or max of a bucket.
+    """
+    bucketSize=-(-len(values)//buckets)
+    buckets=-(-len(values)//bucketSize)
+    padding=buckets*bucketSize-len(values)
+    if padding:
+        values=np.concatenate((values,np.full(padding,values[-1])))
+    return values.reshape(buckets,bucketSize)
+
+
+def minMaxDecimate(
+    x:np.ndarray,
+    y:np.ndarray,
+    buckets:int
+    )->typing.Tuple[np.ndarray,np.ndarray]:
+    """
+    Keep only the minimum and maximum point of each bucket
+
+    With one bucket per pixel column this draws exactly the same
+    as the full data, so spikes never disappear.
+
+    Returns (x,y) of up to 2*buckets points, still in order
+    """
+    x=np.asarray(x)
+    y=np.asarray(y)
+    if len(y)<=2*buckets:
+        return x,y
+    grid=_buckets(y,buckets)
+    bucketStarts=np.arange(len(grid))*grid.shape[1]
+    lows=grid.argmin(axis=1)+bucketStarts
+    highs=grid.argmax(axis=1)+bucketStarts
+    indices=np.empty(2*len(grid),dtype=np.intp)
+    indices[0::2]=np.minimum(lows,highs)
+    indices[1::2]=np.maximum(lows,highs)
+    np.minimum(indices,len(y)-1,out=indices) # in case it was padding
+    return x[indices],y[indices]
+
+
+def lttb(
+    x:np.ndarray,
+    y:np.ndarray,
+    threshold:int
+    )->typing.Tuple[np.ndarray,np.ndarray]:
+    """
+    Largest-Triangle-Three-Buckets decimation
+
+    Picks the single point from each bucket that makes the largest
+    triangle with the point picked from the previous bucket and the
+    average of the next, which keeps the visual shape of the line
+    with fewer points than minMaxDecimate().
+
+    Returns (x,y) of threshold points, still in order
+    """
+    x=np.asarray(x)
+    y=np.asarray(y)
+    count=len(y)
+    if threshold>=count or threshold<3:
+        return x,y
+    if x.dtype.kind=='M': # datetimes, as float ns from the first one
+        xs=(x-x[0]).astype('timedelta64[ns]').astype(float)
+    else:
+        xs=x.astype(float)
+    ys=y.astype(float)
+    # bucket edges for the points between the fixed first and last
+    edges=1+(np.arange(threshold-1)*(count-2))//(threshold-2)
+    points=np.stack((xs[1:-1],ys[1:-1]))
+    sums=np.add.reduceat(points,edges[:-1]-1,axis=1)
+    averages=sums/np.diff(edges)
+    averages=np.concatenate(
+        (averages,np.array([[xs[-1]],[ys[-1]]])),axis=1)
+    indices=np.empty(threshold,dtype=np.intp)
+    indices[0]=0
+    indices[-1]=count-1
+    chosen=0
+    for bucket in range(threshold-2):
+        start,stop=edges[bucket],edges[bucket+1]
+        ax,ay=xs[chosen],ys[chosen]
+        nextX,nextY=averages[:,bucket+1]
+        # twice the triangle area (the constant factor does not matter)
+        areas=np.abs(
+            (ax-nextX)*(ys[start:stop]-ay)-(ax-xs[start:stop])*(nextY-ay))
+        chosen=start+int(areas.argmax())
+        indices[bucket+1]=chosen
+    return x[indices],y[indices]
+
+
+def rasterize(
+    y:np.ndarray,
+    width:int,
+    height:int,
+    yRange:typing.Optional[typing.Tuple[float,float]]=None,
+    color:Color=(0,0,0),
+    background:Color=(255,255,255)
+    )->"Image.Image":
+    """
+    Draw evenly spaced values straight into a PIL image
+
+    Each pixel column is filled from the minimum to the maximum
+    of the values that fall in it (joined up to the neighboring
+    columns), which is exactly what drawing every line segment
+    would give, but without ever drawing them.
+
+    :yRange: the (min,max) values at the bottom and top of the image
+        (default is the range of the values)
+    """
+    from PIL import Image
+    y=np.asarray(y,dtype=float)
+    pixels=np.empty((height,width,3),dtype=np.uint8)
+    pixels[...]=background
+    if len(y)==0:
+        return Image.fromarray(pixels)
+    if len(y)<width:
+        # stretch so there is at least one value per column
+        y=y[(np.arange(width)*len(y))//width]
+    edges=(np.arange(width)*len(y))//width
+    lows=np.minimum.reduceat(y,edges)
+    highs=np.maximum.reduceat(y,edges)
+    # join each column to the last value of the one before it
+    lasts=y[edges[1:]-1]
+    np.minimum(lows[1:],lasts,out=lows[1:])
+    np.maximum(highs[1:],lasts,out=highs[1:])
+    if yRange is None:
+        yRange=(float(lows.min()),float(highs.max()))
+    bottom,top=yRange
+    scale=(height-1)/(top-bottom) if top!=bottom else 0.0
+    # row 0 is the top of the image
+    topRows=np.rint((top-highs)*scale)
+    bottomRows=np.rint((top-lows)*scale)
+    if scale==0.0:
+        topRows[:]=bottomRows[:]=height//2
+    rows=np.arange(height)[:,None]
+    mask=(rows>=topRows[None,:])&(rows<=bottomRows[None,:])
+    pixels[mask]=color
+    return Image.fromarray(pixels)
@@ -3,30 +3,116 @@ Curve implementing a parametric sine wave
 """
 import typing
 import math
+import numpy as np
 from .curveValueT import CurveValueT
 from .curveShape import CurveShape
 
 
+TWO_PI=2*math.pi
+
+
 class SineCurve(CurveShape[CurveValueT]):
     """
     Curve implementing a parametric sine wave
+
+    As well as being sampled at arbitrary times, this can be
+    used as a fixed-sample-rate oscillator with render()
     """
     def __init__(self,
         x:float=1,
         t:float=0,
-        offset:typing.Optional[CurveValueT]=None):
+        offset:typing.Optional[CurveValueT]=None,
+        frequency:float=1/TWO_PI):
         """
-        In the form x*sin(t)+offset
+        In the form x*sin(2*pi*frequency*time+t)+offset
+
+        :x: amplitude
+        :t: phase (in radians)
+        :frequency: in Hz.  The default of 1/(2*pi) means time
+            is simply radians, giving x*sin(time+t)+offset
         """
+        CurveShape.__init__(self)
         self.x=x
         self.t=t
         self.offset=offset
+        self.frequency=frequency
+        self._phase:float=t # where render() is up to
+        self._ramp:np.ndarray=np.arange(0,dtype=float)
 
     def getValueAt(self,relativeTime:float)->CurveValueT:
         """
         get the value of the curve at a particular point in time
         """
-        val:CurveValueT=math.sin(relativeTime)
+        val:CurveValueT=self.x*math.sin(
+            TWO_PI*self.frequency*relativeTime+self.t)
         if self.offset is not None:
             val=val+self.offset
         return val
+
+    def getValuesAt(self,relativeTimes:np.ndarray)->np.ndarray:
+        """
+        get the values of the curve at an array of points in time
+        """
+        values=np.array(relativeTimes,dtype=float)
+        values*=TWO_PI*self.frequency
+        values+=self.t
+        np.sin(values,out=values)
+        values*=self.x
+        if self.offset is not None:
+            values+=self.offset
+        return values
+
+    def resetPhase(self,phase:typing.Optional[float]=None)->None:
+        """
+        Restart render() from a given phase (default=self.t)
+        """
+        self._phase=self.t if phase is None else phase
+
+    def render(self,
+        sampleRate:float,
+        nSamples:int,
+        out:typing.Optional[np.ndarray]=None,
+        frequency:typing.Union[None,float,np.ndarray]=None,
+        amplitude:typing.Union[None,float,np.ndarray]=None
+        )->np.ndarray:
+        """
+        Generate the next block of a continuous fixed-sample-rate signal
+
+        The phase carries on from the previous block, so blocks
+        can be joined end to end with no discontinuity.
+
+        :out: optional array of nSamples to render into
+        :frequency: in Hz, either a value or a per-sample array for
+            frequency modulation (default=self.frequency)
+        :amplitude: either a value or a per-sample array for
+            amplitude modulation (default=self.x)
+        """
+        if frequency is None:
+            frequency=self.frequency
+        if amplitude is None:
+            amplitude=self.x
+        if out is None:
+            out=np.empty(nSamples,dtype=float)
+        if nSamples==0:
+            return out
+        # work out the phases at float64, even if out is not
+        phases=out if out.dtype==np.float64 else np.empty(nSamples)
+        increment=np.multiply(frequency,TWO_PI/sampleRate)
+        if increment.ndim==0:
+            # constant frequency, so phase[i]=phase+i*increment exactly
+            if len(self._ramp)!=nSamples:
+                self._ramp=np.arange(nSamples,dtype=float)
+            np.multiply(self._ramp,increment,out=phases)
+            nextPhase=self._phase+float(increment)*nSamples
+        else:
+            # frequency modulated, so accumulate the increments
+            np.cumsum(increment,out=phases)
+            nextPhase=self._phase+float(phases[-1])
+            phases-=increment
+        phases+=self._phase
+        self._phase=math.fmod(nextPhase,TWO_PI)
+        np.sin(phases,out=out)
+        out*=amplitude
+        if self.offset is not None:
+            out+=self.offset
+        return out
@@ -0,0 +1,45 @@
+"""
+Tests for the benchmark runner
+"""
+from ..benchmarks.runner import (
+    BENCHMARKS,SIZES,Benchmark,BenchmarkResult,compareReports,runBenchmark)
+from ..benchmarks import suite # noqa: F401 # pylint: disable=unused-import
+
+
+def _report(*results:BenchmarkResult):
+    return {'results':[result.asDict() for result in results]}
+
+
+def test_compareZeroTimes():
+    """
+    Times too short for the timer to see (0.0) can still be compared
+    """
+    old=_report(BenchmarkResult('a',10,[0.0]),BenchmarkResult('b',10,[0.0]))
+    new=_report(BenchmarkResult('a',10,[0.0]),BenchmarkResult('b',10,[1.0]))
+    comparisons={comparison['key']:comparison
+        for comparison in compareReports(old,new)}
+    assert comparisons['a[10]']['timeRatio']==1.0
+    assert not comparisons['a[10]']['regression']
+    assert comparisons['b[10]']['regression']
+
+
+def test_failuresAreRecorded():
+    """
+    A benchmark that raises is recorded, not raised
+    """
+    def setup(size:int):
+        def run():
+            raise RuntimeError(f'broken at {size}')
+        return run
+    result=runBenchmark(Benchmark('broken',setup),10)
+    assert result.error=='RuntimeError: broken at 10'
+    assert not result.times
+
+
+def test_slowBenchmarksAreCapped():
+    """
+    The default run does not take the slowest benchmarks up to 1e8
+    """
+    for name in ('toSpline','correlate','getPoints','discreteValueAt'):
+        assert BENCHMARKS[name].maxSize is not None
+        assert BENCHMARKS[name].maxSize<max(SIZES)
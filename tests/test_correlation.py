@@ -0,0 +1,54 @@
+"""
+Tests for cross-correlation
+"""
+import numpy as np
+import pytest
+from ..curves.correlation import chooseCorrelationMethod,crossCorrelate
+from ..curves.discretePointCurve import DiscretePointCurve
+
+
+@pytest.mark.parametrize('maxLag',[None,0,5,40])
+@pytest.mark.parametrize('window',[None,'hann'])
+def test_fftMatchesDirect(maxLag,window):
+    """
+    Both methods give the same values at the same lags
+    """
+    rng=np.random.default_rng(3)
+    a=rng.normal(size=200)
+    b=rng.normal(size=150)
+    direct=crossCorrelate(a,b,maxLag,method='direct',window=window)
+    fft=crossCorrelate(a,b,maxLag,method='fft',window=window)
+    assert np.array_equal(direct.lags,fft.lags)
+    assert np.allclose(direct.values,fft.values)
+    if maxLag is not None:
+        assert np.abs(fft.lags).max()==maxLag
+
+
+def test_chooseMethod():
+    """
+    A few lags of long arrays are direct, all lags of them are fft
+    """
+    assert chooseCorrelationMethod(1000000,1000000,3)=='direct'
+    assert chooseCorrelationMethod(1000000,1000000)=='fft'
+    assert chooseCorrelationMethod(10,10)=='direct'
+
+
+def test_findsShift():
+    """
+    The peak is at the lag that lines the curves up
+    """
+    values=np.random.default_rng(4).normal(size=1000)
+    a=DiscretePointCurve(values[7:507])
+    b=DiscretePointCurve(values[:500])
+    result=a.correlate(b,maxLag=20)
+    assert result.peakLag==-7
+    assert result.peak>0.95
+    assert np.isclose(a.rSquared(a),1.0)
+
+
+def test_unknownMethod():
+    """
+    A misspelled method is an error, not silently something else
+    """
+    with pytest.raises(ValueError):
+        crossCorrelate(np.arange(10.0),np.arange(10.0),3,method='fast')
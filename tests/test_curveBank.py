@@ -0,0 +1,26 @@
+"""
+Tests for CurveBanks
+"""
+import numpy as np
+import pytest
+from ..curves.curveBank import GaussianCurveBank,QuadraticCurveBank
+
+
+def test_parametersAreReadOnly():
+    """
+    Parameters can only be changed by assigning, which is noticed
+    """
+    means=np.array([0.0,1.0])
+    bank=GaussianCurveBank(means,[1.0,2.0])
+    means[0]=5.0 # the bank keeps its own copy
+    assert bank.means[0]==0.0
+    for array in (bank.means,bank.stdevs,
+            QuadraticCurveBank([[1.0,2.0]]).coefficients):
+        with pytest.raises(ValueError):
+            array[0]=5.0
+    total=bank.sum()
+    before=total.samples(0,3)
+    version=bank.version
+    bank.means=[5.0,1.0]
+    assert bank.version!=version
+    assert not np.allclose(total.samples(0,3),before)
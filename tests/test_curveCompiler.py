@@ -0,0 +1,43 @@
+"""
+Tests for compiling curve expressions
+"""
+import numpy as np
+from ..curves.constantCurve import ConstantCurve
+from ..curves.curveCompiler import compileCurve
+from ..curves.curveExpression import CurveExpression
+from ..curves.gaussianCurve import GaussianCurve
+from ..curves.quadraticCurve import QuadraticCurve
+
+
+def test_followsConstantChanges():
+    """
+    Changing a constant operand changes the compiled values
+    """
+    constant=ConstantCurve(2.0)
+    expression=CurveExpression(np.multiply,GaussianCurve(0.0,1.0),constant)
+    positions=np.linspace(-1,1,5)
+    before=expression.valuesAt(positions)
+    constant.value=3.0
+    assert np.allclose(expression.valuesAt(positions),1.5*before)
+
+
+def test_constantAlone():
+    """
+    Compiling just a constant fills in the output
+    """
+    assert np.all(compileCurve(ConstantCurve(4.0)).valuesAt(np.arange(3))==4)
+
+
+def test_complexValues():
+    """
+    Complex leaves and constants keep their imaginary parts,
+    but a real result is still real
+    """
+    curve=QuadraticCurve([1j,0.0])
+    positions=np.arange(4.0)
+    expression=CurveExpression(np.add,curve,ConstantCurve(1.0))
+    assert np.allclose(expression.valuesAt(positions),1+1j*positions)
+    magnitude=CurveExpression(np.absolute,expression)
+    values=magnitude.valuesAt(positions)
+    assert values.dtype==float
+    assert np.allclose(values,np.abs(1+1j*positions))
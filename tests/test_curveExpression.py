@@ -0,0 +1,59 @@
+"""
+Tests for lazy math on curves
+"""
+import numpy as np
+from ..curves.constantCurve import ConstantCurve
+from ..curves.curveExpression import CurveExpression,curveExpression
+from ..curves.gaussianCurve import GaussianCurve
+from ..curves.quadraticCurve import QuadraticCurve
+
+
+def test_matchesEagerMath():
+    """
+    An expression gives the same values as doing the math on samples
+    """
+    a=GaussianCurve(0.0,1.0)
+    b=QuadraticCurve([0.5,1.0])
+    expression=(a+b)*2-a/b+(-a)**2
+    assert isinstance(expression,CurveExpression)
+    x=np.linspace(0,1,11)
+    ya,yb=a.valuesAt(x),b.valuesAt(x)
+    assert np.allclose(expression.valuesAt(x),(ya+yb)*2-ya/yb+ya**2)
+    assert np.isclose(expression.valueAt(0.5),expression.valuesAt(x)[5])
+
+
+def test_isLazy():
+    """
+    Nothing is worked out until values are asked for,
+    so changing an operand afterwards is seen
+    """
+    a=GaussianCurve(0.0,1.0)
+    expression=a*3
+    a.mean=1.0
+    assert np.isclose(expression.valueAt(1.0),3*a.valueAt(1.0))
+
+
+def test_identitiesFold():
+    """
+    Operations that leave a curve unchanged give back the curve itself
+    """
+    a=GaussianCurve(0.0,1.0)
+    for same in (a+0,0+a,a-0,a*1,1*a,a/1,a**1):
+        assert same is a
+    assert isinstance(0-a,CurveExpression)
+
+
+def test_constantsFold():
+    """
+    Constants are worked out ahead of time, including across
+    nested associative operations
+    """
+    folded=curveExpression(np.add,2,3)
+    assert isinstance(folded,ConstantCurve) and folded.value==5
+    a=GaussianCurve(0.0,1.0)
+    expression=(a*2)*3
+    assert isinstance(expression,CurveExpression)
+    assert expression.operands[0] is a
+    assert expression.operands[1].value==6
+    expression=4+(a+1)
+    assert expression.operands[1].value==5
@@ -0,0 +1,25 @@
+"""
+Tests for CurveInstance
+"""
+import datetime
+import warnings
+import numpy as np
+from ..curveInstance import CurveInstance
+from ..sineCurve import SineCurve
+
+
+def test_tzAwareStartTime():
+    """
+    A tz-aware start time ends up as the right UTC datetime64,
+    without numpy warning about (and dropping) the offset
+    """
+    startTime=datetime.datetime(2024,1,1,12,0,
+        tzinfo=datetime.timezone(datetime.timedelta(hours=5)))
+    instance=CurveInstance(SineCurve(),startTime)
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        x,_=instance.getPoints(datetime.timedelta(seconds=0.25),
+            endTime=datetime.timedelta(seconds=1),asArrays=True)
+        relative=instance.relativeSeconds(x)
+    assert x[0]==np.datetime64('2024-01-01T07:00','ns')
+    assert np.allclose(relative,[0.0,0.25,0.5,0.75])
@@ -0,0 +1,110 @@
+"""
+Tests for CurveScheduler
+"""
+import asyncio
+import numpy as np
+from ..curveInstance import CurveInstance
+from ..curveScheduler import CurveScheduler
+from ..sineCurve import SineCurve
+
+
+START_NS=1000*10**9 # instances start at 1000s on the monotonic clock
+
+# drive the clock a little after each time, so that float rounding
+# of the start time never makes a tick look not quite due
+EPSILON=1e-6
+
+
+class ShortSine(SineCurve):
+    """
+    A SineCurve that ends
+    """
+    def __init__(self,duration:float):
+        SineCurve.__init__(self)
+        self._length=duration
+
+    @property
+    def duration(self)->float:
+        return self._length
+
+
+def _record(deliveries:list,name:str):
+    def callback(instance,relativeTime,value):
+        deliveries.append(
+            (instance.startSeconds+relativeTime,name,relativeTime,value))
+    return callback
+
+
+def test_deadlineOrder():
+    """
+    Ticks of different instances come out in the order they are due,
+    with the right values
+    """
+    scheduler=CurveScheduler()
+    shape=SineCurve()
+    deliveries:list=[]
+    scheduler.add(CurveInstance(shape,START_NS),0.3,_record(deliveries,'a'))
+    scheduler.add(CurveInstance(shape,START_NS+10**8),0.5,
+        _record(deliveries,'b'))
+    for now in np.arange(1000.0,1002.0,0.05):
+        scheduler.runDue(float(now)+EPSILON)
+    clocks=[delivery[0] for delivery in deliveries]
+    assert clocks==sorted(clocks)
+    aTimes=[delivery[2] for delivery in deliveries if delivery[1]=='a']
+    bTimes=[delivery[2] for delivery in deliveries if delivery[1]=='b']
+    assert np.allclose(aTimes,np.arange(7)*0.3)
+    assert np.allclose(bTimes,np.arange(4)*0.5)
+    for _,_,relativeTime,value in deliveries:
+        assert np.isclose(value,shape.getValueAt(relativeTime))
+    assert scheduler.metrics.missedTicks==0
+
+
+def test_lateTicks():
+    """
+    When late, ticks are either skipped or all caught up on
+    """
+    for catchUp,expected in ((False,[0.0,0.5]),(True,np.arange(6)*0.1)):
+        scheduler=CurveScheduler(catchUp=catchUp)
+        deliveries:list=[]
+        scheduler.add(CurveInstance(SineCurve(),START_NS),0.1,
+            _record(deliveries,'a'))
+        scheduler.runDue(1000.0+EPSILON)
+        scheduler.runDue(1000.55+EPSILON)
+        assert np.allclose([delivery[2] for delivery in deliveries],expected)
+        assert scheduler.metrics.missedTicks==(0 if catchUp else 4)
+
+
+def test_retireAndRemove():
+    """
+    Instances stop at their end, or when removed
+    """
+    scheduler=CurveScheduler()
+    deliveries:list=[]
+    scheduler.add(CurveInstance(ShortSine(0.25),START_NS),0.1,
+        _record(deliveries,'short'))
+    removed=scheduler.add(CurveInstance(SineCurve(),START_NS),0.1,
+        _record(deliveries,'removed'))
+    scheduler.runDue(1000.0+EPSILON)
+    scheduler.remove(removed)
+    for now in np.arange(1000.1,1001.0,0.1):
+        scheduler.runDue(float(now)+EPSILON)
+    assert [delivery[1] for delivery in deliveries].count('removed')==1
+    assert np.allclose([delivery[2] for delivery in deliveries
+        if delivery[1]=='short'],[0.0,0.1,0.2])
+    assert scheduler.metrics.retired==1
+    assert len(scheduler)==0
+
+
+def test_runToQueue():
+    """
+    run() delivers every tick of a short instance to a queue
+    """
+    async def play():
+        scheduler=CurveScheduler(catchUp=True)
+        queue:asyncio.Queue=asyncio.Queue()
+        scheduler.add(CurveInstance(ShortSine(0.05)),0.01,queue=queue)
+        await asyncio.wait_for(scheduler.run(stopWhenEmpty=True),5)
+        return [queue.get_nowait() for _ in range(queue.qsize())]
+    values=asyncio.run(play())
+    assert np.allclose([relativeTime for relativeTime,_ in values],
+        np.arange(6)*0.01)
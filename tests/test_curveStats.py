@@ -0,0 +1,53 @@
+"""
+Tests for CurveStats
+"""
+import numpy as np
+import pytest
+from ..curves.curveStats import CurveStats
+
+
+def test_matchesNumpy():
+    """
+    Gathering a block at a time gives the same as numpy all at once
+    """
+    values=np.random.default_rng(2).normal(5.0,3.0,size=10000)
+    stats=CurveStats()
+    for block in np.array_split(values,7):
+        stats.add(block)
+    assert stats.count==len(values)
+    assert (stats.min,stats.max)==(values.min(),values.max())
+    assert np.isclose(stats.mean,values.mean())
+    assert np.isclose(stats.stdev,values.std())
+
+
+@pytest.mark.parametrize('position',[0,5,9])
+def test_nanPropagates(position:int):
+    """
+    A NaN anywhere makes min and max NaN
+    """
+    values=np.arange(10.0)
+    values[position]=np.nan
+    stats=CurveStats()
+    for block in np.array_split(values,3):
+        stats.add(block)
+    assert np.isnan(stats.min)
+    assert np.isnan(stats.max)
+
+
+def test_empty():
+    """
+    With no values, everything is NaN
+    """
+    stats=CurveStats(np.array([]))
+    assert np.isnan(stats.min)
+    assert np.isnan(stats.max)
+    assert np.isnan(stats.mean)
+    assert np.isnan(stats.stdev)
+
+
+def test_complexRejected():
+    """
+    Complex values are not quietly turned into real ones
+    """
+    with pytest.raises(ValueError):
+        CurveStats(np.array([1+1j,2.0]))
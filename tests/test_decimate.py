@@ -0,0 +1,83 @@
+"""
+Tests for decimating curve points down to a plot
+"""
+import datetime
+import numpy as np
+import pytest
+from ..curveInstance import CurveInstance
+from ..decimate import minMaxDecimate,lttb,rasterize
+from ..sineCurve import SineCurve
+
+
+@pytest.mark.parametrize('count',[1000,1001,1037])
+def test_minMaxKeepsExtremes(count:int):
+    """
+    Every bucket's min and max are kept, in order
+    """
+    rng=np.random.default_rng(5)
+    x=np.arange(count,dtype=float)
+    y=rng.normal(size=count)
+    xOut,yOut=minMaxDecimate(x,y,100)
+    assert len(yOut)<=200
+    assert np.all(np.diff(xOut)>=0)
+    bucketSize=-(-count//100)
+    for start in range(0,count,bucketSize):
+        bucket=y[start:start+bucketSize]
+        inBucket=(xOut>=start)&(xOut<start+bucketSize)
+        assert yOut[inBucket].min()==bucket.min()
+        assert yOut[inBucket].max()==bucket.max()
+
+
+def test_minMaxSmallUnchanged():
+    """
+    Few enough points are passed straight through
+    """
+    x=np.arange(10.0)
+    assert minMaxDecimate(x,x,5)[1] is x
+
+
+def test_lttb():
+    """
+    LTTB keeps the ends and a lone spike, in order
+    """
+    x=np.arange(10000.0)
+    y=np.sin(x*0.001)
+    y[6543]=50.0
+    xOut,yOut=lttb(x,y,200)
+    assert len(xOut)==200
+    assert (xOut[0],xOut[-1])==(0,9999)
+    assert np.all(np.diff(xOut)>0)
+    assert 6543 in xOut
+    times=np.datetime64('2000-01-01','ns')+x.astype('timedelta64[s]')
+    timesOut,_=lttb(times,y,200)
+    assert np.array_equal(timesOut,times[xOut.astype(int)])
+
+
+def test_rasterize():
+    """
+    Each column is filled from its min to its max
+    """
+    pytest.importorskip('PIL')
+    y=np.zeros(100)
+    y[50]=1.0
+    pixels=np.asarray(rasterize(y,10,11))
+    drawn=np.all(pixels==0,axis=2)
+    assert drawn[:,5].all() # the spike column goes top to bottom
+    assert drawn[-1,:].all() # everything else sits on the bottom
+    assert not drawn[:-1,0].any()
+
+
+def test_plotPoints():
+    """
+    getPlotPoints() decimates to the width, however it is asked to
+    """
+    instance=CurveInstance(SineCurve(frequency=3.0),
+        datetime.datetime(2000,1,1))
+    end=datetime.timedelta(seconds=2)
+    x,y=instance.getPlotPoints(endTime=end,width=100)
+    assert len(y)<=200 and np.isclose(y.max(),1,atol=1e-3)
+    x,y=instance.getPlotPoints(endTime=end,width=100,method='lttb',
+        relative=True)
+    assert len(y)==100 and x[0]==0
+    with pytest.raises(ValueError):
+        instance.getPlotPoints(endTime=end,width=100,method='average')
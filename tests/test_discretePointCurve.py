@@ -0,0 +1,43 @@
+"""
+Tests for DiscretePointCurve
+"""
+import numpy as np
+import pytest
+from ..curves.discretePointCurve import DiscretePointCurve
+
+
+@pytest.mark.parametrize('interpolation',
+    ['linear','nearest','cubic','pchip','akima'])
+def test_endsAreClamped(interpolation:str):
+    """
+    Whole and fractional positions past either end give the end values,
+    for both valueAt() and valuesAt()
+    """
+    curve=DiscretePointCurve(np.arange(10.0)**2,interpolation)
+    for position,expected in ((-1,0.0),(-0.5,0.0),(10,81.0),(10.5,81.0)):
+        assert curve.valueAt(position)==pytest.approx(expected)
+        assert curve.valuesAt([position])[0]==pytest.approx(expected)
+
+
+@pytest.mark.parametrize('count',[2,3])
+def test_cubicWithFewSamples(count:int):
+    """
+    Cubic interpolation drops to a lower order rather than failing
+    """
+    curve=DiscretePointCurve(np.arange(float(count)),'cubic')
+    assert curve.valueAt(0.5)==pytest.approx(0.5)
+
+
+def test_viewsAreReadOnly():
+    """
+    Views of the samples cannot be written through, since that would
+    go around everything that caches values of the curve
+    """
+    curve=DiscretePointCurve(np.arange(10.0))
+    for view in (curve.samples(),curve.samples(2,8,2),
+            next(curve.iterChunks(chunkSize=4))):
+        with pytest.raises(ValueError):
+            view[0]=100
+    curve[3]=100
+    assert curve.samples()[3]==100
+    assert curve.max==100
@@ -0,0 +1,83 @@
+"""
+Tests for what curve shapes do past their ends
+"""
+import numpy as np
+import pytest
+from ..curveShape import CurveShape
+from ..endTreatment import END_TREATMENT
+
+
+class Polynomial(CurveShape):
+    """
+    A polynomial from 0 to 10
+    """
+    def __init__(self,coefficients,atStart,atEnd):
+        CurveShape.__init__(self,atStart,atEnd)
+        self.coefficients=coefficients
+
+    @property
+    def duration(self)->float:
+        return 10.0
+
+    def getValueAt(self,relativeTime:float)->float:
+        return float(np.polyval(self.coefficients,relativeTime))
+
+    def getValuesAt(self,relativeTimes:np.ndarray)->np.ndarray:
+        return np.polyval(self.coefficients,np.asarray(relativeTimes))
+
+
+RAMP=[2.0,1.0] # 2t+1
+
+# treatment: (coefficients, value at -3, value at 13)
+EXPECTED={
+    END_TREATMENT.CLAMP:(RAMP,1.0,21.0),
+    END_TREATMENT.LOOP:(RAMP,15.0,7.0),
+    END_TREATMENT.REFLECT:(RAMP,7.0,15.0),
+    END_TREATMENT.LINEAR_PROJECTION:(RAMP,-5.0,27.0),
+    END_TREATMENT.CUBIC_PROJECTION:([1.0,0.0,0.0,0.0],-27.0,2197.0),
+    END_TREATMENT.NONE:(RAMP,np.nan,np.nan)}
+
+
+@pytest.mark.parametrize('treatment',list(EXPECTED))
+def test_bothEnds(treatment:END_TREATMENT):
+    """
+    Each treatment maps positions past either end correctly,
+    the same for get() and getMany()
+    """
+    coefficients,beforeStart,afterEnd=EXPECTED[treatment]
+    shape=Polynomial(coefficients,treatment,treatment)
+    positions=np.array([-3.0,0.0,5.0,10.0,13.0])
+    values=shape.getMany(positions)
+    expected=np.polyval(coefficients,positions)
+    expected[0],expected[-1]=beforeStart,afterEnd
+    assert np.allclose(values,expected,equal_nan=True)
+    for position,value in zip(positions,expected):
+        single=shape.get(position)
+        if np.isnan(value):
+            assert single is None
+        else:
+            assert np.isclose(single,value)
+
+
+def test_endsAreSeparate():
+    """
+    atStart and atEnd each apply to their own end only
+    """
+    shape=Polynomial(RAMP,END_TREATMENT.LOOP,END_TREATMENT.NONE)
+    values=shape.getMany([-3.0,-13.0,4.0,13.0])
+    assert np.allclose(values,[15.0,15.0,9.0,np.nan],equal_nan=True)
+    shape=Polynomial(RAMP,END_TREATMENT.LINEAR_PROJECTION,
+        END_TREATMENT.CLAMP)
+    assert np.allclose(shape.getMany([-1.0,11.0]),[-1.0,21.0])
+
+
+def test_indexError():
+    """
+    INDEX_ERROR raises for either end, but not inside the curve
+    """
+    shape=Polynomial(RAMP,END_TREATMENT.INDEX_ERROR,END_TREATMENT.CLAMP)
+    assert np.allclose(shape.getMany([0.0,12.0]),[1.0,21.0])
+    with pytest.raises(IndexError):
+        shape.get(-1.0)
+    with pytest.raises(IndexError):
+        shape.getMany([5.0,-1.0])
@@ -0,0 +1,26 @@
+"""
+Tests for GaussianCurve
+"""
+import pytest
+from ..curves.gaussianCurve import GaussianCurve
+
+
+def test_coefficientRoundTrip():
+    """
+    Setting the coefficient gives it back, and the matching stdev
+    """
+    curve=GaussianCurve(0.0,1.0)
+    curve.coefficient=0.1995
+    assert curve.coefficient==pytest.approx(0.1995)
+    assert curve.stdev==pytest.approx(2.0,rel=1e-3)
+
+
+def test_changingStdevChangesSamples():
+    """
+    Cached samples are not reused after the curve changes
+    """
+    curve=GaussianCurve(0.0,1.0)
+    before=curve.samples(-1,1,0.5)
+    curve.stdev=2.0
+    after=curve.samples(-1,1,0.5)
+    assert after[2]==pytest.approx(before[2]/2)
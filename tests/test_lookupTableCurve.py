@@ -0,0 +1,54 @@
+"""
+Tests for LookupTableCurve and compileLUT()
+"""
+import time
+import numpy as np
+import pytest
+from ..curves.constantCurve import ConstantCurve
+from ..curves.gaussianCurve import GaussianCurve
+from ..curves.discretePointCurve import DiscretePointCurve
+from ..curves.lookupTableCurve import MAX_TABLE_SIZE
+
+
+@pytest.mark.parametrize('interpolation',['linear','cubic'])
+def test_accuracy(interpolation:str):
+    """
+    The table is within maxError of the original curve
+    """
+    curve=GaussianCurve(0.0,1.0)
+    table=curve.compileLUT(-1,1,maxError=1e-7,interpolation=interpolation)
+    positions=np.linspace(-1,1,10001)
+    error=table.valuesAt(positions)-curve.valuesAt(positions)
+    assert np.max(np.abs(error))<=1e-7
+
+
+def test_flatCurveStaysSmall():
+    """
+    A flat curve does not grow the table chasing rounding error
+    """
+    table=ConstantCurve(1000.1).compileLUT(0,1)
+    assert table.size<MAX_TABLE_SIZE//1000
+
+
+def test_discontinuityStopsGrowing():
+    """
+    A jump that no table size can capture does not grow the table
+    to the maximum
+    """
+    curve=DiscretePointCurve(np.repeat([0.0,1.0],500),'nearest')
+    began=time.perf_counter()
+    table=curve.compileLUT()
+    assert table.size<MAX_TABLE_SIZE//100
+    assert time.perf_counter()-began<5
+
+
+def test_followsSourceChanges():
+    """
+    The table is rebuilt when the original curve changes
+    """
+    curve=DiscretePointCurve(np.arange(100.0))
+    table=curve.compileLUT(0,99,resolution=100)
+    before=table.samples(0,99,0.5)
+    curve[50]=1000.0
+    assert table.valueAt(50)==pytest.approx(1000.0)
+    assert not np.array_equal(table.samples(0,99,0.5),before)
@@ -0,0 +1,71 @@
+"""
+Tests for MemmapDiscretePointCurve
+"""
+import numpy as np
+import pytest
+from ..curves.errors import CurveException
+from ..curves.memmapDiscretePointCurve import MemmapDiscretePointCurve
+
+
+def test_cannotShrinkUnderViews(tmp_path):
+    """
+    Shrinking the file while views are alive raises rather than
+    leaving the views pointing past the end of the file
+    """
+    filename=tmp_path/'samples.npy'
+    curve=MemmapDiscretePointCurve(filename,mode='w+')
+    curve.reserve(4096)
+    curve.append(np.arange(1000.0))
+    view=curve.samples()
+    chunk=next(curve.iterChunks(chunkSize=10))
+    with pytest.raises(CurveException):
+        curve.close()
+    del view,chunk
+    curve.close()
+    assert np.array_equal(np.load(filename),np.arange(1000.0))
+
+
+def test_growingKeepsViewsValid(tmp_path):
+    """
+    Appending (which only ever grows the file) is fine with views alive
+    """
+    filename=tmp_path/'samples.npy'
+    with MemmapDiscretePointCurve(filename,mode='w+') as curve:
+        curve.append(np.arange(10.0))
+        view=curve.samples()
+        curve.append(np.arange(100000.0))
+        assert view[9]==9.0
+        del view
+
+
+def test_rawFileHasNoSlack(tmp_path):
+    """
+    A raw file reopened without being closed has just its samples
+    """
+    filename=tmp_path/'samples.raw'
+    curve=MemmapDiscretePointCurve(filename,dtype=float,mode='w+')
+    curve.reserve(1000)
+    for i in range(5):
+        curve.append(float(i))
+    curve.flush()
+    reopened=MemmapDiscretePointCurve(filename,dtype=float,mode='r')
+    assert reopened.end==5
+    assert np.array_equal(reopened.samples(),np.arange(5.0))
+    reopened.close()
+    curve.close()
+
+
+def test_viewsAreTracked(tmp_path):
+    """
+    Views count as exported until they are gone
+    """
+    curve=MemmapDiscretePointCurve(tmp_path/'samples.npy',mode='w+')
+    curve.append(np.arange(100.0))
+    assert not curve.viewsExported
+    view=curve.samples()
+    copied=curve.samples(copy=True)
+    assert curve.viewsExported
+    del view
+    assert not curve.viewsExported
+    curve.close()
+    assert copied[99]==99.0
@@ -0,0 +1,32 @@
+"""
+Tests for sampling curves in parallel
+"""
+import gc
+import numpy as np
+import pytest
+from ..curves.gaussianCurve import GaussianCurve
+from ..curves.parallel import parallelSamples,sampleMany
+
+
+@pytest.mark.parametrize('useProcesses',[False,True])
+def test_sameAsSerial(useProcesses:bool):
+    """
+    Sharded samples are exactly the same as serial ones
+    """
+    curve=GaussianCurve(0.3,1.7)
+    start,stop,step=-3.1,2.9,0.0001
+    serial=curve.valuesAt(np.arange(start,stop,step))
+    parallel=parallelSamples(curve,start,stop,step,workers=3,
+        useProcesses=useProcesses)
+    assert np.array_equal(parallel,serial)
+
+
+def test_sharedOutputOutlivesWorkers():
+    """
+    The process path's output stays valid after the pool is gone
+    """
+    curves=[GaussianCurve(0.0,1.0+i) for i in range(3)]
+    out=sampleMany(curves,-1,1,0.001,workers=2,useProcesses=True)
+    gc.collect()
+    for row,curve in zip(out,curves):
+        assert np.array_equal(row,curve.valuesAt(np.arange(-1,1,0.001)))
@@ -0,0 +1,46 @@
+"""
+Tests for PiecewisePolynomialCurve
+"""
+import numpy as np
+import pytest
+from ..curves.discretePointCurve import DiscretePointCurve
+from ..curves.piecewisePolynomialCurve import PiecewisePolynomialCurve
+
+
+def test_segmentValues():
+    """
+    Each position uses its own segment's polynomial, of the distance
+    from the segment's start, and the ends carry on the end segments
+    """
+    curve=PiecewisePolynomialCurve([0,2,5],[[1.0,0.0,1.0],[0.0,-1.0,3.0]])
+    positions=np.array([-1.0,0.0,1.5,2.0,4.0,5.0,6.0])
+    expected=[2.0,1.0,3.25,3.0,1.0,0.0,-1.0]
+    assert np.allclose(curve.valuesAt(positions),expected)
+    assert np.allclose([curve.valueAt(position) for position in positions],
+        expected)
+    assert np.array_equal(curve.segmentAt(positions),[0,0,0,1,1,1,1])
+
+
+def test_fromCurve():
+    """
+    Fitting a cubic a segment at a time reproduces it,
+    with a short leftover merged into the last segment
+    """
+    x=np.arange(1002.0)
+    y=1e-6*(x-300)**3-0.01*x
+    curve=PiecewisePolynomialCurve.fromCurve(DiscretePointCurve(y),
+        segmentLength=100,order=3)
+    assert curve.segmentCount==10
+    assert curve.breakpoints[-2]==900
+    assert (curve.start,curve.end)==(0,1002)
+    assert np.allclose(curve.valuesAt(x),y)
+
+
+def test_invalid():
+    """
+    Mismatched or out of order segments are rejected
+    """
+    with pytest.raises(ValueError):
+        PiecewisePolynomialCurve([0,1],[[1.0],[2.0]])
+    with pytest.raises(ValueError):
+        PiecewisePolynomialCurve([0,2,1],[[1.0],[2.0]])
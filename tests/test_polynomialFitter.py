@@ -0,0 +1,40 @@
+"""
+Tests for StreamingPolyFitter
+"""
+import numpy as np
+from ..curves.discretePointCurve import DiscretePointCurve
+from ..curves.piecewisePolynomialCurve import PiecewisePolynomialCurve
+from ..curves.polynomialFitter import StreamingPolyFitter
+
+
+def test_curveNotStartingAtZero():
+    """
+    Samples are fitted at their real positions
+    """
+    curve=PiecewisePolynomialCurve([100,150,200],
+        [[0.01,0.0,1.0],[-0.02,1.0,26.0]])
+    fitter=StreamingPolyFitter(order=2)
+    fitter.update(curve,chunkSize=7)
+    x=curve.samplePositions()
+    assert x[0]==100
+    assert np.allclose(fitter.coefficients,
+        np.polyfit(x,curve.valuesAt(x),2))
+    count=fitter.count
+    fitter.update(curve) # nothing new
+    assert fitter.count==count
+
+
+def test_growingCurve():
+    """
+    Later updates only pick up the appended samples
+    """
+    rng=np.random.default_rng(1)
+    y=rng.normal(size=300)+np.arange(300)*0.1
+    curve=DiscretePointCurve(y[:100])
+    fitter=StreamingPolyFitter(order=1)
+    fitter.update(curve)
+    curve.append(y[100:])
+    fitter.update(curve)
+    assert fitter.count==300
+    assert np.allclose(fitter.coefficients,
+        np.polyfit(np.arange(300.0),y,1))
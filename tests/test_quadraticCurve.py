@@ -0,0 +1,42 @@
+"""
+Tests for QuadraticCurve
+"""
+import numpy as np
+import pytest
+from ..curves.quadraticCurve import QuadraticCurve
+
+
+def test_coefficientsCannotGoStale():
+    """
+    Editing coefficients in place raises rather than being ignored,
+    and assigning new ones takes effect
+    """
+    curve=QuadraticCurve([1.0,2.0])
+    with pytest.raises(ValueError):
+        curve.coeffients[0]=5
+    curve.coeffients=[5.0,2.0]
+    assert curve.valueAt(1.0)==7.0
+    assert np.all(curve.samples(0,3)==[2.0,7.0,12.0])
+
+
+def test_complexCoefficients():
+    """
+    Complex coefficients give complex results, like np.poly1d
+    """
+    coefficients=[1+2j,3.0,-1j]
+    curve=QuadraticCurve(coefficients)
+    x=np.linspace(-2,2,9)
+    expected=np.poly1d(coefficients)(x)
+    assert np.allclose(curve.valuesAt(x),expected)
+    assert curve.valueAt(1.5)==pytest.approx(np.poly1d(coefficients)(1.5))
+    assert np.allclose(curve.solve(x.astype(np.float32)),expected,atol=1e-5)
+
+
+def test_float32():
+    """
+    float32 in gives float32 out
+    """
+    curve=QuadraticCurve([1.0,2.0,3.0])
+    x=np.arange(4,dtype=np.float32)
+    assert curve.solve(x).dtype==np.float32
+    assert np.allclose(curve.solve(x),x**2+2*x+3)
@@ -0,0 +1,87 @@
+"""
+Tests that cached samples never outlive a change to their curve
+"""
+import numpy as np
+import pytest
+from ..curves.sampleCache import SampleCache,sampleCache
+from ..curves.constantCurve import ConstantCurve
+from ..curves.curveBank import GaussianCurveBank
+from ..curves.piecewisePolynomialCurve import PiecewisePolynomialCurve
+
+
+def test_hitsAreShared():
+    """
+    samples() hands back the cached (read-only) block itself,
+    unless a copy is asked for
+    """
+    curve=ConstantCurve(3.0)
+    first=curve.samples(0,10)
+    assert curve.samples(0,10) is first
+    with pytest.raises(ValueError):
+        first[0]=99
+    copied=curve.samples(0,10,copy=True)
+    copied[0]=99
+    assert curve.samples(0,10)[0]==3.0
+
+
+def test_constantValue():
+    """
+    Changing a ConstantCurve changes its samples
+    """
+    curve=ConstantCurve(3.0)
+    curve.samples(0,10)
+    curve.value=4.0
+    assert np.all(curve.samples(0,10)==4.0)
+
+
+def test_piecewiseCoefficients():
+    """
+    Assigning new coefficients or breakpoints changes the samples
+    """
+    curve=PiecewisePolynomialCurve([0,5,10],[[1.0,0.0],[0.0,2.0]])
+    before=curve.samples(0,10)
+    curve.coefficients=[[2.0,0.0],[0.0,3.0]]
+    after=curve.samples(0,10)
+    assert after[1]==2*before[1]
+    assert after[7]==3.0
+    curve.breakpoints=[0,2,10]
+    assert curve.samples(0,10)[3]==3.0
+    with pytest.raises(ValueError):
+        curve.coefficients[0,0]=5
+
+
+def test_curveBankSumWeights():
+    """
+    Assigning new weights changes the samples
+    """
+    total=GaussianCurveBank([0.0,1.0],[1.0,1.0]).sum()
+    before=total.samples(0,2,0.5)
+    total.weights=[2.0,2.0]
+    assert np.allclose(total.samples(0,2,0.5),2*before)
+
+
+def test_lruEviction():
+    """
+    The least recently used block goes first, and hits are counted
+    """
+    cache=SampleCache(maxBytes=2*80)
+    curves=[ConstantCurve(float(i)) for i in range(3)]
+    for curve in curves[:2]:
+        cache.put(curve,0,10,1,np.zeros(10))
+    assert cache.get(curves[0],0,10,1) is not None
+    cache.put(curves[2],0,10,1,np.zeros(10))
+    assert cache.get(curves[1],0,10,1) is None
+    assert cache.get(curves[0],0,10,1) is not None
+    assert (cache.hits,cache.misses,cache.evictions)==(2,1,1)
+
+
+def test_forgetsCollectedCurves():
+    """
+    A curve's blocks go away with it
+    """
+    sampleCache.clear()
+    curve=ConstantCurve(1.0)
+    curve.samples(0,10)
+    assert len(sampleCache)==1
+    del curve
+    assert len(sampleCache)==0
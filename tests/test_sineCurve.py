@@ -0,0 +1,46 @@
+"""
+Tests for SineCurve
+"""
+import numpy as np
+from ..sineCurve import SineCurve,TWO_PI
+
+
+def test_renderMatchesValues():
+    """
+    Rendering block after block gives the same signal as
+    sampling the curve at those times
+    """
+    curve=SineCurve(x=2.0,t=0.3,offset=1.0,frequency=440.0)
+    sampleRate=48000.0
+    blocks=[curve.render(sampleRate,size) for size in (64,100,64,0,1)]
+    rendered=np.concatenate(blocks)
+    times=np.arange(len(rendered))/sampleRate
+    assert np.allclose(rendered,curve.getValuesAt(times))
+    curve.resetPhase()
+    assert np.allclose(curve.render(sampleRate,64),rendered[:64])
+
+
+def test_frequencyModulation():
+    """
+    A per-sample frequency accumulates phase sample by sample
+    """
+    curve=SineCurve()
+    sampleRate=1000.0
+    frequency=np.linspace(10.0,50.0,200)
+    rendered=np.concatenate((curve.render(sampleRate,100,
+        frequency=frequency[:100]),curve.render(sampleRate,100,
+        frequency=frequency[100:])))
+    increments=frequency*TWO_PI/sampleRate
+    phases=np.concatenate(((0.0,),np.cumsum(increments)[:-1]))
+    assert np.allclose(rendered,np.sin(phases))
+
+
+def test_renderIntoFloat32():
+    """
+    Rendering into a float32 buffer still works out phase at float64
+    """
+    curve=SineCurve(frequency=1000.0)
+    out=np.empty(256,dtype=np.float32)
+    assert curve.render(44100.0,256,out=out) is out
+    times=np.arange(256)/44100.0
+    assert np.allclose(out,curve.getValuesAt(times),atol=1e-6)
@@ -0,0 +1,53 @@
+"""
+Tests for fitting splines to large numbers of samples
+"""
+import numpy as np
+from ..curves import splineFitting
+from ..curves.splineFitting import predecimate,fitSpline
+from ..curves.discretePointCurve import DiscretePointCurve
+
+
+def test_predecimateLimit():
+    """
+    predecimate() never returns more than maxSamples
+    """
+    x=np.arange(10007.0)
+    y=np.sin(x*0.01)
+    for maxSamples in (1,7,100,5003,10006,10007,20000):
+        xOut,yOut=predecimate(x,y,maxSamples)
+        assert len(xOut)==len(yOut)<=maxSamples
+        assert np.all(np.diff(xOut)>0)
+
+
+def test_fitSplineAppliesMaxSamples():
+    """
+    maxSamples is honored even for a smoothing spline
+    """
+    x=np.arange(5000.0)
+    y=np.sin(x*0.002)
+    spline=fitSpline(x,y,0.01,maxSamples=500)
+    assert np.max(np.abs(spline(x[10:-10])-y[10:-10]))<0.05
+
+
+def test_predecimateKeepsDeviations():
+    """
+    With an allowedDeviation, runs that stray further are kept as-is
+    """
+    x=np.arange(10000.0)
+    y=np.zeros(10000)
+    y[5000]=1.0
+    xOut,yOut=predecimate(x,y,1000,allowedDeviation=0.01)
+    assert np.all(np.diff(xOut)>0)
+    assert yOut.max()==1.0
+    assert len(xOut)<=1000+10
+
+
+def test_spikeSurvivesToSpline(monkeypatch):
+    """
+    By default, pre-decimation does not flatten a one-sample spike
+    """
+    monkeypatch.setattr(splineFitting,'DEFAULT_MAX_SAMPLES',1000)
+    y=np.zeros(10000)
+    y[5000]=1.0
+    spline=DiscretePointCurve(y).toSpline(0.01)
+    assert spline.valueAt(5000)>0.5
@@ -0,0 +1,69 @@
+"""
+Tests for SummaryPyramid and the DiscretePointCurve range queries
+"""
+import numpy as np
+import pytest
+from ..curves.summaryPyramid import SummaryPyramid
+from ..curves.discretePointCurve import DiscretePointCurve
+
+
+def bruteSummary(samples:np.ndarray,start:int,stop:int,buckets:int):
+    """
+    (mins,maxs,means) worked out the slow way
+    """
+    edges=start+(np.arange(buckets+1)*(stop-start))//buckets
+    pieces=[samples[a:b] for a,b in zip(edges[:-1],edges[1:])]
+    return ([piece.min() for piece in pieces],
+        [piece.max() for piece in pieces],
+        [piece.mean() for piece in pieces])
+
+
+def test_summarizeIsExact():
+    """
+    Buckets never include samples outside their own range
+    """
+    samples=np.sin(np.arange(20000)*0.01)*3
+    samples[5]=100.0
+    pyramid=SummaryPyramid(8)
+    for start,stop,buckets in ((100,10100,7),(0,20000,13),(3,19999,100)):
+        expected=bruteSummary(samples,start,stop,buckets)
+        for got,want in zip(
+                pyramid.summarize(samples,start,stop,buckets),expected):
+            assert np.allclose(got,want)
+
+
+def test_summarizeRandom():
+    """
+    Random ranges and block sizes agree with the slow way
+    """
+    rng=np.random.default_rng(0)
+    for _ in range(100):
+        pyramid=SummaryPyramid(int(rng.integers(2,10)))
+        samples=rng.normal(size=int(rng.integers(1,3000)))
+        start=int(rng.integers(0,len(samples)))
+        stop=int(rng.integers(start+1,len(samples)+1))
+        buckets=int(rng.integers(1,stop-start+1))
+        expected=bruteSummary(samples,start,stop,buckets)
+        for got,want in zip(
+                pyramid.summarize(samples,start,stop,buckets),expected):
+            assert np.allclose(got,want)
+
+
+def test_setItemUpdatesPyramid():
+    """
+    Setting samples (including negative indices and slices)
+    is seen by the pyramid
+    """
+    curve=DiscretePointCurve(np.zeros(1000))
+    curve.enablePyramid(8)
+    assert curve.rangeMax()==0
+    curve[-1]=5.0
+    assert curve.rangeMax()==5.0
+    assert curve.samples()[999]==5.0
+    curve[10:20]=-3.0
+    assert curve.rangeMin()==-3.0
+    curve[::-100]=7.0
+    assert curve.rangeMax()==7.0
+    assert curve.rangeMean()==pytest.approx(curve.samples().mean())
+    with pytest.raises(IndexError):
+        curve[1000]=1.0